@@ -0,0 +1,287 @@
+"""
+Замеры скорости и памяти всех решателей на сгенерированных задачах и проверка на регрессии
+Задачи строятся генератором случайных чисел с фиксированным зерном, поэтому набор одинаков
+от запуска к запуску. Для каждой группы задач (решатель и размер) измеряются лучшее из
+нескольких повторов время и пиковая память (tracemalloc), а ответы сводятся в хэш.
+Сравнение с базовыми значениями из benchmark_baseline.json рядом со скриптом: время или
+память выросли больше допуска, либо изменились ответы - код возврата 1. Окон не создает,
+работает только с ядрами:
+
+    python benchmark.py [--solver solver_1 ...] [--quick] [--update-baseline]
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from itertools import product
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from result_cache import shared_cache
+# Ядра импортируются заранее, чтобы время импорта не попало в замер первой группы
+from solver_1_core import Graph
+from solver_2_core import VARIABLES, Solver, truth_table
+from solver_game_theory_core import OneHeapSolver
+from sover_15_core import compile_formula, solve_task
+
+# Базовые значения лежат рядом со скриптом, откуда бы он ни запускался
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Изменения меньше этих величин считаются шумом измерения
+TIME_NOISE_MS = 5.0
+MEMORY_NOISE_KB = 64.0
+# Группы дольше этого (мс) не повторяются: их время и так мало зависит от шума
+LONG_RUN_MS = 1000.0
+
+
+class Bucket(NamedTuple):
+    """Группа задач одного решателя и размера"""
+    solver: str
+    name: str
+    # Генератор задач: (случайный генератор, число задач) -> задачи
+    make: Callable[[random.Random, int], list]
+    # Решение одной задачи; результат - строка для хэша ответов
+    run: Callable[[object], str]
+    count: int
+
+
+# Задача 1: схема дорог и таблица длин
+
+LETTERS = "АБВГДЕЖЗИКЛМ"
+
+
+def make_graph_problems(size: int) -> Callable[[random.Random, int], list]:
+    def make(rng: random.Random, count: int) -> list:
+        problems = []
+        for _ in range(count):
+            # Связный граф: остовное дерево и случайные дополнительные дороги
+            edges = {(rng.randrange(i), i) for i in range(1, size)}
+            edges |= {(i, j) for i in range(size) for j in range(i + 1, size) if rng.random() < 0.3}
+            # Таблица - тот же граф с перенумерованными пунктами и случайными длинами
+            order = list(range(size))
+            rng.shuffle(order)
+            table = [[None] * size for _ in range(size)]
+            for i, j in edges:
+                length = rng.randint(1, 40)
+                table[order[i]][order[j]] = table[order[j]][order[i]] = length
+            problems.append((size, sorted(edges), table))
+        return problems
+    return make
+
+
+def run_graph_problem(problem) -> str:
+    size, edges, table = problem
+    graph = Graph()
+    for node in LETTERS[:size]:
+        graph.add_node(node)
+    for i, j in edges:
+        graph.add_edge(LETTERS[i], LETTERS[j])
+    labels = [str(i + 1) for i in range(size)]
+    mappings = graph.find_all_isomorphisms(table, labels)
+    return ";".join(sorted(" ".join(f"{k}={v}" for k, v in sorted(m.items())) for m in mappings))
+
+
+# Задача 2: фрагмент таблицы истинности
+
+OPERATIONS = ["∧", "∨", "→", "≡"]
+
+
+def make_truth_problems(variables: int, rows: int) -> Callable[[random.Random, int], list]:
+    def make(rng: random.Random, count: int) -> list:
+        problems = []
+        names = VARIABLES[:variables]
+        for _ in range(count):
+            # Формула, в которой встречаются все переменные
+            form = names[0]
+            for name in names[1:]:
+                operand = name if rng.random() < 0.7 else f"(¬{name})"
+                form = f"({form} {rng.choice(OPERATIONS)} {operand})"
+            table = truth_table(form)
+            # Фрагмент - строки таблицы с переставленными столбцами и частью пустых клеток
+            columns = list(range(variables))
+            rng.shuffle(columns)
+            fragment = []
+            for row in rng.sample(table, rows):
+                cells = [row[c] for c in columns] + [row[-1]]
+                fragment.append([None if rng.random() < 0.4 else cell for cell in cells])
+            problems.append((form, fragment))
+        return problems
+    return make
+
+
+def run_truth_problem(problem) -> str:
+    form, fragment = problem
+    ans, row_perm, col_perm = Solver(fragment, truth_table(form)).solve()
+    return str(col_perm)
+
+
+# Задачи 19-21: теория игр
+
+def make_game_problems(win_value: int) -> Callable[[random.Random, int], list]:
+    def make(rng: random.Random, count: int) -> list:
+        problems = []
+        for _ in range(count):
+            moves = [f"+{rng.randint(1, 3)}", f"+{rng.randint(4, 6)}", f"*{rng.randint(2, 3)}"]
+            problems.append((win_value, moves))
+        return problems
+    return make
+
+
+def run_game_problem(problem) -> str:
+    win_value, moves = problem
+    return str(OneHeapSolver(">=", win_value, moves).solve(1, win_value - 1, 2, 1))
+
+
+# Задача 15: отрезки на числовой прямой
+
+def make_segment_problems(segments: int) -> Callable[[random.Random, int], list]:
+    def make(rng: random.Random, count: int) -> list:
+        names = [chr(ord("P") + i) for i in range(segments)]
+        problems = []
+        for _ in range(count):
+            intervals = {}
+            for name in names:
+                a, b = sorted(rng.sample(range(1, 100), 2))
+                intervals[name] = (a, b)
+            atoms = [f"(x in {name})" for name in names]
+            rng.shuffle(atoms)
+            form = atoms[0]
+            for atom in atoms[1:]:
+                form = f"({form} {rng.choice(OPERATIONS)} {'¬' if rng.random() < 0.3 else ''}{atom})"
+            form = f"{form} {rng.choice(['→', '∨'])} {'¬' if rng.random() < 0.5 else ''}(x in A)"
+            problems.append((intervals, form, rng.choice(["max", "min"])))
+        return problems
+    return make
+
+
+def run_segment_problem(problem) -> str:
+    intervals, form, mode = problem
+    return solve_task(intervals, form, mode).answer_text()
+
+
+BUCKETS: List[Bucket] = (
+    [Bucket("solver_1", f"узлов {n}", make_graph_problems(n), run_graph_problem, 20) for n in range(5, 13)]
+    # Переменных у решателя задачи 2 не больше пяти (x, y, z, w, u); перебор строк растет
+    # как 2^n в степени числа строк, поэтому для пяти переменных фрагмент не длиннее двух строк
+    + [Bucket("solver_2", f"переменных {v}, строк {r}", make_truth_problems(v, r), run_truth_problem, 5)
+       for v, r in product(range(3, 6), range(1, 4)) if v < 5 or r < 3]
+    # Время решения растет линейно с числом победы (доли миллисекунды на значение кучи),
+    # поэтому в группе 10^4 одна задача - в том числе и с --quick
+    + [Bucket("game_theory", f"победа {w}", make_game_problems(w), run_game_problem, count)
+       for w, count in ((100, 2), (300, 2), (1000, 2), (10000, 1))]
+    + [Bucket("sover_15", f"отрезков {s}", make_segment_problems(s), run_segment_problem, 200)
+       for s in (2, 4, 8)]
+)
+
+
+def clear_caches() -> None:
+    """Сброс общего кэша ответов и кэша разобранных формул задачи 15"""
+    shared_cache.clear()
+    compile_formula.cache_clear()
+
+
+def measure(bucket: Bucket, repeat: int, scale: float, seed: int) -> Dict[str, object]:
+    """Время (лучшее из repeat, мс), пиковая память (КБ) и хэш ответов группы"""
+    count = max(1, int(bucket.count * scale))
+    problems = bucket.make(random.Random(f"{seed}:{bucket.solver}:{bucket.name}"), count)
+
+    best = None
+    answers = []
+    for _ in range(repeat):
+        # Кэши ответов сбрасываются, иначе повторы измеряли бы только их
+        clear_caches()
+        gc.collect()
+        start = time.perf_counter()
+        answers = [bucket.run(problem) for problem in problems]
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+        if elapsed > LONG_RUN_MS:
+            break
+
+    # Память - отдельным прогоном: tracemalloc сильно замедляет выполнение
+    clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    for problem in problems:
+        bucket.run(problem)
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+    digest = hashlib.sha256("\n".join(answers).encode("utf-8")).hexdigest()[:16]
+    return {"problems": count, "time_ms": round(best, 2), "peak_kb": round(peak, 1), "answers": digest}
+
+
+def compare(key: str, result: Dict[str, object], base: Optional[Dict[str, object]],
+            tolerance: float) -> List[str]:
+    """Описания регрессий группы по сравнению с базовыми значениями"""
+    if base is None:
+        return []
+    problems = []
+    if base["problems"] != result["problems"]:
+        return [f"{key}: другое число задач ({base['problems']} -> {result['problems']}), сравнение пропущено"]
+    if base["answers"] != result["answers"]:
+        problems.append(f"{key}: изменились ответы")
+    if (result["time_ms"] > base["time_ms"] * (1 + tolerance)
+            and result["time_ms"] - base["time_ms"] > TIME_NOISE_MS):
+        problems.append(f"{key}: время {base['time_ms']} -> {result['time_ms']} мс")
+    if (result["peak_kb"] > base["peak_kb"] * (1 + tolerance)
+            and result["peak_kb"] - base["peak_kb"] > MEMORY_NOISE_KB):
+        problems.append(f"{key}: память {base['peak_kb']} -> {result['peak_kb']} КБ")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры решателей и проверка на регрессии")
+    parser.add_argument("--solver", action="append", choices=sorted({b.solver for b in BUCKETS}),
+                        help="только указанные решатели (можно несколько раз)")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов замера времени (берется лучший)")
+    parser.add_argument("--quick", action="store_true", help="вчетверо меньше задач в каждой группе")
+    parser.add_argument("--seed", type=int, default=2024, help="зерно генератора задач")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="файл базовых значений (JSON)")
+    parser.add_argument("--update-baseline", action="store_true", help="сохранить результаты как базовые")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="допустимый рост времени и памяти, доля (по умолчанию 0.3)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        baseline = {}
+    # Базовые значения сравнимы только с тем же набором задач
+    mode = f"seed={args.seed}{' quick' if args.quick else ''}"
+    base_results = baseline.get(mode, {})
+
+    results = {}
+    regressions = []
+    print(f"{'решатель':<12} {'группа':<24} {'задач':>6} {'время, мс':>10} {'память, КБ':>11}  ответы")
+    for bucket in BUCKETS:
+        if args.solver and bucket.solver not in args.solver:
+            continue
+        key = f"{bucket.solver}/{bucket.name}"
+        result = measure(bucket, args.repeat, 0.25 if args.quick else 1.0, args.seed)
+        results[key] = result
+        found = compare(key, result, base_results.get(key), args.tolerance)
+        regressions += found
+        print(f"{bucket.solver:<12} {bucket.name:<24} {result['problems']:>6} {result['time_ms']:>10.1f} "
+              f"{result['peak_kb']:>11.1f}  {result['answers']}{'  РЕГРЕССИЯ' if found else ''}")
+
+    if args.update_baseline:
+        baseline[mode] = {**base_results, **results}
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, ensure_ascii=False, indent=1, sort_keys=True)
+            file.write("\n")
+        print(f"Базовые значения сохранены в {args.baseline}", file=sys.stderr)
+        return 0
+    if not base_results:
+        print(f"Базовых значений для {mode} нет: запустите с --update-baseline", file=sys.stderr)
+    for regression in regressions:
+        print(regression, file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
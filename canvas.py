@@ -1,97 +1,517 @@
 import tkinter as tk
-from random import randint
+from itertools import islice
 from tkinter import *
-from tkinter import messagebox
-window = Tk()
-window.geometry("1000x1000")
-window.title('Фигуры')
-canvas = tk.Canvas(window, width=1000, height=1000, bg="white")
-canvas.pack()
-
-
-class Point():
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-    def draw(self):
-        canvas.create_oval(self.x, self.y, self.x + 15, self.y + 15, fill="blue", outline="blue")
-
-class Line():
-    def __init__(self, x1, y1, x2, y2):
-        self.x1 = x1
-        self.y1 = y1
-        self.x2 = x2
-        self.y2 = y2
-    def draw(self):
-        canvas.create_line(self.x1, self.y1, self.x2, self.y2, fill="#EEE")
-
-class Rectangle():
-    def __init__(self, x1, y1, x2, y2):
-        self.x1 = x1
-        self.y1 = y1
-        self.x2 = x2
-        self.y2 = y2
-    def draw(self):
-        canvas.create_rectangle(self.x1, self.y1, self.x2, self.y2, fill="red")
-class Triangle:
-    def __init__(self, x1, y1, x2, y2, x3, y3):
-        self.x1 = x1
-        self.y1 = y1
-        self.x2 = x2
-        self.y2 = y2
-        self.x3 = x3
-        self.y3 = y3
-    def draw(self):
-        canvas.create_polygon(self.x1, self.y1, self.x2, self.y2, self.x3, self.y3, fill = 'blue')
-
-
-class Oval:
-    def __init__(self, x1, y1, x2, y2):
-        self.x1 = x1
-        self.y1 = y1
-        self.x2 = x2
-        self.y2 = y2
-    def draw(self):
-        canvas.create_oval(self.x1, self.y1, self.x2, self.y2, fill="green")
+from tkinter import filedialog, messagebox
+from canvas_core import Oval, Point, Polyline, Rectangle, Triangle, View, load_shapes, save_shapes
 
 
+class Scene:
+    """
+    Фигуры холста в мировых координатах вместе с номерами их элементов Tk
+    Габариты фигур разложены по сетке квадратных ячеек: поиск по точке или области
+    просматривает только задетые ячейки, а не все фигуры.
+    На холсте есть элементы только у видимых фигур; фигуры мельче LOD_SIZE пикселей
+    рисуются одним квадратиком на ячейку экрана LOD_CELL x LOD_CELL
+    """
+    CELL = 64
+    LOD_SIZE = 3
+    LOD_CELL = 4
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.view = View()
+        # Порядковый номер фигуры -> фигура (больший номер лежит выше)
+        self.shapes = {}
+        self.next_key = 0
+        # (столбец, строка) ячейки -> номера фигур, чьи габариты ее задевают
+        self.cells = {}
+        # Фигуры, у которых сейчас есть элемент на холсте
+        self.drawn = set()
+        self.selected = None
+        self.render_pending = None
+
+    def _cells(self, x1, y1, x2, y2):
+        c = self.CELL
+        for cx in range(int(x1 // c), int(x2 // c) + 1):
+            for cy in range(int(y1 // c), int(y2 // c) + 1):
+                yield cx, cy
+
+    def _index(self, shape):
+        for cell in self._cells(*shape.bbox()):
+            self.cells.setdefault(cell, set()).add(shape.key)
+
+    def _unindex(self, shape):
+        for cell in self._cells(*shape.bbox()):
+            keys = self.cells.get(cell)
+            if keys:
+                keys.discard(shape.key)
+                if not keys:
+                    del self.cells[cell]
+
+    def size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            width, height = int(self.canvas["width"]), int(self.canvas["height"])
+        return width, height
+
+    def _is_small(self, shape):
+        x1, y1, x2, y2 = shape.bbox()
+        return max(x2 - x1, y2 - y1) * self.view.scale < self.LOD_SIZE
+
+    def add(self, shape):
+        self.add_many([shape])
+        return shape
+
+    def add_many(self, shapes):
+        """Добавление фигур; видимая область вычисляется один раз на всю пачку"""
+        x1, y1, x2, y2 = self.view.visible(*self.size())
+        for shape in shapes:
+            shape.key = self.next_key
+            self.next_key += 1
+            self.shapes[shape.key] = shape
+            self._index(shape)
+            sx1, sy1, sx2, sy2 = shape.bbox()
+            if sx1 <= x2 and sx2 >= x1 and sy1 <= y2 and sy2 >= y1:
+                if self._is_small(shape):
+                    self.schedule_render()
+                else:
+                    shape.draw(self.canvas, self.view)
+                    self.drawn.add(shape)
+
+    def remove(self, shape):
+        if self.selected is shape:
+            self.select(None)
+        self._unindex(shape)
+        del self.shapes[shape.key]
+        if shape in self.drawn:
+            self.drawn.discard(shape)
+            self.canvas.delete(shape.item)
+            shape.item = None
+        else:
+            self.schedule_render()
+
+    def clear(self):
+        self.select(None)
+        self.canvas.delete("shape", "lod")
+        for shape in self.shapes.values():
+            shape.item = None
+        self.shapes.clear()
+        self.cells.clear()
+        self.drawn.clear()
+
+    def extend(self, polyline, points):
+        """Продолжение штриха: один вызов coords вместо нового элемента на каждую точку"""
+        self._unindex(polyline)
+        polyline.extend(points)
+        self._index(polyline)
+        if polyline in self.drawn:
+            self.canvas.coords(polyline.item, *self.view.map(polyline.points))
+
+    def move(self, shape, dx, dy):
+        self._unindex(shape)
+        shape.move(dx, dy)
+        self._index(shape)
+        if shape in self.drawn:
+            self.canvas.move(shape.item, dx * self.view.scale, dy * self.view.scale)
+        else:
+            self.schedule_render()
+
+    def at(self, x, y):
+        """Верхняя фигура под точкой (по точной форме, а не только по габаритам)"""
+        keys = self.cells.get((int(x // self.CELL), int(y // self.CELL)), ())
+        for key in sorted(keys, reverse=True):
+            if self.shapes[key].contains(x, y):
+                return self.shapes[key]
+        return None
+
+    def region(self, x1, y1, x2, y2):
+        """Фигуры, чьи габариты пересекают прямоугольник"""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        c = self.CELL
+        found = set()
+        if (x2 - x1) * (y2 - y1) > c * c * len(self.cells):
+            # Область больше занятых ячеек - дешевле просмотреть ячейки, чем область
+            for (cx, cy), keys in self.cells.items():
+                if cx * c <= x2 and (cx + 1) * c >= x1 and cy * c <= y2 and (cy + 1) * c >= y1:
+                    found.update(keys)
+        else:
+            for cell in self._cells(x1, y1, x2, y2):
+                found.update(self.cells.get(cell, ()))
+        result = []
+        for key in sorted(found):
+            sx1, sy1, sx2, sy2 = self.shapes[key].bbox()
+            if sx1 <= x2 and sx2 >= x1 and sy1 <= y2 and sy2 >= y1:
+                result.append(self.shapes[key])
+        return result
+
+    def select(self, shape):
+        """Выделение фигуры пунктирной рамкой"""
+        self.canvas.delete("selection")
+        self.selected = shape
+        if shape is not None:
+            self.canvas.create_rectangle(*self.view.map(shape.bbox()), outline="black", dash=(4, 2),
+                                         tags="selection")
+
+    def pan(self, dx, dy):
+        """Сдвиг вида на dx, dy экранных пикселей: нарисованные элементы сдвигаются одним вызовом"""
+        self.view.x -= dx / self.view.scale
+        self.view.y -= dy / self.view.scale
+        self.canvas.move("shape", dx, dy)
+        self.canvas.move("selection", dx, dy)
+        self.schedule_render()
+
+    def zoom(self, factor, x, y):
+        """Масштабирование относительно экранной точки x, y"""
+        wx, wy = self.view.to_world(x, y)
+        self.view.scale *= factor
+        self.view.x = wx - x / self.view.scale
+        self.view.y = wy - y / self.view.scale
+        self.canvas.scale("shape", x, y, factor, factor)
+        self.schedule_render()
+
+    def schedule_render(self):
+        if self.render_pending is None:
+            self.render_pending = self.canvas.after_idle(self.render)
+
+    def render(self):
+        """Отсечение невидимых фигур и упрощение мелких после сдвига или масштабирования"""
+        self.render_pending = None
+        visible = self.region(*self.view.visible(*self.size()))
+        keep = set()
+        buckets = {}
+        s, c = self.view.scale, self.LOD_CELL
+        for shape in visible:
+            if self._is_small(shape):
+                x1, y1, _, _ = shape.bbox()
+                buckets.setdefault((int((x1 - self.view.x) * s // c), int((y1 - self.view.y) * s // c)),
+                                   shape.COLOR)
+            else:
+                keep.add(shape)
+        for shape in self.drawn - keep:
+            self.canvas.delete(shape.item)
+            shape.item = None
+        # Новые элементы создаются в порядке фигур, чтобы верхние оставались сверху
+        for shape in sorted(keep - self.drawn, key=lambda shape: shape.key):
+            shape.draw(self.canvas, self.view)
+        self.drawn = keep
+        self.canvas.delete("lod")
+        for (cx, cy), color in buckets.items():
+            self.canvas.create_rectangle(cx * c, cy * c, cx * c + c, cy * c + c, fill=color, outline="",
+                                         tags="lod")
+        if self.selected is not None:
+            self.select(self.selected)
+
+
+class Grid:
+    """
+    Фоновая сетка холста одной картинкой вместо сотен линий
+    Картинка на шаг сетки больше холста и пересоздается только при изменении размера
+    или масштаба; при сдвиге вида она лишь переставляется на остаток сдвига по шагу.
+    При целом шаге Tk размножает плитку с одной горизонтальной и одной вертикальной линией
+    """
+    # Более частая сетка не рисуется
+    MIN_STEP = 4
+
+    def __init__(self, canvas, step=10, color="#EEE", view=None):
+        self.canvas = canvas
+        self.step = step
+        self.color = color
+        self.view = view or View()
+        self.size = None
+        self.key = None
+        self.image = None
+        self.item = None
+        canvas.bind("<Configure>", self.on_resize, add="+")
+        self.redraw(int(canvas["width"]), int(canvas["height"]))
+
+    def set_step(self, step):
+        self.step = step
+        if self.size:
+            self.redraw(*self.size, force=True)
+
+    def on_resize(self, event):
+        self.redraw(event.width, event.height)
+
+    def update_view(self):
+        if self.size:
+            self.redraw(*self.size)
+
+    def redraw(self, width, height, force=False):
+        step = self.step * self.view.scale
+        key = (width, height, step)
+        if key != self.key or force:
+            self.key = key
+            self.size = (width, height)
+            self._build(width, height, step)
+        if self.item is not None:
+            # Линия сетки проходит через мировой ноль; картинку ставим на остаток сдвига
+            x = -(self.view.x * self.view.scale) % step - step
+            y = -(self.view.y * self.view.scale) % step - step
+            self.canvas.coords(self.item, x, y)
+
+    def _build(self, width, height, step):
+        if step < self.MIN_STEP:
+            if self.item is not None:
+                self.canvas.delete(self.item)
+                self.item = None
+            return
+        margin = int(step) + 2
+        self.image = PhotoImage(width=width + 2 * margin, height=height + 2 * margin)
+        if step == int(step):
+            # Плитка прозрачна везде, кроме верхней строки и левого столбца - сквозь нее виден фон холста
+            tile = PhotoImage(width=int(step), height=int(step))
+            tile.put(self.color, to=(0, 0, int(step), 1))
+            tile.put(self.color, to=(0, 0, 1, int(step)))
+            # copy -to заполняет область повторением плитки
+            self.canvas.tk.call(self.image, "copy", tile, "-to", 0, 0, width + 2 * margin, height + 2 * margin)
+        else:
+            for i in range(int((width + 2 * margin) / step) + 1):
+                self.image.put(self.color, to=(round(i * step), 0, round(i * step) + 1, height + 2 * margin))
+            for i in range(int((height + 2 * margin) / step) + 1):
+                self.image.put(self.color, to=(0, round(i * step), width + 2 * margin, round(i * step) + 1))
+        if self.item is None:
+            self.item = self.canvas.create_image(0, 0, anchor=NW, image=self.image, tags="grid")
+        else:
+            self.canvas.itemconfigure(self.item, image=self.image)
+        self.canvas.tag_lower(self.item)
+
+
+class SceneLoader:
+    """
+    Загрузка рисунка порциями по BATCH фигур через after: между порциями Tk успевает
+    обработать события, поэтому окно не замирает даже на сотнях тысяч фигур
+    """
+    BATCH = 5000
+
+    def __init__(self, scene, shapes, on_done=None, on_error=None):
+        self.scene = scene
+        # Итератор читается по мере загрузки - файл не разбирается целиком заранее
+        self.shapes = iter(shapes)
+        self.on_done = on_done
+        self.on_error = on_error
+        self.count = 0
+        self.pending = self.scene.canvas.after(0, self.step)
+
+    def step(self):
+        self.pending = None
+        try:
+            batch = list(islice(self.shapes, self.BATCH))
+        except (OSError, ValueError) as e:
+            if self.on_error is not None:
+                self.on_error(e)
+            return
+        self.scene.add_many(batch)
+        self.count += len(batch)
+        if len(batch) == self.BATCH:
+            self.pending = self.scene.canvas.after(1, self.step)
+        elif self.on_done is not None:
+            self.on_done(self.count)
+
+    def cancel(self):
+        """Остановка загрузки: следующая порция не читается"""
+        if self.pending is not None:
+            self.scene.canvas.after_cancel(self.pending)
+            self.pending = None
+
+
+class InputBuffer:
+    """
+    Буфер ввода мышью: обработчики событий только запоминают координаты,
+    а фигуры создаются пакетом в after_idle, когда очередь событий Tk опустеет.
+    Щелчок дает точку, протяжка по пустому месту - один штрих-ломаную.
+    Координаты мировые, пороги - в экранных пикселях
+    """
+    # Смещение, после которого нажатие считается протяжкой, и минимальный шаг точек штриха
+    DRAG_THRESHOLD = 3
+    MIN_STEP = 2
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.clicks = []
+        self.press = None
+        self.stroke = None
+        self.stroke_points = []
+        self.last = None
+        self.scheduled = None
+
+    def begin(self, x, y):
+        self.press = (x, y)
+        self.last = (x, y)
+
+    def drag(self, x, y):
+        if self.press is None:
+            return
+        if self.stroke is None and not self.stroke_points:
+            if (abs(x - self.press[0]) + abs(y - self.press[1])) * self.scene.view.scale < self.DRAG_THRESHOLD:
+                return
+            self.stroke_points.extend(self.press)
+        if (abs(x - self.last[0]) + abs(y - self.last[1])) * self.scene.view.scale < self.MIN_STEP:
+            return
+        self.stroke_points.extend((x, y))
+        self.last = (x, y)
+        self._schedule()
+
+    def end(self):
+        if self.press is None:
+            return
+        if self.stroke is None and not self.stroke_points:
+            self.clicks.append(self.press)
+            self._schedule()
+        else:
+            # Отпускание кнопки редко: штрих дорисовывается сразу и закрывается
+            self.flush()
+            self.stroke = None
+        self.press = None
+
+    def _schedule(self):
+        if self.scheduled is None:
+            self.scheduled = self.scene.canvas.after_idle(self.flush)
+
+    def flush(self):
+        self.scheduled = None
+        for x, y in self.clicks:
+            self.scene.add(Point(x, y))
+        self.clicks.clear()
+        if self.stroke_points:
+            if self.stroke is None:
+                self.stroke = self.scene.add(Polyline(self.stroke_points))
+            else:
+                self.scene.extend(self.stroke, self.stroke_points)
+            self.stroke_points = []
+
+# Окно, холст и его состояние создаются в main()
+window = canvas = scene = input_buffer = grid = None
+# Текущая загрузка рисунка (SceneLoader), чтобы новое открытие могло ее остановить
+loader = None
+drag_start = None
+pan_start = None
+
 
 def on_click(event):
-    x, y = event.x, event.y
-    point = Point(x, y)
-    point.draw()
+    global drag_start
+    x, y = scene.view.to_world(event.x, event.y)
+    shape = scene.at(x, y)
+    scene.select(shape)
+    if shape is None:
+        drag_start = None
+        input_buffer.begin(x, y)
+    else:
+        drag_start = (x, y)
+
+
+def on_drag(event):
+    global drag_start
+    x, y = scene.view.to_world(event.x, event.y)
+    if scene.selected is None or drag_start is None:
+        input_buffer.drag(x, y)
+        return
+    dx, dy = x - drag_start[0], y - drag_start[1]
+    drag_start = (x, y)
+    scene.move(scene.selected, dx, dy)
+    scene.canvas.move("selection", dx * scene.view.scale, dy * scene.view.scale)
+
+
+def on_release(event):
+    input_buffer.end()
+
+
+def on_delete(event):
+    if scene.selected is not None:
+        scene.remove(scene.selected)
+
+
+def on_right_click(event):
+    shape = scene.at(*scene.view.to_world(event.x, event.y))
+    if shape is not None:
+        scene.remove(shape)
+
+
+FILE_TYPES = [("Рисунок", "*.shapes"), ("JSON", "*.json")]
+
+
+def on_save(event=None):
+    path = filedialog.asksaveasfilename(defaultextension=".shapes", filetypes=FILE_TYPES)
+    if path:
+        save_shapes(scene.shapes.values(), path)
+
 
-canvas.bind("<Button-1>", on_click)
+def on_open(event=None):
+    global loader
+    path = filedialog.askopenfilename(filetypes=FILE_TYPES)
+    if not path:
+        return
+    if loader is not None:
+        loader.cancel()
 
-for i in range(0,1000,10):
-        line = Line(0, i, 1000, i)
-        line.draw()
-for i in range(0,1000,10):
-        line = Line(i, 0, i, 1000)
-        line.draw()
+    def on_error(error):
+        window.title("Фигуры")
+        messagebox.showerror("Ошибка", f"Не удалось открыть рисунок: {error}")
 
+    scene.clear()
+    window.title("Фигуры - загрузка...")
+    loader = SceneLoader(scene, load_shapes(path), on_done=lambda count: window.title(f"Фигуры - {path}"),
+                         on_error=on_error)
 
-x1,y1,x2,y2 = [700,700,900,900]
-rectangle = Rectangle(x1, y1, x2, y2)
-rectangle.draw()
 
-x1,y1,x2,y2 = [300,300,500,600]
-oval = Oval(x1, y1, x2, y2)
-oval.draw()
-x1,y1,x2,y2,x3,y3 = [100,50,400,200,200,400]
-triangle = Triangle(x1, y1, x2, y2, x3, y3)
-triangle.draw()
+def on_pan_start(event):
+    global pan_start
+    pan_start = (event.x, event.y)
 
-window.mainloop()
 
+def on_pan(event):
+    global pan_start
+    if pan_start is None:
+        return
+    scene.pan(event.x - pan_start[0], event.y - pan_start[1])
+    pan_start = (event.x, event.y)
+    grid.update_view()
 
 
+def on_wheel(event):
+    # Windows и macOS присылают delta, X11 - нажатия кнопок 4 и 5
+    up = event.delta > 0 if event.num not in (4, 5) else event.num == 4
+    factor = 1.25 if up else 0.8
+    if 0.01 <= scene.view.scale * factor <= 100:
+        scene.zoom(factor, event.x, event.y)
+        grid.update_view()
 
 
+def main():
+    global window, canvas, scene, input_buffer, grid
+    window = Tk()
+    window.geometry("1000x1000")
+    window.title('Фигуры')
+    canvas = tk.Canvas(window, width=1000, height=1000, bg="white")
+    canvas.pack()
 
+    scene = Scene(canvas)
+    input_buffer = InputBuffer(scene)
+    canvas.bind("<Button-1>", on_click)
+    canvas.bind("<B1-Motion>", on_drag)
+    canvas.bind("<ButtonRelease-1>", on_release)
+    canvas.bind("<Button-3>", on_right_click)
+    canvas.bind("<Button-2>", on_pan_start)
+    canvas.bind("<B2-Motion>", on_pan)
+    canvas.bind("<MouseWheel>", on_wheel)
+    canvas.bind("<Button-4>", on_wheel)
+    canvas.bind("<Button-5>", on_wheel)
+    window.bind("<Delete>", on_delete)
+    window.bind("<Control-s>", on_save)
+    window.bind("<Control-o>", on_open)
 
+    grid = Grid(canvas, step=10, view=scene.view)
 
+    x1,y1,x2,y2 = [700,700,900,900]
+    rectangle = scene.add(Rectangle(x1, y1, x2, y2))
 
+    x1,y1,x2,y2 = [300,300,500,600]
+    oval = scene.add(Oval(x1, y1, x2, y2))
+    x1,y1,x2,y2,x3,y3 = [100,50,400,200,200,400]
+    triangle = scene.add(Triangle(x1, y1, x2, y2, x3, y3))
 
+    window.mainloop()
 
 
+if __name__ == "__main__":
+    main()
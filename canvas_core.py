@@ -0,0 +1,519 @@
+"""
+Фигуры холста без графического интерфейса: классы фигур, масштаб вида, сохранение рисунков
+и растеризация в картинки через Pillow. Фигуры рисуют себя вызовами create_oval / create_line /
+create_rectangle / create_polygon, поэтому годятся и холст Tk, и ImageCanvas.
+Модуль не создает окон и может использоваться из консоли:
+
+    python canvas_core.py рисунок.shapes [...] -o папка [--size 1000x1000] [--jobs 4]
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+from array import array
+
+
+def segment_distance2(x, y, x1, y1, x2, y2):
+    """Квадрат расстояния от точки до отрезка"""
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx * dx + dy * dy
+    t = 0 if length2 == 0 else max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / length2))
+    px, py = x1 + t * dx, y1 + t * dy
+    return (x - px) ** 2 + (y - py) ** 2
+
+
+class View:
+    """Масштаб и сдвиг холста: экранная точка = (мировая - смещение) * масштаб"""
+    def __init__(self, scale=1.0, x=0.0, y=0.0):
+        self.scale = scale
+        self.x = x
+        self.y = y
+
+    def map(self, coords):
+        """Мировые координаты x0, y0, x1, y1, ... в экранные"""
+        s, ox, oy = self.scale, self.x, self.y
+        if s == 1 and ox == 0 and oy == 0:
+            return list(coords)
+        return [(c - ox) * s if i % 2 == 0 else (c - oy) * s for i, c in enumerate(coords)]
+
+    def to_world(self, x, y):
+        return x / self.scale + self.x, y / self.scale + self.y
+
+    def visible(self, width, height):
+        """Видимая область в мировых координатах"""
+        return self.x, self.y, self.x + width / self.scale, self.y + height / self.scale
+
+
+IDENTITY = View()
+
+
+class Point():
+    __slots__ = ("x", "y", "item", "key")
+    SIZE = 15
+    COLOR = "blue"
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.item = None
+        self.key = None
+
+    def coords(self):
+        return (self.x, self.y)
+
+    def draw(self, canvas, view=IDENTITY):
+        self.item = canvas.create_oval(*view.map(self.bbox()), fill="blue", outline="blue", tags="shape")
+        return self.item
+
+    def bbox(self):
+        return self.x, self.y, self.x + self.SIZE, self.y + self.SIZE
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+    def contains(self, x, y):
+        r = self.SIZE / 2
+        return (x - self.x - r) ** 2 + (y - self.y - r) ** 2 <= r * r
+
+
+class Line():
+    __slots__ = ("x1", "y1", "x2", "y2", "item", "key")
+    COLOR = "#EEE"
+    # Допуск попадания по линии в пикселях
+    TOLERANCE = 3
+
+    def __init__(self, x1, y1, x2, y2):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.item = None
+        self.key = None
+
+    def coords(self):
+        return (self.x1, self.y1, self.x2, self.y2)
+
+    def draw(self, canvas, view=IDENTITY):
+        self.item = canvas.create_line(*view.map((self.x1, self.y1, self.x2, self.y2)), fill="#EEE", tags="shape")
+        return self.item
+
+    def bbox(self):
+        t = self.TOLERANCE
+        return min(self.x1, self.x2) - t, min(self.y1, self.y2) - t, max(self.x1, self.x2) + t, max(self.y1, self.y2) + t
+
+    def move(self, dx, dy):
+        self.x1 += dx
+        self.y1 += dy
+        self.x2 += dx
+        self.y2 += dy
+
+    def contains(self, x, y):
+        return segment_distance2(x, y, self.x1, self.y1, self.x2, self.y2) <= self.TOLERANCE ** 2
+
+
+class Rectangle():
+    __slots__ = ("x1", "y1", "x2", "y2", "item", "key")
+    COLOR = "red"
+
+    def __init__(self, x1, y1, x2, y2):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.item = None
+        self.key = None
+
+    def coords(self):
+        return (self.x1, self.y1, self.x2, self.y2)
+
+    def draw(self, canvas, view=IDENTITY):
+        self.item = canvas.create_rectangle(*view.map((self.x1, self.y1, self.x2, self.y2)), fill="red", tags="shape")
+        return self.item
+
+    def bbox(self):
+        return min(self.x1, self.x2), min(self.y1, self.y2), max(self.x1, self.x2), max(self.y1, self.y2)
+
+    def move(self, dx, dy):
+        self.x1 += dx
+        self.y1 += dy
+        self.x2 += dx
+        self.y2 += dy
+
+    def contains(self, x, y):
+        x1, y1, x2, y2 = self.bbox()
+        return x1 <= x <= x2 and y1 <= y <= y2
+
+
+class Triangle:
+    __slots__ = ("x1", "y1", "x2", "y2", "x3", "y3", "item", "key")
+    COLOR = "blue"
+
+    def __init__(self, x1, y1, x2, y2, x3, y3):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.x3 = x3
+        self.y3 = y3
+        self.item = None
+        self.key = None
+
+    def coords(self):
+        return (self.x1, self.y1, self.x2, self.y2, self.x3, self.y3)
+
+    def draw(self, canvas, view=IDENTITY):
+        self.item = canvas.create_polygon(*view.map((self.x1, self.y1, self.x2, self.y2, self.x3, self.y3)),
+                                          fill = 'blue', tags="shape")
+        return self.item
+
+    def bbox(self):
+        xs, ys = (self.x1, self.x2, self.x3), (self.y1, self.y2, self.y3)
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def move(self, dx, dy):
+        self.x1 += dx
+        self.y1 += dy
+        self.x2 += dx
+        self.y2 += dy
+        self.x3 += dx
+        self.y3 += dy
+
+    def contains(self, x, y):
+        # Точка внутри, если она по одну сторону от всех трех сторон
+        def side(ax, ay, bx, by):
+            return (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+        d1 = side(self.x1, self.y1, self.x2, self.y2)
+        d2 = side(self.x2, self.y2, self.x3, self.y3)
+        d3 = side(self.x3, self.y3, self.x1, self.y1)
+        return not ((d1 < 0 or d2 < 0 or d3 < 0) and (d1 > 0 or d2 > 0 or d3 > 0))
+
+
+class Oval:
+    __slots__ = ("x1", "y1", "x2", "y2", "item", "key")
+    COLOR = "green"
+
+    def __init__(self, x1, y1, x2, y2):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.item = None
+        self.key = None
+
+    def coords(self):
+        return (self.x1, self.y1, self.x2, self.y2)
+
+    def draw(self, canvas, view=IDENTITY):
+        self.item = canvas.create_oval(*view.map((self.x1, self.y1, self.x2, self.y2)), fill="green", tags="shape")
+        return self.item
+
+    def bbox(self):
+        return min(self.x1, self.x2), min(self.y1, self.y2), max(self.x1, self.x2), max(self.y1, self.y2)
+
+    def move(self, dx, dy):
+        self.x1 += dx
+        self.y1 += dy
+        self.x2 += dx
+        self.y2 += dy
+
+    def contains(self, x, y):
+        x1, y1, x2, y2 = self.bbox()
+        rx, ry = (x2 - x1) / 2, (y2 - y1) / 2
+        if rx == 0 or ry == 0:
+            return False
+        return ((x - x1 - rx) / rx) ** 2 + ((y - y1 - ry) / ry) ** 2 <= 1
+
+
+class Polyline:
+    """Штрих, нарисованный мышью: координаты хранятся плоским массивом x0, y0, x1, y1, ..."""
+    __slots__ = ("points", "item", "key", "box")
+    WIDTH = 3
+    COLOR = "blue"
+
+    def __init__(self, points):
+        self.points = array("d", points)
+        self.item = None
+        self.key = None
+        self.box = None
+
+    def coords(self):
+        return self.points
+
+    def draw(self, canvas, view=IDENTITY):
+        self.item = canvas.create_line(*view.map(self.points), fill="blue", width=self.WIDTH,
+                                       capstyle="round", joinstyle="round", tags="shape")
+        return self.item
+
+    def extend(self, points):
+        self.points.extend(points)
+        self.box = None
+
+    def bbox(self):
+        if self.box is None:
+            xs, ys = self.points[0::2], self.points[1::2]
+            t = self.WIDTH
+            self.box = (min(xs) - t, min(ys) - t, max(xs) + t, max(ys) + t)
+        return self.box
+
+    def move(self, dx, dy):
+        for i in range(0, len(self.points), 2):
+            self.points[i] += dx
+            self.points[i + 1] += dy
+        self.box = None
+
+    def contains(self, x, y):
+        p = self.points
+        return any(segment_distance2(x, y, p[i], p[i + 1], p[i + 2], p[i + 3]) <= self.WIDTH ** 2
+                   for i in range(0, len(p) - 2, 2))
+
+
+# Типы фигур в файле рисунка: номер типа - позиция в списке
+SHAPE_TYPES = [Point, Line, Rectangle, Triangle, Oval, Polyline]
+SHAPE_CODES = {shape_type: code for code, shape_type in enumerate(SHAPE_TYPES)}
+# Двоичный формат: сигнатура, затем серии подряд идущих фигур одного типа:
+# номер типа (1 байт), число фигур (4 байта); у ломаных - число точек каждой (по 4 байта);
+# затем все координаты серии (double, little-endian)
+MAGIC = b"SHP1"
+RUN_HEADER = struct.Struct("<BI")
+
+
+def _runs(shapes):
+    """Разбиение последовательности фигур на серии одного типа с сохранением порядка"""
+    run = []
+    for shape in shapes:
+        if run and type(shape) is not type(run[0]):
+            yield run
+            run = []
+        run.append(shape)
+    if run:
+        yield run
+
+
+def save_shapes(shapes, path):
+    """Сохранение фигур: .json - текстом, иначе в компактном двоичном виде"""
+    if path.endswith(".json"):
+        data = [{"type": type(shape).__name__, "coords": list(shape.coords())} for shape in shapes]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"version": 1, "shapes": data}, file)
+        return
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        for run in _runs(shapes):
+            file.write(RUN_HEADER.pack(SHAPE_CODES[type(run[0])], len(run)))
+            if type(run[0]) is Polyline:
+                file.write(struct.pack(f"<{len(run)}I", *[len(shape.points) // 2 for shape in run]))
+            values = array("d")
+            for shape in run:
+                values.extend(shape.coords())
+            if sys.byteorder == "big":
+                values.byteswap()
+            file.write(values.tobytes())
+
+
+def load_shapes(path):
+    """
+    Фигуры из файла по одной (генератор) - их можно добавлять на холст порциями
+    Испорченный файл - ValueError (в том числе посреди чтения), ошибки чтения - OSError
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        types = {shape_type.__name__: shape_type for shape_type in SHAPE_TYPES}
+        try:
+            for record in data["shapes"]:
+                shape_type = types[record["type"]]
+                coords = record["coords"]
+                if shape_type is Polyline and (not coords or len(coords) % 2):
+                    raise ValueError(f"файл рисунка поврежден: у штриха {len(coords)} координат")
+                yield shape_type(coords) if shape_type is Polyline else shape_type(*coords)
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"файл рисунка поврежден: {e!r}") from e
+        return
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError("файл не является рисунком")
+    offset = len(MAGIC)
+    while offset < len(data):
+        if offset + RUN_HEADER.size > len(data):
+            raise ValueError("файл рисунка обрезан")
+        code, count = RUN_HEADER.unpack_from(data, offset)
+        offset += RUN_HEADER.size
+        if code >= len(SHAPE_TYPES):
+            raise ValueError(f"неизвестный тип фигуры {code}")
+        shape_type = SHAPE_TYPES[code]
+        if shape_type is Polyline:
+            if offset + 4 * count > len(data):
+                raise ValueError("файл рисунка обрезан")
+            lengths = struct.unpack_from(f"<{count}I", data, offset)
+            if 0 in lengths:
+                raise ValueError("файл рисунка поврежден: штрих без точек")
+            offset += 4 * count
+            size = 2 * sum(lengths)
+        else:
+            arity = shape_type.__init__.__code__.co_argcount - 1
+            lengths = None
+            size = arity * count
+        if offset + 8 * size > len(data):
+            raise ValueError("файл рисунка обрезан")
+        values = array("d", data[offset:offset + 8 * size])
+        if sys.byteorder == "big":
+            values.byteswap()
+        offset += 8 * size
+        if lengths is None:
+            for i in range(0, size, arity):
+                yield shape_type(*values[i:i + arity])
+        else:
+            position = 0
+            for length in lengths:
+                yield Polyline(values[position:position + 2 * length])
+                position += 2 * length
+
+
+class ImageCanvas:
+    """
+    Заменитель холста Tk для рисования без окна: те же вызовы create_*, но фигуры
+    растеризуются в картинку Pillow. Pillow нужен только здесь и импортируется при создании
+    """
+    def __init__(self, width, height, background="white"):
+        from PIL import Image, ImageDraw
+        self.width = width
+        self.height = height
+        # Цветов на рисунке немного: картинка с палитрой кодируется в PNG в разы быстрее RGB
+        self.image = Image.new("P", (width, height), background)
+        self.draw = ImageDraw.Draw(self.image)
+        self.next_item = 1
+
+    def _item(self):
+        self.next_item += 1
+        return self.next_item - 1
+
+    @staticmethod
+    def _box(coords):
+        x1, y1, x2, y2 = coords
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+    # Значения по умолчанию как у Tk: у овала и прямоугольника черный контур,
+    # у линии черный цвет, у многоугольника черная заливка без контура
+    def create_oval(self, *coords, fill=None, outline="black", width=1, **options):
+        self.draw.ellipse(self._box(coords), fill=fill or None, outline=outline or None, width=round(width))
+        return self._item()
+
+    def create_rectangle(self, *coords, fill=None, outline="black", width=1, **options):
+        self.draw.rectangle(self._box(coords), fill=fill or None, outline=outline or None, width=round(width))
+        return self._item()
+
+    def create_polygon(self, *coords, fill="black", outline=None, width=1, **options):
+        self.draw.polygon(list(coords), fill=fill or None, outline=outline or None, width=round(width))
+        return self._item()
+
+    def create_line(self, *coords, fill="black", width=1, capstyle=None, joinstyle=None, **options):
+        width = max(1, round(width))
+        if len(coords) >= 4:
+            self.draw.line(list(coords), fill=fill, width=width, joint="curve" if joinstyle == "round" else None)
+        if capstyle == "round" and width > 2:
+            # Скругленные концы - кружки диаметром в толщину линии
+            r = width / 2
+            for x, y in ((coords[0], coords[1]), (coords[-2], coords[-1])):
+                self.draw.ellipse((x - r, y - r, x + r, y + r), fill=fill)
+        return self._item()
+
+    def grid(self, step, color="#EEE", view=None):
+        """Сетка с шагом step мировых единиц, как у окна с холстом"""
+        view = view or IDENTITY
+        step *= view.scale
+        if step < 1:
+            return
+        x = -(view.x * view.scale) % step
+        while x < self.width:
+            self.draw.line((round(x), 0, round(x), self.height), fill=color)
+            x += step
+        y = -(view.y * view.scale) % step
+        while y < self.height:
+            self.draw.line((0, round(y), self.width, round(y)), fill=color)
+            y += step
+
+    def save(self, path):
+        self.image.save(path)
+
+
+def render_shapes(shapes, width, height, view=None, grid_step=10, background="white"):
+    """Картинка Pillow с фигурами в порядке их следования (последние - сверху)"""
+    view = view or IDENTITY
+    target = ImageCanvas(width, height, background)
+    if grid_step:
+        target.grid(grid_step, view=view)
+    x1, y1, x2, y2 = view.visible(width, height)
+    for shape in shapes:
+        sx1, sy1, sx2, sy2 = shape.bbox()
+        if sx1 <= x2 and sx2 >= x1 and sy1 <= y2 and sy2 >= y1:
+            shape.draw(target, view)
+    return target.image
+
+
+def render_file(source, target, width=1000, height=1000, grid_step=10, fit=False):
+    """
+    Рисунок из файла в картинку (формат - по расширению target)
+    fit=True подбирает масштаб и сдвиг так, чтобы поместились все фигуры
+    """
+    shapes = list(load_shapes(source))
+    view = None
+    if fit and shapes:
+        boxes = [shape.bbox() for shape in shapes]
+        x1, y1 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        x2, y2 = max(b[2] for b in boxes), max(b[3] for b in boxes)
+        scale = min(width / max(x2 - x1, 1), height / max(y2 - y1, 1))
+        view = View(scale, x1, y1)
+    render_shapes(shapes, width, height, view, grid_step).save(target)
+    return target
+
+
+def _render_job(job):
+    source, target, width, height, grid_step, fit = job
+    try:
+        render_file(source, target, width, height, grid_step, fit)
+    except (OSError, ValueError) as e:
+        return f"{source}: ошибка: {e}"
+    return None
+
+
+def main(argv=None):
+    """Консольная растеризация рисунков; несколько файлов обрабатываются параллельно в процессах"""
+    parser = argparse.ArgumentParser(description="Рисунки холста в картинки без графического интерфейса")
+    parser.add_argument("files", nargs="+", help="рисунки (.shapes или .json)")
+    parser.add_argument("-o", "--output", default=".", help="папка для картинок (по умолчанию текущая)")
+    parser.add_argument("--format", default="png", help="формат картинок (по умолчанию png)")
+    parser.add_argument("--size", default="1000x1000", help="размер картинки ШИРИНАxВЫСОТА")
+    parser.add_argument("--grid", type=int, default=10, help="шаг сетки, 0 - без сетки")
+    parser.add_argument("--fit", action="store_true", help="уместить все фигуры в картинку")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="число процессов (по умолчанию - по числу ядер)")
+    args = parser.parse_args(argv)
+    try:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+    except ValueError:
+        parser.error("размер задается как ШИРИНАxВЫСОТА, например 800x600")
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = []
+    for source in args.files:
+        name = os.path.splitext(os.path.basename(source))[0]
+        target = os.path.join(args.output, f"{name}.{args.format}")
+        jobs.append((source, target, width, height, args.grid, args.fit))
+
+    if len(jobs) == 1 or args.jobs == 1:
+        errors = [error for error in map(_render_job, jobs) if error]
+    else:
+        # Пул процессов нужен только консольному запуску - не замедляет импорт модуля
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(args.jobs) as pool:
+            errors = [error for error in pool.map(_render_job, jobs, chunksize=8) if error]
+    for error in errors:
+        print(error, file=sys.stderr)
+    print(f"Готово картинок: {len(jobs) - len(errors)} из {len(jobs)}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Общее окно всех решателей: одно приложение Qt, вкладка на каждую задачу
+Вкладки создаются при первом открытии, поэтому запуск не ждет загрузки всех решателей.
+Решатели работают в одном процессе: общий кэш ответов (result_cache) и кэши их ядер
+сохраняются между задачами, а долгие вычисления идут в общем пуле потоков.
+Интерфейсы задач 2 и 15, написанные на Tk, перенесены сюда на Qt поверх их ядер
+
+    python launcher.py [--cache-mb 64] [--cache-file ответы.sqlite]
+"""
+import argparse
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QButtonGroup, QHBoxLayout, QHeaderView, QLabel,
+                               QLineEdit, QMainWindow, QMessageBox, QPlainTextEdit, QPushButton, QRadioButton,
+                               QTableWidget, QTableWidgetItem, QTabWidget, QVBoxLayout, QWidget)
+from PySide6.QtCore import QTimer, Qt
+from PySide6.QtGui import QCloseEvent, QFont
+
+from result_cache import shared_cache
+from task_pool import SolverTask, check_cancelled, run_in_pool
+
+
+def _stop_task(task: Optional[SolverTask]) -> None:
+    """Отмена фонового вычисления вкладки и ожидание его остановки"""
+    if task is not None:
+        task.cancel()
+        task.wait()
+
+
+class SegmentsTab(QWidget):
+    """Задание 15 (отрезки, ДЕЛ, x & A) - перенос интерфейса sover_15.py на Qt"""
+
+    def __init__(self):
+        from sover_15_core import SYMBOLS
+
+        super().__init__()
+        # Фоновое решение (None - не выполняется)
+        self.task: Optional[SolverTask] = None
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(self._title("1. Отрезки (имя = [начало, конец]; ...)"))
+        self.segments_edit = QLineEdit("P = [5, 30]; Q = [14, 23]")
+        layout.addWidget(self.segments_edit)
+        hint = QLabel("Для задач с ДЕЛ(x, A) и x & A ≠ 0 отрезки не нужны")
+        hint.setStyleSheet("color: #666666;")
+        layout.addWidget(hint)
+
+        layout.addWidget(self._title("2. Логическое выражение (F(x) ≡ 1)"))
+        self.formula_edit = QLineEdit("((x in P) == (x in Q)) -> (not (x in A))")
+        layout.addWidget(self.formula_edit)
+        symbols_layout = QHBoxLayout()
+        for text, symbol in SYMBOLS:
+            button = QPushButton(text)
+            button.clicked.connect(lambda checked=False, s=symbol: self.insert_symbol(s))
+            symbols_layout.addWidget(button)
+        symbols_layout.addStretch()
+        layout.addLayout(symbols_layout)
+
+        layout.addWidget(self._title("3. Найти"))
+        mode_layout = QHBoxLayout()
+        self.max_radio = QRadioButton("Наибольшее A (длину отрезка или делитель)")
+        self.max_radio.setChecked(True)
+        self.min_radio = QRadioButton("Наименьшее A")
+        self.mode_group = QButtonGroup(self)
+        for radio in (self.max_radio, self.min_radio):
+            self.mode_group.addButton(radio)
+            mode_layout.addWidget(radio)
+        mode_layout.addStretch()
+        layout.addLayout(mode_layout)
+
+        self.solve_btn = QPushButton("Решить")
+        self.solve_btn.clicked.connect(self.solve)
+        layout.addWidget(self.solve_btn)
+
+        layout.addWidget(self._title("4. Результат"))
+        self.result_text = QPlainTextEdit()
+        self.result_text.setReadOnly(True)
+        self.result_text.setFont(QFont("Consolas", 10))
+        layout.addWidget(self.result_text, 1)
+
+    @staticmethod
+    def _title(text: str) -> QLabel:
+        label = QLabel(text)
+        label.setStyleSheet("font-size: 12pt; font-weight: bold;")
+        return label
+
+    def insert_symbol(self, symbol: str):
+        self.formula_edit.insert(symbol)
+        self.formula_edit.setFocus()
+
+    def solve(self):
+        """Решение в общем пуле потоков; отчет выводится одной вставкой"""
+        from sover_15_core import parse_segments
+
+        try:
+            segments = parse_segments(self.segments_edit.text())
+        except ValueError as e:
+            QMessageBox.critical(self, "Ошибка", f"Некорректные отрезки: {e}")
+            return
+        formula = self.formula_edit.text().strip()
+        mode = "max" if self.max_radio.isChecked() else "min"
+        self.solve_btn.setEnabled(False)
+        self.result_text.setPlainText("⏳ Решение...")
+        self.task = run_in_pool(_segments_report, (segments, formula, mode), self._on_finished, self._on_failed)
+
+    def _on_finished(self, report: str):
+        self.task = None
+        self.solve_btn.setEnabled(True)
+        self.result_text.setPlainText(report)
+
+    def _on_failed(self, message: str):
+        self.task = None
+        self.solve_btn.setEnabled(True)
+        self.result_text.clear()
+        QMessageBox.critical(self, "Ошибка", f"Некорректное выражение: {message}")
+
+    def closeEvent(self, event: QCloseEvent):
+        """Отмена фонового решения при закрытии"""
+        _stop_task(self.task)
+        super().closeEvent(event)
+
+
+def _segments_report(segments: Dict[str, Tuple[int, int]], formula: str, mode: str) -> str:
+    from sover_15_core import solve_task, task_report
+
+    return "\n".join(task_report(segments, formula, mode, solve_task(segments, formula, mode, check_cancelled)))
+
+
+class TruthTableTab(QWidget):
+    """Задание 2 (фрагмент таблицы истинности) - перенос интерфейса solver_2.py на Qt"""
+
+    def __init__(self):
+        super().__init__()
+        self.variables: List[str] = []
+        self.table: List[List[int]] = []
+        # Фоновый перебор (None - не выполняется)
+        self.task: Optional[SolverTask] = None
+
+        layout = QVBoxLayout(self)
+        formula_layout = QHBoxLayout()
+        formula_layout.addWidget(QLabel("Формула:"))
+        self.formula_edit = QLineEdit("(x ∧ ¬y) ∨ (y ≡ z) ∨ ¬w")
+        formula_layout.addWidget(self.formula_edit, 1)
+        build_btn = QPushButton("Продолжить")
+        build_btn.clicked.connect(self.build_table)
+        formula_layout.addWidget(build_btn)
+        layout.addLayout(formula_layout)
+
+        tables_layout = QHBoxLayout()
+        self.truth_view = QTableWidget()
+        self.truth_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.truth_view.verticalHeader().hide()
+        tables_layout.addWidget(self.truth_view, 1)
+
+        fragment_layout = QVBoxLayout()
+        fragment_layout.addWidget(QLabel("Фрагмент таблицы (пустая клетка - значение неизвестно):"))
+        self.fragment = QTableWidget(1, 0)
+        self.fragment.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        fragment_layout.addWidget(self.fragment, 1)
+        buttons_layout = QHBoxLayout()
+        add_row_btn = QPushButton("Добавить ряд")
+        add_row_btn.clicked.connect(lambda: self.fragment.insertRow(self.fragment.rowCount()))
+        buttons_layout.addWidget(add_row_btn)
+        self.solve_btn = QPushButton("Решить")
+        self.solve_btn.setEnabled(False)
+        self.solve_btn.clicked.connect(self.solve)
+        buttons_layout.addWidget(self.solve_btn)
+        fragment_layout.addLayout(buttons_layout)
+        self.answer_label = QLabel()
+        self.answer_label.setStyleSheet("font-size: 12pt; font-weight: bold;")
+        fragment_layout.addWidget(self.answer_label)
+        tables_layout.addLayout(fragment_layout, 1)
+        layout.addLayout(tables_layout, 1)
+
+    def build_table(self):
+        """Таблица истинности формулы и пустой фрагмент с тем же числом столбцов"""
+        from solver_2_core import formula_variables, truth_table
+
+        form = self.formula_edit.text()
+        try:
+            table = truth_table(form)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Некорректная формула: {e}")
+            return
+        self.variables = formula_variables(form)
+        self.table = table
+        columns = self.variables + ["F"]
+
+        self.truth_view.clear()
+        self.truth_view.setColumnCount(len(columns))
+        self.truth_view.setRowCount(len(table))
+        self.truth_view.setHorizontalHeaderLabels(columns)
+        for r, row in enumerate(table):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem(str(value))
+                item.setTextAlignment(Qt.AlignCenter)
+                self.truth_view.setItem(r, c, item)
+
+        self.fragment.clear()
+        self.fragment.setRowCount(1)
+        self.fragment.setColumnCount(len(columns))
+        self.fragment.setHorizontalHeaderLabels(["?"] * (len(columns) - 1) + ["F"])
+        self.answer_label.clear()
+        self.solve_btn.setEnabled(True)
+
+    def get_matrix(self) -> List[List[Optional[int]]]:
+        """Значения фрагмента; None - клетка не заполнена"""
+        matrix = []
+        for r in range(self.fragment.rowCount()):
+            row = []
+            for c in range(self.fragment.columnCount()):
+                item = self.fragment.item(r, c)
+                text = item.text().strip() if item is not None else ""
+                row.append(int(text) if text else None)
+            matrix.append(row)
+        return matrix
+
+    def solve(self):
+        try:
+            matrix = self.get_matrix()
+        except ValueError:
+            QMessageBox.critical(self, "Ошибка", "Во фрагменте допускаются только 0, 1 и пустые клетки")
+            return
+        self.solve_btn.setEnabled(False)
+        self.answer_label.setText("⏳ Перебор...")
+        self.task = run_in_pool(_fragment_columns, (matrix, self.table), self._on_finished, self._on_failed)
+
+    def _on_finished(self, col_perm: Optional[tuple]):
+        self.task = None
+        self.solve_btn.setEnabled(True)
+        if col_perm is None:
+            self.answer_label.setText("Решение не найдено")
+            return
+        self.answer_label.setText("Ответ: " + "".join(self.variables[i] for i in col_perm))
+
+    def _on_failed(self, message: str):
+        self.task = None
+        self.solve_btn.setEnabled(True)
+        self.answer_label.clear()
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при решении: {message}")
+
+    def closeEvent(self, event: QCloseEvent):
+        """Отмена фонового перебора при закрытии"""
+        _stop_task(self.task)
+        super().closeEvent(event)
+
+
+def _fragment_columns(matrix: List[List[Optional[int]]], table: List[List[int]]) -> Optional[tuple]:
+    from solver_2_core import Solver
+
+    ans, row_perm, col_perm = Solver(matrix, table).solve(check_cancelled)
+    return col_perm
+
+
+def _graph_tab() -> QWidget:
+    from solver_1 import GraphSolverApp
+
+    return GraphSolverApp()
+
+
+def _game_theory_tab() -> QWidget:
+    from solver_game_theory import GameTheorySolverApp
+
+    return GameTheorySolverApp()
+
+
+class LauncherWindow(QMainWindow):
+    """Главное окно: вкладки решателей создаются при первом переходе на них"""
+
+    TABS: List[Tuple[str, Callable[[], QWidget]]] = [
+        ("Схема и таблица (1)", _graph_tab),
+        ("Таблица истинности (2)", TruthTableTab),
+        ("Отрезки (15)", SegmentsTab),
+        ("Теория игр (19-21)", _game_theory_tab),
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Решатели ЕГЭ")
+        self.resize(1400, 850)
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+        self.built: Dict[int, QWidget] = {}
+        for title, factory in self.TABS:
+            placeholder = QWidget()
+            QVBoxLayout(placeholder).setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(placeholder, title)
+        self.tabs.currentChanged.connect(self._ensure_tab)
+        self._ensure_tab(self.tabs.currentIndex())
+
+        # Статистика общего кэша результатов в строке состояния
+        self.cache_timer = QTimer(self)
+        self.cache_timer.timeout.connect(self._show_cache_stats)
+        self.cache_timer.start(1000)
+        self._show_cache_stats()
+
+    def _show_cache_stats(self):
+        stats = shared_cache.stats()
+        self.statusBar().showMessage(
+            f"Кэш: {stats['entries']} ответов, {stats['bytes'] / 1024:.0f} КБ; "
+            f"попаданий {stats['hits']} (с диска {stats['disk_hits']}), промахов {stats['misses']}, "
+            f"вытеснено {stats['evictions']}")
+
+    def closeEvent(self, event: QCloseEvent):
+        """
+        Закрытие созданных вкладок до выхода из приложения: решатели отменяют
+        фоновые вычисления и дожидаются их, иначе поток остался бы работать
+        """
+        for widget in self.built.values():
+            if not widget.close():
+                event.ignore()
+                return
+        super().closeEvent(event)
+
+    def _ensure_tab(self, index: int):
+        if index < 0 or index in self.built:
+            return
+        widget = self.TABS[index][1]()
+        if isinstance(widget, QMainWindow):
+            # Окно отдельного приложения встраивается во вкладку как обычный виджет
+            widget.setWindowFlags(Qt.Widget)
+        self.tabs.widget(index).layout().addWidget(widget)
+        self.built[index] = widget
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Общее окно решателей ЕГЭ")
+    parser.add_argument("--cache-mb", type=int, default=64, help="объем общего кэша ответов в памяти, МБ")
+    parser.add_argument("--cache-file", help="файл sqlite для ответов, вытесненных из памяти")
+    args, qt_args = parser.parse_known_args(argv)
+    shared_cache.configure(args.cache_mb * 1024 * 1024, args.cache_file)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    app.setStyle("Fusion")
+    window = LauncherWindow()
+    window.show()
+    code = app.exec()
+    shared_cache.flush()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
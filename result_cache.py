@@ -0,0 +1,150 @@
+"""
+Общий кэш результатов решателей
+Ключ - нормализованный вид входных данных задачи (кортеж из чисел, строк и кортежей),
+первый элемент ключа - имя решателя. Значения хранятся сериализованными (pickle):
+так известен их размер в байтах, а изменение возвращенного результата не портит кэш.
+Память ограничена по объему; вытесненные записи при заданном файле сохраняются в sqlite
+и поднимаются обратно в память при следующем обращении
+"""
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Ключ записи: (имя решателя, нормализованные входные данные...)
+CacheKey = Tuple[Hashable, ...]
+
+
+class ResultCache:
+    """
+    LRU-кэш с ограничением по байтам и необязательным вытеснением на диск
+    Безопасен для вызова из нескольких потоков (общий пул потоков приложения)
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._items: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(key: CacheKey) -> str:
+        """Ключ записи в файле: хэш текстового вида ключа"""
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def _database(self):
+        if self._db is None and self.path:
+            import sqlite3
+
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+        return self._db
+
+    def get(self, key: CacheKey, default: Any = None) -> Any:
+        """Результат из кэша (default - нет ни в памяти, ни на диске)"""
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(data)
+            db = self._database()
+            if db is not None:
+                row = db.execute("SELECT value FROM results WHERE key = ?", (self._digest(key),)).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    self._store(key, row[0])
+                    return pickle.loads(row[0])
+            self.misses += 1
+            return default
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        """Сохранение результата с вытеснением самых давно использованных записей"""
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, data)
+
+    def _store(self, key: CacheKey, data: bytes) -> None:
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        if len(data) > self.max_bytes:
+            # Запись больше всей памяти кэша - сразу на диск
+            self._spill([(key, data)])
+            return
+        self._items[key] = data
+        self._bytes += len(data)
+        self._shrink()
+
+    def _shrink(self) -> None:
+        evicted = []
+        while self._bytes > self.max_bytes:
+            old_key, old_data = self._items.popitem(last=False)
+            self._bytes -= len(old_data)
+            evicted.append((old_key, old_data))
+        self.evictions += len(evicted)
+        self._spill(evicted)
+
+    def _spill(self, records) -> None:
+        db = self._database()
+        if db is not None and records:
+            db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?)",
+                           [(self._digest(key), data) for key, data in records])
+            db.commit()
+
+    def flush(self) -> None:
+        """Запись всех ответов из памяти в файл (если он задан) - для следующих запусков"""
+        with self._lock:
+            self._spill(list(self._items.items()))
+
+    def configure(self, max_bytes: Optional[int] = None, path: Optional[str] = None) -> None:
+        """Изменение объема памяти и файла вытеснения (None в path - без файла)"""
+        with self._lock:
+            if path != self.path:
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+                self.path = path
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+                self._shrink()
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], Any]) -> Any:
+        """
+        Результат из кэша или вычисленный compute() и сохраненный
+        Исключения compute() проходят насквозь и не кэшируются
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Очистка памяти и файла кэша; статистика сохраняется"""
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            db = self._database()
+            if db is not None:
+                db.execute("DELETE FROM results")
+                db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика обращений и заполнения"""
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "entries": len(self._items), "bytes": self._bytes}
+
+
+# Общий кэш всех решателей процесса (в общем окне - один на все вкладки)
+shared_cache = ResultCache()
+
@@ -1,123 +1,144 @@
+import copy
 import itertools
-from typing import Dict, List, Tuple, Optional
-from PySide6.QtWidgets import *
-from PySide6.QtCore import *
-from PySide6.QtGui import *
-
-
-class Graph:
+import re
+import time
+from typing import Dict, Iterator, List, Set, Tuple, Optional
+import numpy as np
+from PySide6.QtWidgets import (QApplication, QCheckBox, QComboBox, QFileDialog, QGroupBox, QHBoxLayout,
+                               QLabel, QLineEdit, QMainWindow, QPushButton, QSpinBox,
+                               QTableView, QVBoxLayout, QWidget)
+from PySide6.QtCore import (QAbstractTableModel, QEvent, QModelIndex, QObject, QPointF, QRect, QRectF, Qt,
+                            Signal)
+from PySide6.QtGui import (QBrush, QCloseEvent, QColor, QFont, QFontMetrics, QKeyEvent, QKeySequence,
+                           QMouseEvent, QPaintEvent, QPainter, QPalette, QPen, QPixmap, QPolygonF,
+                           QRadialGradient, QResizeEvent)
+
+from solver_1_core import (Graph, PathCounter, RouteQueryEngine, SearchCancelled, format_weight_table,
+                           has_labels, parse_weight_table, weight_matrix)
+from task_pool import SolverTask, run_in_pool
+
+
+class SpatialGrid:
     """
-    Класс для представления графа дорог между населенными пунктами
-    Хранит узлы (пункты) и ребра (дороги) - факт наличия дороги, без длин
+    Пространственный индекс - равномерная сетка квадратных ячеек
+    Объект заносится во все ячейки, которые задевает его область (с допуском),
+    поэтому поиск по точке просматривает только одну ячейку
     """
 
-    def __init__(self):
-        # Список всех узлов графа (русские буквы: А, Б, В...)
-        self.nodes: List[str] = []
-        # Множество рёбер: наличие дороги между пунктами
-        self.edges: set = set()
-        # Матрица смежности: 1 - есть дорога, 0 - нет дороги
-        self.adjacency_matrix: List[List[int]] = []
-
-    def add_node(self, node: str) -> None:
-        """Добавление нового населенного пункта в граф"""
-        if node not in self.nodes:
-            self.nodes.append(node)
-            self._update_adjacency_matrix()
-
-    def add_edge(self, node1: str, node2: str) -> None:
-        """Добавление дороги между двумя пунктами"""
-        # Сортируем имена узлов для единообразия (А,Б) и (Б,А) - одно ребро
-        edge = tuple(sorted([node1, node2]))
-        self.edges.add(edge)
-
-        # Автоматически добавляем узлы, если их еще нет
-        if node1 not in self.nodes:
-            self.add_node(node1)
-        if node2 not in self.nodes:
-            self.add_node(node2)
-
-        self._update_adjacency_matrix()
-
-    def _update_adjacency_matrix(self) -> None:
-        """Обновление матрицы смежности после изменений в графе"""
-        n = len(self.nodes)
-        # Создаем новую матрицу N×N, заполненную 0 (отсутствие дороги)
-        self.adjacency_matrix = [[0] * n for _ in range(n)]
-
-        # Заполняем матрицу данными о дорогах
-        for (node1, node2) in self.edges:
-            i = self.nodes.index(node1)
-            j = self.nodes.index(node2)
-            # Граф неориентированный, поэтому заполняем симметрично
-            self.adjacency_matrix[i][j] = 1
-            self.adjacency_matrix[j][i] = 1
-
-    def find_isomorphism(self, table_matrix: List[List[Optional[int]]], table_labels: List[str]) -> Dict[str, str]:
-        """
-        Поиск изоморфизма - соответствия между узлами нашего графа и узлами из таблицы
-        В задаче всегда есть правильный ответ, поэтому всегда возвращает соответствие
-        """
-        # Перебираем все возможные перестановки узлов нашего графа
-        for permutation in itertools.permutations(self.nodes):
-            # Создаем словарь соответствия
-            mapping = dict(zip(permutation, table_labels))
-
-            # Проверяем, подходит ли это соответствие
-            if self._check_mapping(mapping, table_matrix):
-                return mapping
-
-        # Если дошли сюда, значит решение должно быть, но не найдено
-        # В реальной задаче это не должно происходить
-        return dict(zip(self.nodes, table_labels))
-
-    def _check_mapping(self, mapping: Dict[str, str], table_matrix: List[List[Optional[int]]]) -> bool:
-        """
-        Проверка корректности соответствия между графом и таблицей
-        mapping: словарь {узел_графа: узел_таблицы}
-        table_matrix: матрица смежности из условия задачи (с длинами дорог)
-        """
-        n = len(self.nodes)
-        table_labels = list(mapping.values())
-
-        # Проверяем все пары узлов
-        for i in range(n):
-            for j in range(n):
-                graph_node1 = self.nodes[i]
-                graph_node2 = self.nodes[j]
-
-                # Каким узлам таблицы они соответствуют
-                table_node1 = mapping[graph_node1]
-                table_node2 = mapping[graph_node2]
-
-                # Находим индексы в таблице
-                table_i = table_labels.index(table_node1)
-                table_j = table_labels.index(table_node2)
-
-                # Получаем информацию о дорогах
-                graph_has_road = self.adjacency_matrix[i][j]  # 1 - есть дорога, 0 - нет
-                table_has_road = table_matrix[table_i][table_j] is not None  # True - есть дорога
-
-                # Структура дорог должна совпадать
-                if graph_has_road != table_has_road:
-                    return False  # Найдено несоответствие в структуре дорог
-
-        return True  # Все проверки пройдены
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], set] = {}  # Ячейка -> ключи объектов
+        self._item_cells: Dict[object, set] = {}  # Ключ объекта -> его ячейки
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _box_cells(self, x1: float, y1: float, x2: float, y2: float) -> set:
+        """Ячейки, пересекающие прямоугольник"""
+        cx1, cy1 = self._cell(x1, y1)
+        cx2, cy2 = self._cell(x2, y2)
+        return {(cx, cy) for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1)}
+
+    def insert_point(self, key, x: float, y: float, radius: float) -> None:
+        """Добавление (или перемещение) круга с центром (x, y)"""
+        self._insert(key, self._box_cells(x - radius, y - radius, x + radius, y + radius))
+
+    def insert_segment(self, key, x1: float, y1: float, x2: float, y2: float, tolerance: float) -> None:
+        """Добавление (или перемещение) отрезка с допуском tolerance по обе стороны"""
+        length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+        # Точки отрезка с шагом в половину ячейки - каждая задевает не больше 4 ячеек
+        steps = max(1, int(length / (self.cell_size / 2)))
+        cells = set()
+        for k in range(steps + 1):
+            x = x1 + (x2 - x1) * k / steps
+            y = y1 + (y2 - y1) * k / steps
+            cells |= self._box_cells(x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+        self._insert(key, cells)
+
+    def _insert(self, key, cells: set) -> None:
+        self.remove(key)
+        self._item_cells[key] = cells
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key) -> None:
+        """Удаление объекта из индекса (если он там есть)"""
+        for cell in self._item_cells.pop(key, ()):
+            bucket = self._cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def query(self, x: float, y: float) -> set:
+        """Объекты, которые могут находиться рядом с точкой (x, y)"""
+        return self._cells.get(self._cell(x, y), set())
+
+    def clear(self) -> None:
+        """Очистка индекса"""
+        self._cells.clear()
+        self._item_cells.clear()
 
 
 class GraphCanvas(QWidget):
     """
     Виджет для рисования графа
     Позволяет визуально создавать пункты и дороги
+    Дороги и пункты рисуются в кэшированный слой, который перестраивается
+    только при изменении графа; выделение рисуется поверх слоя
     """
 
+    # Пункты или дороги добавлены либо удалены (перенос пункта граф не меняет)
+    graphChanged = Signal()
+
+    NODE_RADIUS = 20
+    # Отступ области перерисовки вокруг узла: тень и толщина обводки
+    NODE_MARGIN = 4
+    # Расстояние до дороги, на котором клик считается попаданием в нее
+    EDGE_TOLERANCE = 6
+    # Смещение мыши, после которого нажатие на пункт считается перетаскиванием
+    DRAG_THRESHOLD = 4
+    # Размер стрелки односторонней дороги и разнос встречных дорог
+    ARROW_SIZE = 12
+    ARC_OFFSET = 4
+
     def __init__(self, graph: Graph, parent=None):
         super().__init__(parent)
         self.graph = graph  # Ссылка на объект графа
         self.node_positions = {}  # Позиции узлов на холсте: {имя: (x, y)}
         self.selected_nodes = []  # Список выделенных узлов
+        self.directed_mode = False  # Новые дороги - односторонние
+
+        # Пространственные индексы для поиска пункта или дороги под курсором
+        self._node_index = SpatialGrid(2 * self.NODE_RADIUS)
+        self._edge_index = SpatialGrid(2 * self.NODE_RADIUS)
+        # Дороги каждого пункта: перенос пункта обновляет только их, не просматривая все дороги
+        self._incident: Dict[str, Set[Tuple[str, str]]] = {}
+        # Пункт или дорога под курсором (подсвечивается)
+        self._hovered: Optional[Tuple[str, object]] = None
+        # Перетаскивание: пункт, позиция нажатия и признак начавшегося переноса
+        self._pressed_node: Optional[str] = None
+        self._press_position: Tuple[float, float] = (0, 0)
+        self._dragging = False
+
+        # Кэшированный слой с дорогами и пунктами (None - нужно перестроить)
+        self._static_layer: Optional[QPixmap] = None
+
+        # Объекты рисования создаются один раз. Градиенты заданы относительно
+        # центра узла - перед рисованием узла система координат сдвигается в его центр
+        self._edge_pen = QPen(QColor("#495057"), 3, Qt.SolidLine, Qt.RoundCap)
+        self._hover_edge_pen = QPen(QColor("#4dabf7"), 5, Qt.SolidLine, Qt.RoundCap)
+        self._hover_node_pen = QPen(QColor("#4dabf7"), 2, Qt.DashLine)
+        self._shadow_brush = QBrush(QColor(0, 0, 0, 30))
+        self._node_brush = self._make_node_brush("#74c0fc", "#4dabf7")
+        self._node_pen = QPen(QColor("#1c7ed6"), 2)
+        self._selected_brush = self._make_node_brush("#51cf66", "#40c057")
+        self._selected_pen = QPen(QColor("#2f9e44"), 3)
+        self._text_pen = QPen(QColor("#ffffff"))
+        self._font = QFont("Segoe UI", 14, QFont.Bold)
+        self._font_metrics = QFontMetrics(self._font)
 
         self.setMinimumSize(600, 400)
+        self.setMouseTracking(True)
         self.setStyleSheet("""
             QWidget {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
@@ -126,26 +147,209 @@ class GraphCanvas(QWidget):
             }
         """)
 
+    @staticmethod
+    def _make_node_brush(inner: str, outer: str) -> QBrush:
+        """Радиальная заливка узла относительно его центра"""
+        gradient = QRadialGradient(0, -5, 25)
+        gradient.setColorAt(0, QColor(inner))
+        gradient.setColorAt(1, QColor(outer))
+        return QBrush(gradient)
+
+    def reset(self, graph: Graph):
+        """Замена графа с очисткой позиций и выделения"""
+        self.graph = graph
+        self.node_positions = {}
+        self.selected_nodes = []
+        self._node_index.clear()
+        self._edge_index.clear()
+        self._incident.clear()
+        self._hovered = None
+        self._pressed_node = None
+        self._dragging = False
+        self.invalidate_layers()
+
+    def invalidate_layers(self):
+        """Граф изменился: кэшированный слой будет перестроен при перерисовке"""
+        self._static_layer = None
+        self.update()
+
+    def _node_rect(self, node: str) -> QRect:
+        """Область холста, занимаемая узлом (с тенью и обводкой)"""
+        x, y = self.node_positions[node]
+        size = self.NODE_RADIUS + self.NODE_MARGIN
+        return QRect(int(x) - size, int(y) - size, 2 * size + 1, 2 * size + 1)
+
+    def _edge_rect(self, edge: Tuple[str, str]) -> QRect:
+        """Область холста, занимаемая дорогой (с подсветкой)"""
+        (x1, y1), (x2, y2) = self.node_positions[edge[0]], self.node_positions[edge[1]]
+        margin = self.EDGE_TOLERANCE
+        return QRect(int(min(x1, x2)) - margin, int(min(y1, y2)) - margin,
+                     int(abs(x2 - x1)) + 2 * margin + 1, int(abs(y2 - y1)) + 2 * margin + 1)
+
+    def _hover_rect(self, hovered: Optional[Tuple[str, object]]) -> QRect:
+        """Область подсветки пункта или дороги"""
+        if hovered is None:
+            return QRect()
+        kind, key = hovered
+        return self._node_rect(key) if kind == "node" else self._edge_rect(key)
+
+    def _index_node(self, node: str):
+        """Обновление индексов для пункта и всех его дорог"""
+        x, y = self.node_positions[node]
+        self._node_index.insert_point(node, x, y, self.NODE_RADIUS)
+        for edge in self._incident.get(node, ()):
+            self._index_edge(edge)
+
+    def _index_edge(self, edge: Tuple[str, str]):
+        """Добавление дороги в индекс (если оба ее пункта есть на холсте)"""
+        if edge[0] in self.node_positions and edge[1] in self.node_positions:
+            (x1, y1), (x2, y2) = self.node_positions[edge[0]], self.node_positions[edge[1]]
+            self._edge_index.insert_segment(edge, x1, y1, x2, y2, self.EDGE_TOLERANCE)
+
+    def node_at(self, x: float, y: float) -> Optional[str]:
+        """Пункт под точкой (x, y) или None"""
+        nearest = None
+        nearest_distance = None
+        for node in self._node_index.query(x, y):
+            node_x, node_y = self.node_positions[node]
+            if self._is_point_near(x, y, node_x, node_y, self.NODE_RADIUS):
+                distance = (x - node_x) ** 2 + (y - node_y) ** 2
+                if nearest is None or distance < nearest_distance:
+                    nearest, nearest_distance = node, distance
+        return nearest
+
+    def edge_at(self, x: float, y: float) -> Optional[Tuple[str, str]]:
+        """Дорога рядом с точкой (x, y) или None"""
+        nearest = None
+        nearest_distance = None
+        for edge in self._edge_index.query(x, y):
+            (x1, y1), (x2, y2) = self.node_positions[edge[0]], self.node_positions[edge[1]]
+            # Расстояние от точки до отрезка через проекцию на него
+            dx, dy = x2 - x1, y2 - y1
+            length_squared = dx * dx + dy * dy
+            t = 0.0 if length_squared == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_squared))
+            distance = (x - x1 - t * dx) ** 2 + (y - y1 - t * dy) ** 2
+            if distance <= self.EDGE_TOLERANCE ** 2 and (nearest is None or distance < nearest_distance):
+                nearest, nearest_distance = edge, distance
+        return nearest
+
     def mousePressEvent(self, event: QMouseEvent):
-        """Обработка клика левой кнопкой мыши"""
-        if event.button() == Qt.LeftButton:
-            x, y = event.position().x(), event.position().y()
+        """Обработка нажатия: ЛКМ - пункты, ПКМ на дороге - удаление дороги"""
+        x, y = event.position().x(), event.position().y()
 
+        if event.button() == Qt.LeftButton:
             # Ищем, не кликнули ли на существующий узел
-            clicked_node = None
-            for node, (node_x, node_y) in self.node_positions.items():
-                if self._is_point_near(x, y, node_x, node_y):
-                    clicked_node = node
-                    break
+            clicked_node = self.node_at(x, y)
 
             if clicked_node:
-                # Клик на узле - обрабатываем выделение
-                self._handle_node_click(clicked_node)
+                # Клик на узле: выделение или перетаскивание решается при отпускании
+                self._pressed_node = clicked_node
+                self._press_position = (x, y)
+                self._dragging = False
             else:
                 # Клик на пустом месте - создаем новый узел
                 self._create_new_node(x, y)
 
-            self.update()
+        elif event.button() == Qt.RightButton:
+            edge = self.edge_at(x, y) if self.node_at(x, y) is None else None
+            if edge is not None:
+                self._remove_edge(edge)
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        """Перетаскивание пункта и подсветка объекта под курсором"""
+        x, y = event.position().x(), event.position().y()
+
+        if self._pressed_node is not None and event.buttons() & Qt.LeftButton:
+            press_x, press_y = self._press_position
+            if not self._dragging and (x - press_x) ** 2 + (y - press_y) ** 2 > self.DRAG_THRESHOLD ** 2:
+                self._dragging = True
+                # Слой перестраивается без переносимого пункта и его дорог -
+                # во время переноса они рисуются поверх слоя
+                self.invalidate_layers()
+            if self._dragging:
+                self._move_node(self._pressed_node, x, y)
+
+        self._update_hover(x, y)
+
+    def mouseReleaseEvent(self, event: QMouseEvent):
+        """Завершение перетаскивания или выделение пункта"""
+        if event.button() != Qt.LeftButton or self._pressed_node is None:
+            return
+
+        node, dragged = self._pressed_node, self._dragging
+        self._pressed_node = None
+        self._dragging = False
+        if dragged:
+            self.invalidate_layers()
+        else:
+            # Клик на узле - обрабатываем выделение
+            self._handle_node_click(node)
+
+    def leaveEvent(self, event: QEvent):
+        """Курсор покинул холст - снимаем подсветку"""
+        self._set_hovered(None)
+        super().leaveEvent(event)
+
+    def _update_hover(self, x: float, y: float):
+        """Поиск пункта или дороги под курсором"""
+        node = self.node_at(x, y)
+        if node is not None and node != self._pressed_node:
+            self._set_hovered(("node", node))
+        elif node is None and not self._dragging and (edge := self.edge_at(x, y)) is not None:
+            self._set_hovered(("edge", edge))
+        else:
+            self._set_hovered(None)
+
+    def _set_hovered(self, hovered: Optional[Tuple[str, object]]):
+        """Смена подсвеченного объекта с перерисовкой только его области"""
+        if hovered == self._hovered:
+            return
+        self.update(self._hover_rect(self._hovered))
+        self._hovered = hovered
+        self.update(self._hover_rect(hovered))
+
+    def _move_node(self, node: str, x: float, y: float):
+        """Перенос пункта: перерисовываются только его старая и новая области с дорогами"""
+        incident = [edge for edge in self._incident.get(node, ())
+                    if edge[0] in self.node_positions and edge[1] in self.node_positions]
+        old_area = self._node_rect(node)
+        for edge in incident:
+            old_area = old_area.united(self._edge_rect(edge))
+
+        self.node_positions[node] = (x, y)
+        self._index_node(node)
+
+        new_area = self._node_rect(node)
+        for edge in incident:
+            new_area = new_area.united(self._edge_rect(edge))
+        self.update(old_area.united(new_area))
+
+    def _roads(self) -> Iterator[Tuple[str, str]]:
+        """Все дороги графа: двусторонние и односторонние"""
+        return itertools.chain(self.graph.edges, self.graph.arcs)
+
+    def _reindex_pair(self, node1: str, node2: str):
+        """Обновление индекса дорог между двумя пунктами после их изменения"""
+        for key in (tuple(sorted([node1, node2])), (node1, node2), (node2, node1)):
+            self._edge_index.remove(key)
+            present = key in self.graph.edges or key in self.graph.arcs
+            for node in key:
+                roads = self._incident.setdefault(node, set())
+                if present:
+                    roads.add(key)
+                else:
+                    roads.discard(key)
+            if present:
+                self._index_edge(key)
+
+    def _remove_edge(self, edge: Tuple[str, str]):
+        """Удаление дороги"""
+        self.graph.remove_edge(*edge)
+        self._reindex_pair(*edge)
+        if self._hovered is not None and self._hovered[0] == "edge":
+            self._hovered = None
+        self.invalidate_layers()
+        self.graphChanged.emit()
 
     def _handle_node_click(self, clicked_node: str):
         """Обработка клика на существующем узле"""
@@ -159,6 +363,10 @@ class GraphCanvas(QWidget):
             # Если выделено 2 узла - создаем дорогу между ними
             if len(self.selected_nodes) == 2:
                 self._add_edge_between_selected()
+                return
+
+        # Выделение изменилось только у этого узла - перерисовываем его область
+        self.update(self._node_rect(clicked_node))
 
     def _add_edge_between_selected(self):
         """Создание дороги между двумя выделенными пунктами"""
@@ -167,17 +375,24 @@ class GraphCanvas(QWidget):
 
         node1, node2 = self.selected_nodes
 
-        # Просто добавляем дорогу (без запроса длины)
-        self.graph.add_edge(node1, node2)
+        # Просто добавляем дорогу (без запроса длины); в режиме
+        # односторонних дорог - из первого выделенного пункта во второй
+        self.graph.add_edge(node1, node2, self.directed_mode)
+        self._reindex_pair(node1, node2)
 
         # Сбрасываем выделение после создания дороги
         self.selected_nodes = []
+        self.invalidate_layers()
+        self.graphChanged.emit()
 
     def _create_new_node(self, x: int, y: int):
         """Создание нового населенного пункта"""
         node_name = self._get_next_node_name()
         self.graph.add_node(node_name)
         self.node_positions[node_name] = (x, y)
+        self._index_node(node_name)
+        self.invalidate_layers()
+        self.graphChanged.emit()
 
     def _is_point_near(self, x1: int, y1: int, x2: int, y2: int, radius: int = 20) -> bool:
         """Проверка, находится ли точка рядом с другой точкой"""
@@ -194,74 +409,321 @@ class GraphCanvas(QWidget):
                 return letter
         return "Я"  # Если все буквы использованы
 
-    def paintEvent(self, event: QPaintEvent):
-        """Перерисовка графа на холсте"""
-        painter = QPainter(self)
+    def resizeEvent(self, event: QResizeEvent):
+        """При изменении размера слой перестраивается под новый размер"""
+        self._static_layer = None
+        super().resizeEvent(event)
+
+    def _floating_node(self) -> Optional[str]:
+        """Пункт, который сейчас переносится (рисуется поверх слоя)"""
+        return self._pressed_node if self._dragging else None
+
+    def _build_static_layer(self) -> QPixmap:
+        """Отрисовка дорог и всех пунктов (без выделения) в кэшированный слой"""
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(self.size() * ratio)
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(Qt.transparent)
+        floating = self._floating_node()
+
+        painter = QPainter(layer)
         painter.setRenderHint(QPainter.Antialiasing)
 
         # Сначала рисуем все дороги (чтобы они были под узлами)
-        painter.setPen(QPen(QColor("#495057"), 3, Qt.SolidLine, Qt.RoundCap))
-        for (node1, node2) in self.graph.edges:
-            if node1 in self.node_positions and node2 in self.node_positions:
-                x1, y1 = self.node_positions[node1]
-                x2, y2 = self.node_positions[node2]
-                painter.drawLine(x1, y1, x2, y2)
+        painter.setPen(self._edge_pen)
+        for edge in self._roads():
+            if floating not in edge:
+                self._draw_edge(painter, edge)
 
         # Затем рисуем все узлы (чтобы они были поверх дорог)
-        for node, (x, y) in self.node_positions.items():
-            # Выбираем цвет в зависимости от выделения
-            if node in self.selected_nodes:
-                gradient = QRadialGradient(x, y - 5, 25)
-                gradient.setColorAt(0, QColor("#51cf66"))
-                gradient.setColorAt(1, QColor("#40c057"))
-                painter.setBrush(QBrush(gradient))
-                painter.setPen(QPen(QColor("#2f9e44"), 3))
-            else:
-                gradient = QRadialGradient(x, y - 5, 25)
-                gradient.setColorAt(0, QColor("#74c0fc"))
-                gradient.setColorAt(1, QColor("#4dabf7"))
-                painter.setBrush(QBrush(gradient))
-                painter.setPen(QPen(QColor("#1c7ed6"), 2))
-
-            # Рисуем круг для узла с тенью
-            shadow_offset = 2
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(QColor(0, 0, 0, 30))
-            painter.drawEllipse(x - 20 + shadow_offset, y - 20 + shadow_offset, 40, 40)
-
-            if node in self.selected_nodes:
-                painter.setBrush(QBrush(gradient))
-                painter.setPen(QPen(QColor("#2f9e44"), 3))
-            else:
-                painter.setBrush(QBrush(gradient))
-                painter.setPen(QPen(QColor("#1c7ed6"), 2))
+        for node in self.node_positions:
+            if node != floating:
+                self._draw_node(painter, node, False)
 
-            painter.drawEllipse(x - 20, y - 20, 40, 40)
+        painter.end()
+        return layer
 
-            # Рисуем текст с именем узла
-            painter.setPen(QColor("#ffffff"))
-            font = QFont("Segoe UI", 14, QFont.Bold)
-            painter.setFont(font)
+    def _draw_edge(self, painter: QPainter, edge: Tuple[str, str]):
+        """Рисование одной дороги текущим пером (односторонней - со стрелкой)"""
+        node1, node2 = edge
+        if node1 not in self.node_positions or node2 not in self.node_positions:
+            return
+        start = QPointF(*self.node_positions[node1])
+        end = QPointF(*self.node_positions[node2])
+        if edge not in self.graph.arcs:
+            painter.drawLine(start, end)
+            return
 
-            # Центрируем текст
-            fm = QFontMetrics(font)
-            text_width = fm.horizontalAdvance(node)
-            text_height = fm.height()
-            painter.drawText(x - text_width // 2, y + text_height // 4, node)
+        delta = end - start
+        length = (delta.x() ** 2 + delta.y() ** 2) ** 0.5
+        if length <= 2 * self.NODE_RADIUS:
+            return
+        direction = delta / length
+        normal = QPointF(-direction.y(), direction.x())
+        # Встречные односторонние дороги разводятся в стороны, чтобы не сливались
+        if (node2, node1) in self.graph.arcs:
+            start += normal * self.ARC_OFFSET
+            end += normal * self.ARC_OFFSET
+
+        tip = end - direction * self.NODE_RADIUS
+        base = tip - direction * self.ARROW_SIZE
+        painter.drawLine(start, base)
+        painter.save()
+        painter.setBrush(painter.pen().color())
+        painter.setPen(Qt.NoPen)
+        painter.drawPolygon(QPolygonF([tip, base + normal * (self.ARROW_SIZE / 2), base - normal * (self.ARROW_SIZE / 2)]))
+        painter.restore()
+
+    def _draw_node(self, painter: QPainter, node: str, selected: bool):
+        """Рисование одного узла с тенью и подписью"""
+        x, y = self.node_positions[node]
+        radius = self.NODE_RADIUS
+
+        painter.save()
+        painter.translate(x, y)
+
+        # Рисуем круг для узла с тенью
+        shadow_offset = 2
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self._shadow_brush)
+        painter.drawEllipse(QRectF(-radius + shadow_offset, -radius + shadow_offset, 2 * radius, 2 * radius))
+
+        # Выбираем цвет в зависимости от выделения
+        if selected:
+            painter.setBrush(self._selected_brush)
+            painter.setPen(self._selected_pen)
+        else:
+            painter.setBrush(self._node_brush)
+            painter.setPen(self._node_pen)
+        painter.drawEllipse(QRectF(-radius, -radius, 2 * radius, 2 * radius))
+
+        # Рисуем текст с именем узла по центру
+        painter.setPen(self._text_pen)
+        painter.setFont(self._font)
+        text_width = self._font_metrics.horizontalAdvance(node)
+        text_height = self._font_metrics.height()
+        painter.drawText(QPointF(-text_width / 2, text_height / 4), node)
+
+        painter.restore()
+
+    def paintEvent(self, event: QPaintEvent):
+        """Перерисовка графа на холсте: кэшированный слой, затем подвижные элементы поверх"""
+        if self._static_layer is None:
+            self._static_layer = self._build_static_layer()
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Копируем из слоя только область, которую нужно обновить
+        dirty = event.rect()
+        ratio = self._static_layer.devicePixelRatio()
+        source = QRectF(dirty.x() * ratio, dirty.y() * ratio, dirty.width() * ratio, dirty.height() * ratio)
+        painter.drawPixmap(QRectF(dirty), self._static_layer, source)
+
+        # Подсветка дороги под курсором
+        if self._hovered is not None and self._hovered[0] == "edge":
+            painter.setPen(self._hover_edge_pen)
+            self._draw_edge(painter, self._hovered[1])
+            node1, node2 = self._hovered[1]
+            for node in (node1, node2):
+                self._draw_node(painter, node, node in self.selected_nodes)
+
+        # Переносимый пункт и его дороги
+        floating = self._floating_node()
+        if floating is not None:
+            painter.setPen(self._edge_pen)
+            for edge in self._roads():
+                if floating in edge:
+                    self._draw_edge(painter, edge)
+                    other = edge[1] if edge[0] == floating else edge[0]
+                    self._draw_node(painter, other, other in self.selected_nodes)
+            self._draw_node(painter, floating, floating in self.selected_nodes)
+
+        for node in self.selected_nodes:
+            if node in self.node_positions and node != floating and self._node_rect(node).intersects(dirty):
+                self._draw_node(painter, node, True)
+
+        # Подсветка пункта под курсором
+        if self._hovered is not None and self._hovered[0] == "node":
+            painter.setPen(self._hover_node_pen)
+            painter.setBrush(Qt.NoBrush)
+            x, y = self.node_positions[self._hovered[1]]
+            radius = self.NODE_RADIUS + 3
+            painter.drawEllipse(QRectF(x - radius, y - radius, 2 * radius, 2 * radius))
+
+
+class WeightTableModel(QAbstractTableModel):
+    """
+    Модель таблицы длин дорог поверх массивов NumPy
+    values - длины дорог, mask - признак наличия дороги; таблица симметрична
+    """
+
+    matrixChanged = Signal()
+
+    def __init__(self, size: int = 0, parent=None):
+        super().__init__(parent)
+        self.labels: List[str] = []
+        self.values = np.zeros((0, 0), dtype=np.int64)
+        self.mask = np.zeros((0, 0), dtype=bool)
+        # Матрица в виде списков для решателя (None - нужно пересобрать)
+        self._matrix_cache: Optional[List[List[Optional[int]]]] = None
+        self.resize(size)
+
+    def resize(self, size: int, labels: Optional[List[str]] = None) -> None:
+        """Новая пустая таблица size×size"""
+        self.set_matrix(np.zeros((size, size), dtype=np.int64), np.zeros((size, size), dtype=bool), labels)
+
+    def set_matrix(self, values: np.ndarray, mask: np.ndarray, labels: Optional[List[str]] = None) -> None:
+        """Замена всей таблицы одним действием"""
+        size = len(values)
+        self.beginResetModel()
+        self.values = np.array(values, dtype=np.int64)
+        self.mask = np.array(mask, dtype=bool)
+        np.fill_diagonal(self.mask, False)
+        # Создаем русские метки: П1, П2, П3...
+        self.labels = list(labels) if labels else [f"П{i + 1}" for i in range(size)]
+        self.endResetModel()
+        self._matrix_changed()
+
+    def set_cells(self, row: int, column: int, block: List[List[str]]) -> None:
+        """Вставка прямоугольного блока текстовых значений начиная с ячейки (row, column)"""
+        size = len(self.labels)
+        for i, cells in enumerate(block):
+            for j, text in enumerate(cells):
+                r, c = row + i, column + j
+                if r < size and c < size and r != c:
+                    self._store(r, c, text)
+        self.dataChanged.emit(self.index(0, 0), self.index(size - 1, size - 1))
+        self._matrix_changed()
+
+    def _store(self, row: int, column: int, text: str) -> bool:
+        """Запись значения в ячейку и симметричную ей; False - значение некорректно"""
+        text = text.strip()
+        if not text or text == "-":
+            self.mask[row, column] = self.mask[column, row] = False
+            return True
+        try:
+            value = int(text)
+        except ValueError:
+            return False
+        self.values[row, column] = self.values[column, row] = value
+        self.mask[row, column] = self.mask[column, row] = True
+        return True
+
+    def _matrix_changed(self) -> None:
+        self._matrix_cache = None
+        self.matrixChanged.emit()
+
+    def get_matrix(self) -> List[List[Optional[int]]]:
+        """Матрица длин дорог: None - дороги нет (кэшируется до изменения таблицы)"""
+        if self._matrix_cache is None:
+            self._matrix_cache = weight_matrix(self.values, self.mask)
+        return self._matrix_cache
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.labels)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.labels)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        row, column = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if row == column:
+                # Диагональ - дороги от пункта к самому себе нет
+                return "-" if role == Qt.DisplayRole else ""
+            return str(self.values[row, column]) if self.mask[row, column] else ""
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignCenter)
+        if row == column:
+            if role == Qt.BackgroundRole:
+                return QColor("#f8f9fa")
+            if role == Qt.ForegroundRole:
+                return QColor("#adb5bd")
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole) -> bool:
+        row, column = index.row(), index.column()
+        if role != Qt.EditRole or row == column or not self._store(row, column, str(value)):
+            return False
+        self.dataChanged.emit(index, index)
+        mirrored = self.index(column, row)
+        self.dataChanged.emit(mirrored, mirrored)
+        self._matrix_changed()
+        return True
+
+    def flags(self, index: QModelIndex):
+        if index.row() == index.column():
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and 0 <= section < len(self.labels):
+            return self.labels[section]
+        return None
+
+
+class WeightTableView(QTableView):
+    """Таблица длин дорог с копированием и вставкой блоков через буфер обмена"""
+
+    pasteFailed = Signal(str)  # Сообщение об ошибке в формате вставленной таблицы
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.matches(QKeySequence.Paste):
+            self.paste_from_clipboard()
+        elif event.matches(QKeySequence.Copy):
+            self.copy_to_clipboard()
+        else:
+            super().keyPressEvent(event)
+
+    def paste_from_clipboard(self) -> None:
+        """Вставка из буфера: таблица с заголовками заменяет текущую, фрагмент - с выделенной ячейки"""
+        model: WeightTableModel = self.model()
+        text = QApplication.clipboard().text()
+        rows = [line.split("\t") for line in text.replace("\r", "").split("\n") if line.strip(" ")]
+        if not rows:
+            return
+
+        if has_labels(rows):
+            try:
+                values, mask, labels = parse_weight_table(text)
+            except ValueError as e:
+                self.pasteFailed.emit(str(e))
+                return
+            model.set_matrix(values, mask, labels)
+            return
+
+        current = self.currentIndex()
+        row, column = (current.row(), current.column()) if current.isValid() else (0, 0)
+        model.set_cells(row, column, rows)
+
+    def copy_to_clipboard(self) -> None:
+        """Копирование всей таблицы в буфер (ячейки через табуляцию, как в Excel)"""
+        model: WeightTableModel = self.model()
+        QApplication.clipboard().setText(format_weight_table(model.values, model.mask, model.labels, "\t"))
 
 
 class MatrixInputTable(QWidget):
     """
     Класс для удобного ввода таблицы смежности
     Позволяет вводить длины дорог между поселками
+    Данные хранятся в WeightTableModel; поддерживается импорт и экспорт CSV
     """
 
+    matrixChanged = Signal()
+    loadFailed = Signal(str)  # Таблица не загружена: сообщение об ошибке
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.entries = {}  # Словарь полей ввода: (строка, столбец) -> QLineEdit
-        self.labels = []  # Список меток узлов (П1, П2, П3...)
+        self.model = WeightTableModel()
+        self.model.matrixChanged.connect(self.matrixChanged)
         self.create_interface()
 
+    @property
+    def labels(self) -> List[str]:
+        """Список меток узлов (П1, П2, П3...)"""
+        return self.model.labels
+
     def create_interface(self):
         """Создание интерфейса для ввода таблицы"""
         layout = QVBoxLayout(self)
@@ -290,8 +752,7 @@ class MatrixInputTable(QWidget):
         """)
         control_layout.addWidget(self.size_edit)
 
-        create_btn = QPushButton("Создать таблицу")
-        create_btn.setStyleSheet("""
+        button_style = """
             QPushButton {
                 padding: 6px 16px;
                 background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
@@ -309,28 +770,41 @@ class MatrixInputTable(QWidget):
             QPushButton:pressed {
                 background: #1c7ed6;
             }
-        """)
+        """
+
+        create_btn = QPushButton("Создать таблицу")
+        create_btn.setStyleSheet(button_style)
         create_btn.clicked.connect(self.create_table)
         control_layout.addWidget(create_btn)
 
         control_layout.addStretch()
+
+        for text, handler in (("📋 Вставить", self.paste_table), ("📂 Импорт CSV", self.import_csv),
+                              ("💾 Экспорт CSV", self.export_csv)):
+            button = QPushButton(text)
+            button.setStyleSheet(button_style)
+            button.clicked.connect(handler)
+            control_layout.addWidget(button)
+
         layout.addLayout(control_layout)
 
         # Виджет для самой таблицы
-        self.table_widget = QTableWidget()
-        self.table_widget.setStyleSheet("""
-            QTableWidget {
+        self.table_view = WeightTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.pasteFailed.connect(self.loadFailed)
+        self.table_view.setStyleSheet("""
+            QTableView {
                 background-color: white;
                 gridline-color: #dee2e6;
                 border: 2px solid #dee2e6;
                 border-radius: 8px;
                 font-size: 13px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 color: #212529;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e7f5ff;
                 color: #1c7ed6;
             }
@@ -343,7 +817,7 @@ class MatrixInputTable(QWidget):
                 color: #495057;
             }
         """)
-        layout.addWidget(self.table_widget)
+        layout.addWidget(self.table_view)
 
         # Создаем таблицу по умолчанию
         self.create_table()
@@ -356,57 +830,114 @@ class MatrixInputTable(QWidget):
             size = 7
             self.size_edit.setText("7")
 
-        # Создаем русские метки: П1, П2, П3...
-        self.labels = [f"П{i + 1}" for i in range(size)]
-
-        self.table_widget.clear()
-        self.entries = {}
-
-        self.table_widget.setRowCount(size)
-        self.table_widget.setColumnCount(size)
-        self.table_widget.setHorizontalHeaderLabels(self.labels)
-        self.table_widget.setVerticalHeaderLabels(self.labels)
-
-        # Создаем ячейки таблицы
-        for i in range(size):
-            for j in range(size):
-                if i == j:
-                    # Диагональ - пустое поле (дороги от пункта к самому себе нет)
-                    item = QTableWidgetItem("-")
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    item.setBackground(QColor("#f8f9fa"))
-                    item.setForeground(QColor("#adb5bd"))
-                    self.table_widget.setItem(i, j, item)
-                else:
-                    # Создаем поле ввода для длины дороги
-                    item = QTableWidgetItem("")
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.table_widget.setItem(i, j, item)
+        self.model.resize(size)
+
+    def load_text(self, text: str) -> None:
+        """Загрузка всей таблицы из текста (CSV или ячейки через табуляцию)"""
+        try:
+            values, mask, labels = parse_weight_table(text)
+        except ValueError as e:
+            self.loadFailed.emit(str(e))
+            return
+        self.model.set_matrix(values, mask, labels)
+        self.size_edit.setText(str(len(values)))
+
+    def paste_table(self):
+        """Загрузка таблицы целиком из буфера обмена"""
+        self.load_text(QApplication.clipboard().text())
+
+    def import_csv(self):
+        """Загрузка таблицы из CSV-файла"""
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт таблицы", "", "CSV (*.csv *.txt);;Все файлы (*)")
+        if path:
+            with open(path, encoding="utf-8-sig") as file:
+                self.load_text(file.read())
+
+    def export_csv(self):
+        """Сохранение таблицы в CSV-файл"""
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт таблицы", "table.csv", "CSV (*.csv)")
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(format_weight_table(self.model.values, self.model.mask, self.labels))
 
     def get_matrix(self) -> List[List[Optional[int]]]:
         """Получение матрицы смежности из введенных данных"""
-        size = len(self.labels)
-        matrix = [[None] * size for _ in range(size)]
-
-        for i in range(size):
-            for j in range(size):
-                if i != j:
-                    value = self.table_widget.item(i, j).text().strip()
-                    if value:  # Если поле не пустое - есть дорога с указанной длиной
-                        try:
-                            matrix[i][j] = int(value)
-                            matrix[j][i] = int(value)  # Граф неориентированный
-                        except ValueError:
-                            continue
+        return self.model.get_matrix()
 
-        return matrix
+    def get_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Длины дорог и маска их наличия в виде массивов NumPy"""
+        return self.model.values, self.model.mask
 
     def get_labels(self) -> List[str]:
         """Получение списка меток узлов"""
         return self.labels
 
 
+class MatchingWorker(QObject):
+    """
+    Поиск соответствий графа и таблицы в общем пуле потоков (task_pool)
+    Сообщает о ходе перебора и поддерживает отмену и ограничение времени
+    """
+
+    progress = Signal(int)  # Число просмотренных вариантов
+
+    def __init__(self, graph: Graph, table_matrix: List[List[Optional[int]]], table_labels: List[str],
+                 find_all: bool, timeout: int):
+        super().__init__()
+        self.graph = graph
+        self.table_matrix = table_matrix
+        self.table_labels = table_labels
+        self.find_all = find_all
+        self.timeout = timeout  # Секунды, 0 - без ограничения
+        self._cancel_requested = False
+        self._deadline: Optional[float] = None
+        self._last_report = 0.0
+
+    def cancel(self):
+        """Запрос отмены (вызывается из потока интерфейса)"""
+        self._cancel_requested = True
+
+    def run(self) -> List[Dict[str, str]]:
+        """
+        Выполнение поиска: найденные соответствия (пустой список - решения нет)
+        Прерванный поиск и ошибки - исключение с сообщением для пользователя
+        """
+        if self._cancel_requested:
+            raise SearchCancelled("⏹ Поиск отменен")
+        self._deadline = time.monotonic() + self.timeout if self.timeout else None
+        try:
+            if self.find_all:
+                return self.graph.find_all_isomorphisms(self.table_matrix, self.table_labels, self._on_progress)
+            mapping = self.graph.find_isomorphism(self.table_matrix, self.table_labels, self._on_progress)
+            return [mapping] if mapping is not None else []
+        except SearchCancelled:
+            if self._cancel_requested:
+                raise SearchCancelled("⏹ Поиск отменен") from None
+            raise SearchCancelled(f"⏱ Поиск прерван: превышено ограничение времени ({self.timeout} с)") from None
+        except Exception as e:
+            raise RuntimeError(f"❌ Ошибка при поиске: {e}") from e
+
+    def _on_progress(self, explored: int) -> bool:
+        """Обратный вызов перебора: отчет о ходе и проверка отмены/таймаута"""
+        now = time.monotonic()
+        # Не чаще 10 раз в секунду, чтобы не перегружать очередь событий интерфейса
+        if now - self._last_report >= 0.1:
+            self._last_report = now
+            self.progress.emit(explored)
+        if self._cancel_requested:
+            return True
+        return self._deadline is not None and now > self._deadline
+
+
+# Оформление поля результата: (фон, цвет текста, цвет полосы слева, жирный шрифт)
+RESULT_STYLES = {
+    "info": ("#e7f5ff", "#1864ab", "#4dabf7", False),
+    "success": ("#d3f9d8", "#2b8a3e", "#51cf66", True),
+    "warning": ("#fff3bf", "#e67700", "#ffd43b", False),
+    "error": ("#ffe3e3", "#c92a2a", "#ff6b6b", False),
+}
+
+
 class GraphSolverApp(QMainWindow):
     """
     Главный класс приложения
@@ -417,6 +948,13 @@ class GraphSolverApp(QMainWindow):
         super().__init__()
         self.graph = Graph()
         self.mapping = {}  # Словарь соответствия букв и номеров
+        # Все существенно различные соответствия (None - задача еще не решалась)
+        self.mappings: Optional[List[Dict[str, str]]] = None
+        # Фоновый поиск соответствий (None - поиск не выполняется)
+        self.matching_task: Optional[SolverTask] = None
+        self.matching_worker: Optional[MatchingWorker] = None
+        # Движок маршрутов по текущей таблице (None - таблица изменилась)
+        self.route_engine: Optional[RouteQueryEngine] = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -460,8 +998,15 @@ class GraphSolverApp(QMainWindow):
         left_layout.setSpacing(12)
 
         self.canvas = GraphCanvas(self.graph)
+        self.canvas.graphChanged.connect(self._on_graph_changed)
         left_layout.addWidget(self.canvas)
 
+        # Режим односторонних дорог (для подсчета путей)
+        self.directed_check = QCheckBox("Односторонние дороги (из первого выделенного пункта во второй)")
+        self.directed_check.setStyleSheet("color: #495057; font-size: 13px;")
+        self.directed_check.toggled.connect(self._on_directed_toggled)
+        left_layout.addWidget(self.directed_check)
+
         # Кнопка очистки графа
         clear_btn = QPushButton("🗑 Очистить граф")
         clear_btn.setStyleSheet("""
@@ -490,7 +1035,10 @@ class GraphSolverApp(QMainWindow):
         instruction_text = """📌 Инструкция:
 • ЛКМ на пустом месте — добавить пункт
 • ЛКМ на пункте — выделить его
-• 2 выделенных пункта — создать дорогу между ними"""
+• 2 выделенных пункта — создать дорогу между ними
+• Перетаскивание пункта — переместить его
+• ПКМ на дороге — удалить дорогу
+• Для подсчета путей все дороги должны быть односторонними"""
         instruction_label = QLabel(instruction_text)
         instruction_label.setWordWrap(True)
         instruction_label.setStyleSheet("""
@@ -517,6 +1065,9 @@ class GraphSolverApp(QMainWindow):
         table_layout = QVBoxLayout(table_frame)
 
         self.matrix_input = MatrixInputTable()
+        self.matrix_input.matrixChanged.connect(self._on_table_changed)
+        self.matrix_input.loadFailed.connect(
+            lambda message: self._show_result(f"❌ Ошибка в таблице: {message}", "error"))
         table_layout.addWidget(self.matrix_input)
 
         right_layout.addWidget(table_frame, 1)
@@ -528,7 +1079,7 @@ class GraphSolverApp(QMainWindow):
 
         # Поиск конкретной дороги
         search_layout = QHBoxLayout()
-        search_label = QLabel("Найти длину дороги:")
+        search_label = QLabel("Найти:")
         search_label.setStyleSheet("font-weight: bold; color: #495057; font-size: 13px;")
         search_layout.addWidget(search_label)
 
@@ -557,6 +1108,12 @@ class GraphSolverApp(QMainWindow):
             }
         """
 
+        # Тип запроса: длина прямой дороги или кратчайший маршрут по таблице
+        self.query_combo = QComboBox()
+        self.query_combo.addItems(["длину дороги", "кратчайший маршрут"])
+        self.query_combo.setStyleSheet(combo_style)
+        search_layout.addWidget(self.query_combo)
+
         self.from_combo = QComboBox()
         self.from_combo.setEditable(False)
         self.from_combo.setStyleSheet(combo_style)
@@ -599,6 +1156,7 @@ class GraphSolverApp(QMainWindow):
 
         # Кнопка для поиска всех соответствий
         solve_btn = QPushButton("⚡ Найти все соответствия")
+        self.solve_btn = solve_btn
         solve_btn.setStyleSheet("""
             QPushButton {
                 padding: 12px 24px;
@@ -619,7 +1177,98 @@ class GraphSolverApp(QMainWindow):
             }
         """)
         solve_btn.clicked.connect(self.solve_problem)
-        solution_layout.addWidget(solve_btn)
+
+        # Кнопка отмены фонового поиска
+        self.cancel_btn = QPushButton("⏹ Отмена")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.setStyleSheet("""
+            QPushButton {
+                padding: 12px 16px;
+                background: #e9ecef;
+                color: #495057;
+                border: none;
+                border-radius: 8px;
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background: #dee2e6;
+            }
+            QPushButton:disabled {
+                color: #adb5bd;
+            }
+        """)
+        self.cancel_btn.clicked.connect(self.cancel_matching)
+
+        solve_buttons_layout = QHBoxLayout()
+        solve_buttons_layout.addWidget(solve_btn, 1)
+        solve_buttons_layout.addWidget(self.cancel_btn)
+        solution_layout.addLayout(solve_buttons_layout)
+
+        # Ограничение времени поиска (0 - без ограничения)
+        timeout_layout = QHBoxLayout()
+        timeout_label = QLabel("Ограничение времени поиска, с:")
+        timeout_label.setStyleSheet("color: #495057; font-size: 13px;")
+        timeout_layout.addWidget(timeout_label)
+
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(0, 3600)
+        self.timeout_spin.setValue(60)
+        self.timeout_spin.setSpecialValueText("без ограничения")
+        timeout_layout.addWidget(self.timeout_spin)
+        timeout_layout.addStretch()
+        solution_layout.addLayout(timeout_layout)
+
+        # Подсчет путей между выбранными выше пунктами
+        paths_layout = QHBoxLayout()
+        paths_label = QLabel("Число путей через:")
+        paths_label.setStyleSheet("font-weight: bold; color: #495057; font-size: 13px;")
+        paths_layout.addWidget(paths_label)
+
+        self.through_edit = QLineEdit()
+        self.through_edit.setPlaceholderText("Д, Е")
+        self.through_edit.setFixedWidth(90)
+        paths_layout.addWidget(self.through_edit)
+
+        avoid_label = QLabel("избегая:")
+        avoid_label.setStyleSheet("color: #495057; font-size: 13px;")
+        paths_layout.addWidget(avoid_label)
+
+        self.avoid_edit = QLineEdit()
+        self.avoid_edit.setPlaceholderText("Ж")
+        self.avoid_edit.setFixedWidth(90)
+        paths_layout.addWidget(self.avoid_edit)
+
+        count_btn = QPushButton("🔢 Посчитать пути")
+        count_btn.setStyleSheet("""
+            QPushButton {
+                padding: 6px 16px;
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #20c997, stop:1 #12b886);
+                color: white;
+                border: none;
+                border-radius: 6px;
+                font-weight: bold;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #12b886, stop:1 #0ca678);
+            }
+            QPushButton:pressed {
+                background: #099268;
+            }
+        """)
+        count_btn.clicked.connect(self.count_paths)
+        paths_layout.addWidget(count_btn)
+        paths_layout.addStretch()
+        solution_layout.addLayout(paths_layout)
+
+        # Режим перебора всех соответствий (для проверки однозначности ответа)
+        self.all_mappings_check = QCheckBox("Перебрать все соответствия и проверить однозначность")
+        self.all_mappings_check.setChecked(True)
+        self.all_mappings_check.setStyleSheet("color: #495057; font-size: 13px;")
+        solution_layout.addWidget(self.all_mappings_check)
 
         # Поле для отображения результатов
         self.result_label = QLabel("Здесь появится результат")
@@ -658,123 +1307,232 @@ class GraphSolverApp(QMainWindow):
 
     def clear_graph(self):
         """Очистка графа и сброс интерфейса"""
+        self.cancel_matching()
         self.graph = Graph()
-        self.canvas.graph = self.graph
-        self.canvas.node_positions = {}
-        self.canvas.selected_nodes = []
-        self.canvas.update()
+        self.canvas.reset(self.graph)
+        self.mapping = {}
+        self.mappings = None
         self.result_label.setText("✓ Граф очищен")
         self.update_comboboxes()
 
+    def _show_result(self, text: str, kind: str = "info"):
+        """Вывод текста в поле результата с оформлением из RESULT_STYLES"""
+        background, color, border, bold = RESULT_STYLES[kind]
+        self.result_label.setText(text)
+        self.result_label.setStyleSheet(f"""
+            QLabel {{
+                background-color: {background};
+                padding: 16px;
+                border-radius: 8px;
+                color: {color};
+                font-size: 13px;
+                border-left: 4px solid {border};
+                min-height: 80px;
+                {"font-weight: bold;" if bold else ""}
+            }}
+        """)
+
     def solve_problem(self):
-        """Поиск соответствия между нарисованным графом и таблицей из условия"""
+        """Запуск фонового поиска соответствия между нарисованным графом и таблицей"""
+        if self.matching_task is not None:
+            return
+
         table_matrix = self.matrix_input.get_matrix()
         table_labels = self.matrix_input.get_labels()
 
-        # Ищем изоморфизм (соответствие узлов)
-        self.mapping = self.graph.find_isomorphism(table_matrix, table_labels)
+        # Поиск работает с копией графа - рисование во время поиска его не затронет
+        self.matching_worker = MatchingWorker(copy.deepcopy(self.graph), table_matrix, table_labels,
+                                              self.all_mappings_check.isChecked(),
+                                              self.timeout_spin.value())
+        self.matching_worker.progress.connect(self._on_matching_progress)
+
+        self.solve_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self._show_result("⏳ Поиск соответствия...", "info")
+        self.matching_task = run_in_pool(self.matching_worker.run, (), self._on_matching_finished,
+                                         self._on_matching_stopped)
+
+    def cancel_matching(self):
+        """Отмена фонового поиска соответствия"""
+        if self.matching_worker is not None:
+            self.matching_worker.cancel()
+
+    def _finish_matching(self):
+        """Сброс состояния после завершения фонового поиска"""
+        self.matching_task = None
+        self.matching_worker = None
+        self.solve_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+
+    def _on_matching_progress(self, explored: int):
+        """Отображение хода фонового поиска"""
+        self._show_result(f"⏳ Поиск соответствия...\n\nПросмотрено вариантов: {explored:,}".replace(",", " "),
+                          "info")
+
+    def _on_matching_stopped(self, message: str):
+        """Поиск прерван: отмена, таймаут или ошибка"""
+        self._finish_matching()
+        self._show_result(message, "warning")
+
+    def _on_matching_finished(self, mappings: List[Dict[str, str]]):
+        """Отображение найденных соответствий"""
+        self._finish_matching()
+        self.mappings = mappings
+        self.mapping = self.mappings[0] if self.mappings else {}
+
+        # Обновляем выпадающие списки
+        self.update_comboboxes()
+
+        if not self.mappings:
+            self._show_result("❌ Решения нет: граф не соответствует таблице.\n\n"
+                              "Проверьте число пунктов и набор дорог", "error")
+            return
 
         # Форматируем результат
-        result = "✓ Соответствие найдено:\n\n"
+        if len(self.mappings) == 1:
+            result = "✓ Соответствие найдено:\n\n"
+        else:
+            result = f"✓ Найдено различных соответствий: {len(self.mappings)}\n" \
+                     "Ответ может зависеть от выбора соответствия\n\n"
         for graph_node, table_node in sorted(self.mapping.items()):
-            result += f"   {graph_node}  →  {table_node}\n"
-        self.result_label.setText(result)
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #d3f9d8;
-                padding: 16px;
-                border-radius: 8px;
-                color: #2b8a3e;
-                font-size: 13px;
-                border-left: 4px solid #51cf66;
-                min-height: 80px;
-                font-weight: bold;
-            }
-        """)
+            others = {mapping[graph_node] for mapping in self.mappings[1:]} - {table_node}
+            alternatives = f"  (или {', '.join(sorted(others))})" if others else ""
+            result += f"   {graph_node}  →  {table_node}{alternatives}\n"
+        self._show_result(result, "success")
+
+    def closeEvent(self, event: QCloseEvent):
+        """Остановка фонового поиска при закрытии окна"""
+        if self.matching_task is not None:
+            self.cancel_matching()
+            self.matching_task.wait()
+        super().closeEvent(event)
+
+    def _on_directed_toggled(self, checked: bool):
+        """Переключение режима односторонних дорог на холсте"""
+        self.canvas.directed_mode = checked
+
+    def count_paths(self):
+        """Подсчет путей между выбранными буквами через и в обход указанных пунктов"""
+        from_letter = self.from_combo.currentText().strip()
+        to_letter = self.to_combo.currentText().strip()
+        through = tuple(letter for letter in re.split(r"[\s,;]+", self.through_edit.text().strip().upper()) if letter)
+        avoid = tuple(letter for letter in re.split(r"[\s,;]+", self.avoid_edit.text().strip().upper()) if letter)
 
-        # Обновляем выпадающие списки
+        try:
+            total = PathCounter(self.graph).count(from_letter, to_letter, through, avoid)
+        except ValueError as e:
+            self._show_result(f"❌ Подсчет путей невозможен: {e}", "error")
+            return
+
+        conditions = ""
+        if through:
+            conditions += f" через {', '.join(through)}"
+        if avoid:
+            conditions += f" избегая {', '.join(avoid)}"
+        self._show_result(f"✓ Число путей {from_letter} → {to_letter}{conditions}:\n\n{total}", "success")
+
+    def _on_table_changed(self):
+        """Таблица изменилась - найденные соответствия и кэш маршрутов больше не действительны"""
+        self.cancel_matching()
+        self.route_engine = None
+        self.mapping = {}
+        self.mappings = None
+
+    def _on_graph_changed(self):
+        """Граф на холсте изменился - найденные соответствия относятся к прежнему графу"""
+        self.cancel_matching()
+        self.mapping = {}
+        self.mappings = None
         self.update_comboboxes()
 
+    def get_route_engine(self) -> RouteQueryEngine:
+        """Движок маршрутов по текущей таблице (создается при первом запросе)"""
+        if self.route_engine is None:
+            self.route_engine = RouteQueryEngine(*self.matrix_input.get_arrays())
+        return self.route_engine
+
     def find_specific_road(self):
-        """Поиск длины конкретной дороги между указанными буквами графа"""
+        """Поиск длины дороги или кратчайшего маршрута между указанными буквами графа"""
         from_letter = self.from_combo.currentText().strip()
         to_letter = self.to_combo.currentText().strip()
 
         # Проверяем, что выбранные буквы существуют в графе
         if from_letter not in self.graph.nodes or to_letter not in self.graph.nodes:
-            self.result_label.setText("❌ Ошибка: выбранные буквы не найдены в графе")
-            self.result_label.setStyleSheet("""
-                QLabel {
-                    background-color: #ffe3e3;
-                    padding: 16px;
-                    border-radius: 8px;
-                    color: #c92a2a;
-                    font-size: 13px;
-                    border-left: 4px solid #ff6b6b;
-                    min-height: 80px;
-                }
-            """)
+            self._show_result("❌ Ошибка: выбранные буквы не найдены в графе", "error")
+            return
+
+        if self.mappings is None:
+            self._show_result("⚠ Сначала найдите соответствие между графом и таблицей", "warning")
+            return
+
+        if not self.mappings:
+            self._show_result("❌ Решения нет: граф не соответствует таблице", "error")
             return
 
-        table_matrix = self.matrix_input.get_matrix()
         table_labels = self.matrix_input.get_labels()
+        if any(label not in table_labels for label in self.mapping.values()):
+            self._show_result("⚠ Таблица изменилась - найдите соответствие заново", "warning")
+            return
+        if from_letter not in self.mapping or to_letter not in self.mapping:
+            self._show_result("⚠ Граф изменился - найдите соответствие заново", "warning")
+            return
 
-        # Находим соответствующие номера из таблицы
-        from_number = self.mapping.get(from_letter)
-        to_number = self.mapping.get(to_letter)
-
-        if not from_number or not to_number:
-            self.result_label.setText("⚠ Сначала найдите соответствие между графом и таблицей")
-            self.result_label.setStyleSheet("""
-                QLabel {
-                    background-color: #fff3bf;
-                    padding: 16px;
-                    border-radius: 8px;
-                    color: #e67700;
-                    font-size: 13px;
-                    border-left: 4px solid #ffd43b;
-                    min-height: 80px;
-                }
-            """)
+        if self.query_combo.currentIndex() == 1:
+            self._find_shortest_route(from_letter, to_letter, table_labels)
             return
 
-        # Находим индексы в таблице
-        from_index = table_labels.index(from_number)
-        to_index = table_labels.index(to_number)
+        table_matrix = self.matrix_input.get_matrix()
 
-        # Получаем длину дороги из таблицы
-        length = table_matrix[from_index][to_index]
+        # Длина дороги при каждом из найденных соответствий
+        lengths = set()
+        for mapping in self.mappings:
+            from_index = table_labels.index(mapping[from_letter])
+            to_index = table_labels.index(mapping[to_letter])
+            lengths.add(table_matrix[from_index][to_index])
+
+        if len(lengths) > 1:
+            variants = ", ".join(str(length) if length is not None else "нет дороги"
+                                 for length in sorted(lengths, key=lambda v: (v is None, v)))
+            self._show_result(f"⚠ Длина дороги {from_letter} → {to_letter} неоднозначна:\n\n"
+                              f"в разных соответствиях: {variants}", "warning")
+            return
 
+        length = lengths.pop()
         if length is not None:
-            self.result_label.setText(f"✓ Длина дороги {from_letter} → {to_letter}:\n\n{length} км")
-            self.result_label.setStyleSheet("""
-                QLabel {
-                    background-color: #d3f9d8;
-                    padding: 16px;
-                    border-radius: 8px;
-                    color: #2b8a3e;
-                    font-size: 13px;
-                    border-left: 4px solid #51cf66;
-                    min-height: 80px;
-                    font-weight: bold;
-                }
-            """)
+            note = f"\n\n(одинакова во всех {len(self.mappings)} соответствиях)" if len(self.mappings) > 1 else ""
+            self._show_result(f"✓ Длина дороги {from_letter} → {to_letter}:\n\n{length} км{note}", "success")
         else:
-            self.result_label.setText(f"ℹ Дороги между {from_letter} и {to_letter} нет")
-            self.result_label.setStyleSheet("""
-                QLabel {
-                    background-color: #e7f5ff;
-                    padding: 16px;
-                    border-radius: 8px;
-                    color: #1864ab;
-                    font-size: 13px;
-                    border-left: 4px solid #4dabf7;
-                    min-height: 80px;
-                }
-            """)
+            self._show_result(f"ℹ Дороги между {from_letter} и {to_letter} нет", "info")
+
+    def _find_shortest_route(self, from_letter: str, to_letter: str, table_labels: List[str]):
+        """Кратчайший маршрут по таблице при каждом из найденных соответствий"""
+        engine = self.get_route_engine()
+
+        # Длина маршрута -> пример маршрута в буквах графа
+        routes: Dict[Optional[int], List[str]] = {}
+        for mapping in self.mappings:
+            letter_by_label = {label: letter for letter, label in mapping.items()}
+            length, path = engine.shortest_path(table_labels.index(mapping[from_letter]),
+                                                table_labels.index(mapping[to_letter]))
+            routes.setdefault(length, [letter_by_label[table_labels[index]] for index in path])
+
+        if len(routes) > 1:
+            variants = ", ".join(str(length) if length is not None else "нет пути"
+                                 for length in sorted(routes, key=lambda v: (v is None, v)))
+            self._show_result(f"⚠ Длина кратчайшего маршрута {from_letter} → {to_letter} неоднозначна:\n\n"
+                              f"в разных соответствиях: {variants}", "warning")
+            return
+
+        length, path = routes.popitem()
+        if length is None:
+            self._show_result(f"ℹ Маршрута между {from_letter} и {to_letter} нет", "info")
+            return
+        note = f"\n\n(одинакова во всех {len(self.mappings)} соответствиях)" if len(self.mappings) > 1 else ""
+        self._show_result(f"✓ Кратчайший маршрут {from_letter} → {to_letter}:\n\n"
+                          f"{' → '.join(path)}\n{length} км{note}", "success")
 
 
-if __name__ == "__main__":
+def main() -> int:
     app = QApplication([])
     app.setStyle("Fusion")
 
@@ -792,4 +1550,8 @@ if __name__ == "__main__":
     window = GraphSolverApp()
     window.show()
 
-    app.exec()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,750 @@
+"""
+Ядро решателя задачи о сопоставлении схемы дорог и таблицы длин (без графического интерфейса)
+Граф, поиск соответствий, канонический вид, маршруты и подсчет путей.
+Модуль не зависит от PySide6 и может использоваться из консоли:
+
+    python solver_1_core.py схема.txt таблица.csv [--all]
+"""
+import argparse
+import heapq
+import math
+import sys
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+import numpy as np
+
+from result_cache import shared_cache
+
+# Функция обратного вызова перебора: получает число просмотренных вариантов,
+# возвращает True, если поиск нужно прервать
+ProgressCallback = Callable[[int], bool]
+# Как часто (в просмотренных вариантах) вызывается ProgressCallback
+PROGRESS_INTERVAL = 2048
+
+
+# Сертификат канонического вида графа: (число узлов, маски смежности в канонической нумерации)
+Certificate = Tuple[int, Tuple[int, ...]]
+# Сколько узлов дерева поиска канонического вида просматривается до отказа от него.
+# Вид нужен только для быстрого отказа и соответствия без перебора; у симметричных
+# графов (несколько одинаковых циклов) дерево растет экспоненциально, и тогда
+# соответствие ищется прямым перебором
+CANONICAL_BUDGET = 1000
+
+
+class SearchCancelled(Exception):
+    """Перебор прерван по запросу (отмена пользователем или таймаут)"""
+
+
+class Graph:
+    """
+    Класс для представления графа дорог между населенными пунктами
+    Хранит узлы (пункты) и ребра (дороги) - факт наличия дороги, без длин
+    Дороги бывают двусторонние (edges) и односторонние (arcs); при сопоставлении
+    с таблицей направление не учитывается, оно нужно для подсчета путей
+    """
+
+    def __init__(self):
+        # Список всех узлов графа (русские буквы: А, Б, В...)
+        self.nodes: List[str] = []
+        # Множество рёбер: наличие дороги между пунктами
+        self.edges: set = set()
+        # Множество односторонних дорог: (откуда, куда)
+        self.arcs: set = set()
+        # Матрица смежности: 1 - есть дорога, 0 - нет дороги
+        self.adjacency_matrix: List[List[int]] = []
+        # Битовые маски смежности: бит j в маске узла i - есть дорога i-j
+        self.adjacency_masks: List[int] = []
+        # Кэш канонического вида графа (см. canonical_form)
+        self._canonical_form: Optional[Tuple[Optional[Certificate], List[int]]] = None
+
+    def add_node(self, node: str) -> None:
+        """Добавление нового населенного пункта в граф"""
+        if node not in self.nodes:
+            self.nodes.append(node)
+            self._update_adjacency_matrix()
+
+    def add_edge(self, node1: str, node2: str, directed: bool = False) -> None:
+        """
+        Добавление дороги между двумя пунктами
+        directed=True - односторонняя дорога из node1 в node2; двусторонняя
+        и односторонние дороги между одной парой пунктов взаимно заменяют друг друга
+        """
+        # Сортируем имена узлов для единообразия (А,Б) и (Б,А) - одно ребро
+        edge = tuple(sorted([node1, node2]))
+        if directed:
+            self.edges.discard(edge)
+            self.arcs.add((node1, node2))
+        else:
+            self.arcs.discard((node1, node2))
+            self.arcs.discard((node2, node1))
+            self.edges.add(edge)
+
+        # Автоматически добавляем узлы, если их еще нет
+        if node1 not in self.nodes:
+            self.nodes.append(node1)
+        if node2 not in self.nodes:
+            self.nodes.append(node2)
+
+        self._update_adjacency_matrix()
+
+    def remove_edge(self, node1: str, node2: str) -> None:
+        """Удаление дороги между двумя пунктами (в любом направлении)"""
+        self.edges.discard(tuple(sorted([node1, node2])))
+        self.arcs.discard((node1, node2))
+        self.arcs.discard((node2, node1))
+        self._update_adjacency_matrix()
+
+    def road_pairs(self) -> set:
+        """Пары пунктов, соединенных дорогой любого вида (без учета направления)"""
+        return self.edges | {tuple(sorted(arc)) for arc in self.arcs}
+
+    def successors(self) -> Dict[str, List[str]]:
+        """Куда можно проехать из каждого пункта (двусторонние дороги - в обе стороны)"""
+        result = {node: [] for node in self.nodes}
+        for node1, node2 in self.edges:
+            result[node1].append(node2)
+            result[node2].append(node1)
+        for node1, node2 in self.arcs:
+            result[node1].append(node2)
+        return result
+
+    def _update_adjacency_matrix(self) -> None:
+        """Обновление матрицы смежности после изменений в графе"""
+        n = len(self.nodes)
+        # Создаем новую матрицу N×N, заполненную 0 (отсутствие дороги)
+        self.adjacency_matrix = [[0] * n for _ in range(n)]
+
+        # Заполняем матрицу данными о дорогах
+        for (node1, node2) in self.road_pairs():
+            i = self.nodes.index(node1)
+            j = self.nodes.index(node2)
+            # Для сопоставления с таблицей направление не важно, заполняем симметрично
+            self.adjacency_matrix[i][j] = 1
+            self.adjacency_matrix[j][i] = 1
+
+        self.adjacency_masks = [
+            sum(1 << j for j in range(n) if row[j]) for row in self.adjacency_matrix
+        ]
+        # Канонический вид пересчитывается при следующем запросе
+        self._canonical_form = None
+
+    def get_canonical_form(self, progress_callback: Optional[ProgressCallback] = None
+                           ) -> Tuple[Optional[Certificate], List[int]]:
+        """
+        Канонический вид графа: (сертификат, канонические номера узлов); сертификат None -
+        вид не найден за CANONICAL_BUDGET шагов. Кэшируется до следующего изменения графа
+        """
+        if self._canonical_form is None:
+            self._canonical_form = cached_canonical_form(self.adjacency_masks, progress_callback=progress_callback)
+        return self._canonical_form
+
+    def find_isomorphism(self, table_matrix: List[List[Optional[int]]], table_labels: List[str],
+                         progress_callback: Optional[ProgressCallback] = None) -> Optional[Dict[str, str]]:
+        """
+        Поиск изоморфизма - соответствия между узлами нашего графа и узлами из таблицы
+        Возвращает первое найденное соответствие или None, если его не существует
+        progress_callback: см. ProgressCallback; при прерывании - SearchCancelled
+        """
+        explored = [0]
+        possible, images = self._canonical_images(table_matrix, explored, progress_callback)
+        if not possible:
+            return None
+        if images is None:
+            # Канонический вид не вычислен - первое соответствие прямым перебором
+            images = next(iter_distinct_isomorphisms(self.adjacency_masks, table_matrix, explored,
+                                                     progress_callback), None)
+            if images is None:
+                return None
+        return self._images_to_mapping(images, table_labels)
+
+    def find_all_isomorphisms(self, table_matrix: List[List[Optional[int]]], table_labels: List[str],
+                              progress_callback: Optional[ProgressCallback] = None) -> List[Dict[str, str]]:
+        """
+        Поиск всех существенно различных соответствий графа и таблицы
+        Соответствия, дающие одинаковые длины всех дорог графа, эквивалентны -
+        из них возвращается одно. Результат хранится в общем кэше по маскам
+        смежности графа и таблице (только различные соответствия)
+        """
+        key = ("solver_1.all_isomorphisms", tuple(self.adjacency_masks), tuple(map(tuple, table_matrix)))
+        all_images = shared_cache.get_or_compute(
+            key, lambda: list(self._iter_distinct_images(table_matrix, progress_callback)))
+        return [self._images_to_mapping(images, table_labels) for images in all_images]
+
+    def _iter_distinct_images(self, table_matrix: List[List[Optional[int]]],
+                              progress_callback: Optional[ProgressCallback]) -> Iterator[List[int]]:
+        """Различные соответствия списками индексов таблицы (см. iter_distinct_isomorphisms)"""
+        # Общий счетчик просмотренных вариантов для всех этапов перебора
+        explored = [0]
+        # Разные сертификаты - соответствий нет, перебор не нужен
+        possible, _ = self._canonical_images(table_matrix, explored, progress_callback)
+        if not possible:
+            return
+        yield from iter_distinct_isomorphisms(self.adjacency_masks, table_matrix, explored, progress_callback)
+
+    def _canonical_images(self, table_matrix: List[List[Optional[int]]], explored: List[int],
+                          progress_callback: Optional[ProgressCallback]) -> Tuple[bool, Optional[List[int]]]:
+        """
+        Соответствие через канонический вид: узел графа и узел таблицы
+        с одинаковым каноническим номером соответствуют друг другу.
+        Возвращает (соответствие возможно, образы узлов графа или None - вид не вычислен).
+        Различные сертификаты означают, что соответствия нет - без перебора
+        """
+        table_masks = build_adjacency_masks(table_matrix)
+        if len(table_masks) != len(self.nodes):
+            return False, None
+
+        graph_certificate, graph_labelling = self.get_canonical_form(progress_callback)
+        if graph_certificate is None:
+            return True, None
+        table_certificate, table_labelling = cached_canonical_form(table_masks, explored, progress_callback)
+        if table_certificate is None:
+            return True, None
+        if graph_certificate != table_certificate:
+            return False, None
+
+        table_by_position = [0] * len(table_labelling)
+        for t, position in enumerate(table_labelling):
+            table_by_position[position] = t
+        return True, [table_by_position[position] for position in graph_labelling]
+
+    def _images_to_mapping(self, images: List[int], table_labels: List[str]) -> Dict[str, str]:
+        """Перевод списка индексов таблицы в словарь {узел_графа: узел_таблицы}"""
+        return {node: table_labels[images[i]] for i, node in enumerate(self.nodes)}
+
+
+def build_adjacency_masks(table_matrix: List[List[Optional[int]]]) -> List[int]:
+    """
+    Битовые маски смежности для таблицы из условия задачи
+    Бит j в маске строки i установлен, если в ячейке (i, j) указана длина дороги
+    """
+    return [
+        sum(1 << j for j, value in enumerate(row) if value is not None and j != i)
+        for i, row in enumerate(table_matrix)
+    ]
+
+
+def _report_progress(explored: List[int], progress_callback: Optional[ProgressCallback]) -> None:
+    """Учет очередного варианта перебора и периодический вызов ProgressCallback"""
+    explored[0] += 1
+    # Сообщаем о ходе перебора не на каждом шаге, чтобы не замедлять поиск
+    if progress_callback is not None and explored[0] % PROGRESS_INTERVAL == 0:
+        if progress_callback(explored[0]):
+            raise SearchCancelled()
+
+
+def iter_distinct_isomorphisms(source_masks: List[int], table_matrix: List[List[Optional[int]]],
+                               explored: Optional[List[int]] = None,
+                               progress_callback: Optional[ProgressCallback] = None) -> Iterator[List[int]]:
+    """
+    Перебор с возвратом соответствий графа (битовые маски смежности) и таблицы длин
+    Выдает списки: индекс узла графа -> индекс узла таблицы, по одному на каждый
+    различный набор длин дорог графа. Узел графа переходит только в узел таблицы из той же
+    клетки устойчивого разбиения объединения графа и таблицы. Ветви, пришедшие к одному
+    состоянию (занятые узлы таблицы, образы узлов с неназначенными соседями, длины
+    назначенных дорог), имеют одинаковые продолжения - повторная ветвь отсекается
+    explored: счетчик просмотренных вариантов [число], общий для нескольких переборов
+    """
+    target_masks = build_adjacency_masks(table_matrix)
+    n = len(source_masks)
+    if len(target_masks) != n:
+        return
+
+    # Узлы 0..n-1 объединения - граф, n..2n-1 - таблица; дорог между ними нет
+    cells = _refine_partition(source_masks + [mask << n for mask in target_masks], [list(range(2 * n))])
+    allowed = [0] * n  # Маски узлов таблицы, допустимых для узла графа
+    for cell in cells:
+        targets = sum(1 << (v - n) for v in cell if v >= n)
+        for v in cell:
+            if v < n:
+                allowed[v] = targets
+
+    # Порядок назначения: сначала узлы с наибольшим числом уже назначенных
+    # соседей, затем с большей степенью - так отсечения срабатывают раньше
+    degrees = [bin(mask).count("1") for mask in source_masks]
+    order = []
+    placed = 0
+    for _ in range(n):
+        node = max((i for i in range(n) if not placed >> i & 1),
+                   key=lambda i: (bin(source_masks[i] & placed).count("1"), degrees[i]))
+        order.append(node)
+        placed |= 1 << node
+    # Для каждого шага - уже назначенные соседи узла (номера шагов)
+    placed_neighbours = [
+        [k for k in range(depth) if source_masks[order[depth]] >> order[k] & 1]
+        for depth in range(n)
+    ]
+    # Перед каждым шагом - назначенные узлы, у которых еще есть неназначенные соседи
+    frontier = []
+    remaining = (1 << n) - 1
+    for depth in range(n + 1):
+        frontier.append([k for k in range(depth) if source_masks[order[k]] & remaining])
+        if depth < n:
+            remaining &= ~(1 << order[depth])
+
+    images = [0] * n  # Образы узлов в порядке order
+    lengths: List[Optional[int]] = []  # Длины назначенных дорог в порядке назначения
+    seen = set()
+    if explored is None:
+        explored = [0]
+
+    def extend(depth: int, used: int) -> Iterator[List[int]]:
+        _report_progress(explored, progress_callback)
+        state = (depth, used, tuple(images[k] for k in frontier[depth]), tuple(lengths))
+        if state in seen:
+            return
+        seen.add(state)
+
+        if depth == n:
+            result = [0] * n
+            for k in range(n):
+                result[order[k]] = images[k]
+            yield result
+            return
+
+        # Какие из уже занятых узлов таблицы обязаны быть соседями образа
+        expected = 0
+        for k in placed_neighbours[depth]:
+            expected |= 1 << images[k]
+
+        candidates = allowed[order[depth]] & ~used
+        while candidates:
+            candidate = (candidates & -candidates).bit_length() - 1
+            candidates &= candidates - 1
+            if target_masks[candidate] & used != expected:
+                continue
+            images[depth] = candidate
+            added = [table_matrix[candidate][images[k]] for k in placed_neighbours[depth]]
+            lengths.extend(added)
+            yield from extend(depth + 1, used | 1 << candidate)
+            del lengths[len(lengths) - len(added):]
+
+    yield from extend(0, 0)
+
+
+def _refine_partition(masks: List[int], cells: List[List[int]]) -> List[List[int]]:
+    """
+    Уточнение упорядоченного разбиения узлов: узлы одной клетки разделяются
+    по числу соседей в каждой из клеток, пока разбиение не станет устойчивым
+    Порядок клеток зависит только от структуры графа, а не от нумерации узлов
+    """
+    while True:
+        cell_masks = [sum(1 << v for v in cell) for cell in cells]
+        refined = []
+        for cell in cells:
+            if len(cell) == 1:
+                refined.append(cell)
+                continue
+            groups: Dict[Tuple[int, ...], List[int]] = {}
+            for v in cell:
+                signature = tuple(bin(masks[v] & cell_mask).count("1") for cell_mask in cell_masks)
+                groups.setdefault(signature, []).append(v)
+            refined.extend(groups[signature] for signature in sorted(groups))
+        if len(refined) == len(cells):
+            return refined
+        cells = refined
+
+
+class _BudgetExceeded(Exception):
+    """Перебор канонического вида превысил отведенное число шагов"""
+
+
+def canonical_form(masks: List[int], explored: Optional[List[int]] = None,
+                   progress_callback: Optional[ProgressCallback] = None,
+                   budget: Optional[int] = None) -> Tuple[Optional[Certificate], List[int]]:
+    """
+    Каноническая нумерация графа, заданного битовыми масками смежности
+    Возвращает (сертификат, labelling), где labelling[i] - канонический номер узла i
+    Сертификаты двух графов совпадают тогда и только тогда, когда графы изоморфны.
+    budget - наибольшее число узлов дерева поиска; при превышении - (None, [])
+    """
+    n = len(masks)
+    if explored is None:
+        explored = [0]
+    best: List[Optional[Tuple[Tuple[int, ...], List[int]]]] = [None]
+    visited = [0]
+
+    def search(cells: List[List[int]]) -> None:
+        _report_progress(explored, progress_callback)
+        visited[0] += 1
+        if budget is not None and visited[0] > budget:
+            raise _BudgetExceeded()
+        cells = _refine_partition(masks, cells)
+
+        target = next((k for k, cell in enumerate(cells) if len(cell) > 1), None)
+        if target is None:
+            # Лист дерева поиска: порядок клеток задает нумерацию
+            labelling = [0] * n
+            for position, cell in enumerate(cells):
+                labelling[cell[0]] = position
+            code = [0] * n
+            for v in range(n):
+                code[labelling[v]] = sum(1 << labelling[u] for u in range(n) if masks[v] >> u & 1)
+            code = tuple(code)
+            if best[0] is None or code > best[0][0]:
+                best[0] = (code, labelling)
+            return
+
+        tried = []
+        for v in cells[target]:
+            # Узлы-близнецы (одинаковые соседи без учета друг друга) взаимозаменяемы -
+            # их поддеревья поиска дают одинаковый результат
+            if any(masks[v] & ~(1 << u) == masks[u] & ~(1 << v) for u in tried):
+                continue
+            tried.append(v)
+            rest = [u for u in cells[target] if u != v]
+            search(cells[:target] + [[v], rest] + cells[target + 1:])
+
+    try:
+        search([list(range(n))])
+    except _BudgetExceeded:
+        return None, []
+    if best[0] is None:
+        return (0, ()), []
+    code, labelling = best[0]
+    return (n, code), labelling
+
+
+def cached_canonical_form(masks: List[int], explored: Optional[List[int]] = None,
+                          progress_callback: Optional[ProgressCallback] = None
+                          ) -> Tuple[Optional[Certificate], List[int]]:
+    """
+    canonical_form с бюджетом CANONICAL_BUDGET через общий кэш результатов: ключ - маски
+    смежности как есть, поэтому повторно введенные граф или таблица не перебираются заново
+    Прерванный перебор (SearchCancelled) не кэшируется
+    """
+    return shared_cache.get_or_compute(("solver_1.canonical_form", tuple(masks), CANONICAL_BUDGET),
+                                       lambda: canonical_form(masks, explored, progress_callback,
+                                                              CANONICAL_BUDGET))
+
+
+def _is_number(cell: str) -> bool:
+    return cell.lstrip("-").isdigit()
+
+
+def has_labels(rows: List[List[str]]) -> bool:
+    """Первая строка таблицы содержит нечисловые метки - таблица с заголовками"""
+    return bool(rows) and any(cell and cell != "-" and not _is_number(cell) for cell in rows[0])
+
+
+def parse_weight_table(text: str) -> Tuple[np.ndarray, np.ndarray, Optional[List[str]]]:
+    """
+    Разбор таблицы длин дорог из текста (CSV, ячейки Excel через табуляцию или пробелы)
+    Пустые ячейки и "-" - нет дороги. Если первая строка содержит нечисловые
+    метки, она и первый столбец считаются заголовками
+    Возвращает (длины, маска наличия дороги, метки или None)
+    Таблица должна быть квадратной: иначе ValueError с описанием неверной строки
+    """
+    # Строки из одних табуляций - пустые строки таблицы, их не отбрасываем
+    lines = [line for line in text.replace("\r", "").split("\n") if line.strip(" ")]
+    if not lines:
+        return np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0), dtype=bool), None
+
+    delimiter = next((d for d in ("\t", ";", ",") if d in lines[0]), None)
+    rows = [[cell.strip() for cell in (line.split(delimiter) if delimiter else line.split())] for line in lines]
+
+    labels = None
+    if has_labels(rows):
+        header = rows[0][1:] if len(rows[0]) == len(rows) else rows[0]
+        # Пустые ячейки в конце строки заголовков (лишние разделители) не считаются метками
+        while header and not header[-1]:
+            header = header[:-1]
+        labels = [cell for cell in header]
+        rows = [row[1:] for row in rows[1:]]
+        if len(labels) != len(rows):
+            raise ValueError(f"в заголовке {len(labels)} меток, а строк таблицы {len(rows)}")
+
+    size = len(rows)
+    values = np.zeros((size, size), dtype=np.int64)
+    mask = np.zeros((size, size), dtype=bool)
+    for i, row in enumerate(rows):
+        # Лишние пустые ячейки в конце строки допускаются, недостающие - нет
+        if len(row) < size or any(row[size:]):
+            raise ValueError(f"строка {i + 1}: {len(row)} ячеек вместо {size} - таблица должна быть квадратной")
+        for j, cell in enumerate(row[:size]):
+            if i != j and _is_number(cell):
+                values[i, j] = int(cell)
+                mask[i, j] = True
+
+    # Граф неориентированный: ячейка, заполненная только с одной стороны, дополняется симметрично
+    missing = mask.T & ~mask
+    values[missing] = values.T[missing]
+    mask |= missing
+    return values, mask, labels
+
+
+def weight_matrix(values: np.ndarray, mask: np.ndarray) -> List[List[Optional[int]]]:
+    """Матрица длин дорог списками: None - дороги нет (формат, который принимает Graph)"""
+    return [
+        [int(value) if present else None for value, present in zip(row_values, row_mask)]
+        for row_values, row_mask in zip(values.tolist(), mask.tolist())
+    ]
+
+
+def parse_edge_list(text: str) -> Graph:
+    """
+    Разбор схемы дорог из текста: по одной дороге в строке
+    "А Б" или "А-Б" - двусторонняя дорога, "А>Б" или "А->Б" - односторонняя,
+    строка из одной буквы - пункт без дорог, "#" - комментарий
+    """
+    graph = Graph()
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        directed = ">" in line
+        names = line.replace("->", " ").replace(">", " ").replace("-", " ").replace(",", " ").split()
+        if len(names) == 1 and not directed:
+            graph.add_node(names[0])
+        elif len(names) == 2 and names[0] != names[1]:
+            graph.add_edge(names[0], names[1], directed)
+        else:
+            raise ValueError(f"строка {line_number}: ожидается дорога вида \"А Б\" или \"А>Б\", получено {line!r}")
+    return graph
+
+
+def format_weight_table(values: np.ndarray, mask: np.ndarray, labels: List[str], delimiter: str = ";") -> str:
+    """Таблица длин дорог в текстовом виде с заголовками (для CSV и буфера обмена)"""
+    lines = [delimiter.join([""] + labels)]
+    for i, label in enumerate(labels):
+        cells = ["-" if i == j else (str(values[i, j]) if mask[i, j] else "") for j in range(len(labels))]
+        lines.append(delimiter.join([label] + cells))
+    return "\n".join(lines) + "\n"
+
+
+class PathCounter:
+    """
+    Подсчет путей в ориентированном графе без циклов
+    Динамика по топологическому порядку: число путей до пункта равно сумме
+    чисел путей до его предшественников - линейное время вместо перебора путей
+    """
+
+    def __init__(self, graph: Graph):
+        self.nodes = list(graph.nodes)
+        self._index = {node: i for i, node in enumerate(self.nodes)}
+        self._successors = [[self._index[next_node] for next_node in next_nodes]
+                            for next_nodes in (graph.successors()[node] for node in self.nodes)]
+        self.order = self._topological_order()
+        self._position = [0] * len(self.nodes)
+        for position, node in enumerate(self.order):
+            self._position[node] = position
+
+    def _topological_order(self) -> List[int]:
+        """Топологический порядок (алгоритм Кана); при наличии цикла - ValueError"""
+        n = len(self.nodes)
+        in_degree = [0] * n
+        for next_nodes in self._successors:
+            for node in next_nodes:
+                in_degree[node] += 1
+        order = [node for node in range(n) if in_degree[node] == 0]
+        for node in order:
+            for next_node in self._successors[node]:
+                in_degree[next_node] -= 1
+                if in_degree[next_node] == 0:
+                    order.append(next_node)
+        if len(order) < n:
+            cycle = self._find_cycle({node for node in range(n) if in_degree[node] > 0})
+            raise ValueError("граф содержит цикл: " + " → ".join(self.nodes[node] for node in cycle))
+        return order
+
+    def _find_cycle(self, remaining: set) -> List[int]:
+        """Цикл среди пунктов, не попавших в топологический порядок"""
+        # У каждого такого пункта есть предшественник среди них же - идем назад до повтора
+        predecessors: Dict[int, int] = {}
+        for node in remaining:
+            for next_node in self._successors[node]:
+                if next_node in remaining:
+                    predecessors.setdefault(next_node, node)
+        node = min(remaining)
+        seen: Dict[int, int] = {}
+        path = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = predecessors[node]
+        cycle = path[seen[node]:] + [node]
+        cycle.reverse()
+        return cycle
+
+    def count(self, source: str, target: str, through: Tuple[str, ...] = (), avoid: Tuple[str, ...] = ()) -> int:
+        """
+        Число путей из source в target, проходящих через все пункты through
+        и не проходящих через пункты avoid
+        """
+        for node in (source, target) + tuple(through) + tuple(avoid):
+            if node not in self._index:
+                raise ValueError(f"пункт {node} не найден в графе")
+
+        avoided = {self._index[node] for node in avoid}
+        # Путь в графе без циклов проходит обязательные пункты в топологическом порядке,
+        # поэтому ответ - произведение чисел путей между соседними обязательными пунктами
+        stops = sorted({self._index[node] for node in through} - {self._index[source], self._index[target]},
+                       key=lambda node: self._position[node])
+        stops = [self._index[source]] + stops + [self._index[target]]
+        if avoided & set(stops):
+            return 0
+
+        total = 1
+        for start, finish in zip(stops, stops[1:]):
+            total *= self._count_segment(start, finish, avoided)
+            if total == 0:
+                break
+        return total
+
+    def _count_segment(self, start: int, finish: int, avoided: set) -> int:
+        """Число путей между двумя пунктами в обход avoided"""
+        if start == finish:
+            return 1
+        first, last = self._position[start], self._position[finish]
+        if first > last:
+            return 0
+        ways = [0] * len(self.nodes)
+        ways[start] = 1
+        for node in self.order[first:last]:
+            if ways[node] and node not in avoided:
+                for next_node in self._successors[node]:
+                    ways[next_node] += ways[node]
+        return ways[finish]
+
+
+class RouteQueryEngine:
+    """
+    Запросы маршрутов по таблице длин дорог
+    Кратчайшие пути: Дейкстра с двоичной кучей от каждого источника (результат
+    кэшируется по источнику) или Флойд-Уоршелл на NumPy для небольших таблиц.
+    Длины дорог должны быть неотрицательными. Движок не следит за таблицей:
+    при ее изменении создается новый
+    """
+
+    # До какого числа пунктов выгоднее сразу посчитать все пары Флойдом-Уоршеллом
+    FLOYD_WARSHALL_LIMIT = 64
+
+    def __init__(self, values: np.ndarray, mask: np.ndarray):
+        self.values = np.array(values, dtype=np.int64)
+        self.mask = np.array(mask, dtype=bool)
+        self.size = len(self.values)
+        # Списки смежности: пункт -> [(сосед, длина)]
+        self._neighbours = [
+            [(j, int(self.values[i, j])) for j in np.flatnonzero(self.mask[i])] for i in range(self.size)
+        ]
+        self._dijkstra_cache: Dict[int, Tuple[List[float], List[int]]] = {}
+        # Все пары: матрица расстояний и следующий пункт на кратчайшем пути (-1 - нет)
+        self._all_pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def _dijkstra(self, source: int) -> Tuple[List[float], List[int]]:
+        """Расстояния от source и предшественники на кратчайших путях (-1 - нет)"""
+        if source not in self._dijkstra_cache:
+            distances = [math.inf] * self.size
+            previous = [-1] * self.size
+            distances[source] = 0
+            heap = [(0, source)]
+            while heap:
+                distance, node = heapq.heappop(heap)
+                if distance > distances[node]:
+                    continue  # Устаревшая запись кучи
+                for neighbour, length in self._neighbours[node]:
+                    candidate = distance + length
+                    if candidate < distances[neighbour]:
+                        distances[neighbour] = candidate
+                        previous[neighbour] = node
+                        heapq.heappush(heap, (candidate, neighbour))
+            self._dijkstra_cache[source] = (distances, previous)
+        return self._dijkstra_cache[source]
+
+    def all_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Флойд-Уоршелл для всех пар: (матрица кратчайших расстояний, inf - пути нет;
+        следующий пункт на кратчайшем пути от i к j, -1 - пути нет)
+        """
+        if self._all_pairs is None:
+            distances = np.where(self.mask, self.values.astype(float), math.inf)
+            np.fill_diagonal(distances, 0)
+            following = np.where(self.mask, np.arange(self.size)[None, :], -1)
+            np.fill_diagonal(following, np.arange(self.size))
+            # Каждый шаг - одна векторная операция над всей матрицей
+            for k in range(self.size):
+                through = distances[:, k, None] + distances[None, k, :]
+                shorter = through < distances
+                distances[shorter] = through[shorter]
+                following[shorter] = np.broadcast_to(following[:, k, None], following.shape)[shorter]
+            self._all_pairs = (distances, following)
+        return self._all_pairs
+
+    def shortest_path(self, source: int, target: int) -> Tuple[Optional[int], List[int]]:
+        """
+        Кратчайший маршрут: (длина, список пунктов) или (None, []), если пути нет
+        Небольшие таблицы считаются сразу для всех пар, остальные - Дейкстрой от source
+        """
+        if self.size <= self.FLOYD_WARSHALL_LIMIT:
+            distances, following = self.all_pairs()
+            if math.isinf(distances[source, target]):
+                return None, []
+            path = [source]
+            while path[-1] != target:
+                path.append(int(following[path[-1], target]))
+            return int(distances[source, target]), path
+
+        distances, previous = self._dijkstra(source)
+        if math.isinf(distances[target]):
+            return None, []
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        path.reverse()
+        return int(distances[target]), path
+
+
+def solve_files(graph_path: str, table_path: str, find_all: bool = False) -> Tuple[Graph, List[str], List[Dict[str, str]]]:
+    """Решение задачи из файлов схемы и таблицы: (граф, метки таблицы, найденные соответствия)"""
+    with open(graph_path, encoding="utf-8") as file:
+        graph = parse_edge_list(file.read())
+    with open(table_path, encoding="utf-8-sig") as file:
+        values, mask, labels = parse_weight_table(file.read())
+    labels = labels or [f"П{i + 1}" for i in range(len(values))]
+    table_matrix = weight_matrix(values, mask)
+
+    if find_all:
+        mappings = graph.find_all_isomorphisms(table_matrix, labels)
+    else:
+        mapping = graph.find_isomorphism(table_matrix, labels)
+        mappings = [mapping] if mapping else []
+    return graph, labels, mappings
+
+
+def format_mapping(graph: Graph, mapping: Dict[str, str]) -> str:
+    """Соответствие в виде строки "А=П3 Б=П1 ..." в порядке пунктов схемы"""
+    return " ".join(f"{node}={mapping[node]}" for node in graph.nodes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Консольный запуск: для каждой пары (схема, таблица) печатает найденное соответствие
+    Код возврата 1, если хотя бы одна задача не решена
+    """
+    parser = argparse.ArgumentParser(description="Сопоставление схемы дорог и таблицы длин без графического интерфейса")
+    parser.add_argument("files", nargs="+", metavar="СХЕМА ТАБЛИЦА",
+                        help="пары файлов: список дорог схемы и таблица длин (CSV, табуляция или пробелы)")
+    parser.add_argument("--all", action="store_true", dest="find_all",
+                        help="вывести все различные соответствия, а не первое найденное")
+    args = parser.parse_args(argv)
+    if len(args.files) % 2:
+        parser.error("файлы задаются парами: схема и таблица")
+
+    failed = 0
+    for graph_path, table_path in zip(args.files[::2], args.files[1::2]):
+        prefix = f"{graph_path}: " if len(args.files) > 2 else ""
+        try:
+            graph, labels, mappings = solve_files(graph_path, table_path, args.find_all)
+        except (OSError, ValueError) as e:
+            print(f"{prefix}ошибка: {e}", file=sys.stderr)
+            failed += 1
+            continue
+
+        if not mappings:
+            print(f"{prefix}соответствие не найдено")
+            failed += 1
+        for mapping in mappings:
+            print(prefix + format_mapping(graph, mapping))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
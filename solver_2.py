@@ -1,45 +1,20 @@
 from tkinter import *
 from tkinter import ttk
-from tkinter.ttk import Treeview
-from itertools import permutations
 import numpy as np
+from solver_2_core import Solver, formula_variables, to_python, truth_table
 
-window = Tk()  # Создание главного окна приложения
+window = None  # Главное окно приложения, создается в main()
+entry = None  # Поле для ввода формулы
 
 
 class Formule:
     def __init__(self, form):
-        self.form = form
-        # Замена логических символов на операторы Python
-        if '∨' in self.form: self.form = self.form.replace('∨', ' or ')
-        if '∧' in self.form: self.form = self.form.replace('∧', ' and ')
-        if '¬' in self.form: self.form = self.form.replace('¬', ' not ')
-        if '≡' in self.form: self.form = self.form.replace('≡', ' == ')
-        if '→' in self.form: self.form = self.form.replace('→', ' <= ')
-
-        self.spisok = []  # Список для хранения переменных формулы
-        peremennie = ['x', 'y', 'z', 'w', 'u', 'F']  # Возможные переменные
-        # Добавление переменных, которые есть в формуле
-        for i in peremennie:
-            if i in form: self.spisok.append(i)
-
+        self.form = to_python(form)  # Формула в виде выражения Python
+        self.spisok = formula_variables(form)  # Переменные, которые есть в формуле
         self.tablitsa = []  # Таблица истинности
 
     def print_table(self):
-        # Генерация всех возможных комбинаций значений переменных
-        for x in (0, 1):
-            for y in (0, 1):
-                for z in (0, 1):
-                    for w in (0, 1):
-                        for u in (0, 1):
-                            peremennye = [x, y, z, w, u]
-                            # Берем только нужные переменные
-                            noviy_spisok = peremennye[:len(self.spisok)]
-                            # Вычисляем значение формулы и добавляем результат
-                            noviy_spisok.append(int(eval(self.form)))
-                            # Добавляем строку в таблицу, если ее еще нет
-                            if noviy_spisok not in self.tablitsa:
-                                self.tablitsa.append(noviy_spisok)
+        self.tablitsa = truth_table(self.form)
         self.draw_table()  # Отрисовка таблицы
 
     def draw_table(self):
@@ -118,41 +93,7 @@ class Entry_table:
         ans_label.pack(anchor="se")
 
 
-class Solver:
-    def __init__(self, matrix, true_table):
-        self.matrix = np.array(matrix)  # Входная матрица (частично заполненная)
-        self.true_table = np.array(true_table)  # Полная таблица истинности
-
-    def check_ans(self, ans):
-        # Проверка соответствия кандидата на решение входной матрице
-        for y in range(len(self.matrix)):
-            for x in range(len(self.matrix[0])):
-                # None означает, что ячейка не заполнена
-                if self.matrix[y, x] != ans[y, x] and self.matrix[y, x] is not None:
-                    return False
-        return True
-
-    def solve(self):
-        n_rows, n_cols = len(self.true_table), len(self.true_table[0])
-        k = len(self.matrix)  # Количество строк во входной матрице
-
-        # Генерация всех возможных перестановок строк и столбцов
-        row_perms = list(permutations(range(n_rows), k))
-        col_perms = list(permutations(range(n_cols - 1)))  # -1 т.к. последний столбец F фиксирован
-
-        # Перебор всех комбинаций перестановок столбцов и строк
-        for col_perm in col_perms:
-            # Создание новой таблицы с переставленными столбцами
-            new_table = self.true_table[:, tuple(list(col_perm) + [len(self.matrix[0]) - 1])]
-
-            for row_perm in row_perms:
-                pos_ans = new_table[row_perm, :]  # Кандидат на решение
-                if self.check_ans(pos_ans):
-                    return pos_ans, row_perm, col_perm  # Найдено решение
-        return None, None, None  # Решение не найдено
-
-
-def main():
+def start():
     text = entry.get()  # Получение формулы из поля ввода
     a = Formule(text)  # Создание объекта формулы
     a.print_table()  # Построение и отображение таблицы истинности
@@ -162,10 +103,17 @@ def main():
     b.draw_button()
 
 
-# Создание элементов интерфейса
-entry = ttk.Entry(width=50)  # Поле для ввода формулы
-entry.pack(side=BOTTOM)
-knopka = ttk.Button(text="Продолжить", command=main)  # Кнопка для запуска
-knopka.pack(side=BOTTOM)
+def main():
+    global window, entry
+    window = Tk()  # Создание главного окна приложения
+    # Создание элементов интерфейса
+    entry = ttk.Entry(width=50)  # Поле для ввода формулы
+    entry.pack(side=BOTTOM)
+    knopka = ttk.Button(text="Продолжить", command=start)  # Кнопка для запуска
+    knopka.pack(side=BOTTOM)
+
+    window.mainloop()  # Запуск главного цикла приложения
+
 
-window.mainloop()  # Запуск главного цикла приложения
+if __name__ == "__main__":
+    main()
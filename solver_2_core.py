@@ -0,0 +1,95 @@
+"""
+Ядро решателя задачи о фрагменте таблицы истинности (без графического интерфейса)
+Построение таблицы истинности формулы и поиск порядка столбцов, при котором
+частично заполненный фрагмент совпадает с таблицей
+"""
+from itertools import permutations, product
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+from result_cache import shared_cache
+
+# Замена логических символов на операторы Python
+OPERATORS = {'∨': ' or ', '∧': ' and ', '¬': ' not ', '≡': ' == ', '→': ' <= '}
+# Возможные переменные формулы в порядке столбцов таблицы
+VARIABLES = ['x', 'y', 'z', 'w', 'u']
+
+
+def to_python(form: str) -> str:
+    """Формула с логическими знаками в виде выражения Python"""
+    for sign, operator in OPERATORS.items():
+        form = form.replace(sign, operator)
+    return form
+
+
+def formula_variables(form: str) -> List[str]:
+    """Переменные, которые есть в формуле"""
+    return [v for v in VARIABLES if v in form]
+
+
+def truth_table(form: str) -> List[List[int]]:
+    """
+    Строки таблицы истинности: значения переменных, затем значение формулы
+    Столбцы - значения именно тех переменных, что есть в формуле, даже если это не первые
+    из x, y, z, w, u. Прежняя версия подписывала столбцы переменными формулы, но заполняла
+    их значениями x, y, ... по порядку (для "y ∧ w" - значениями x и y), и строки не
+    соответствовали заголовкам
+
+    >>> truth_table("y ∧ w")
+    [[0, 0, 0], [0, 1, 0], [1, 0, 0], [1, 1, 1]]
+    """
+    variables = formula_variables(form)
+    code = compile(to_python(form), "<формула>", "eval")
+    table = []
+    for values in product((0, 1), repeat=len(variables)):
+        row = list(values)
+        row.append(int(eval(code, {}, dict(zip(variables, values)))))
+        table.append(row)
+    return table
+
+
+class Solver:
+    def __init__(self, matrix, true_table):
+        self.matrix = np.array(matrix)  # Входная матрица (частично заполненная)
+        self.true_table = np.array(true_table)  # Полная таблица истинности
+
+    def check_ans(self, ans):
+        # Проверка соответствия кандидата на решение входной матрице
+        for y in range(len(self.matrix)):
+            for x in range(len(self.matrix[0])):
+                # None означает, что ячейка не заполнена
+                if self.matrix[y, x] != ans[y, x] and self.matrix[y, x] is not None:
+                    return False
+        return True
+
+    def solve(self, checkpoint: Optional[Callable[[], None]] = None) \
+            -> Tuple[Optional[np.ndarray], Optional[tuple], Optional[tuple]]:
+        """
+        Перебор через общий кэш результатов: ключ - таблица истинности и фрагмент,
+        поэтому разные записи одной и той же формулы решаются один раз.
+        checkpoint вызывается на каждом шаге перебора и может прервать его исключением
+        """
+        key = ("solver_2.fragment", tuple(map(tuple, self.true_table.tolist())),
+               tuple(map(tuple, self.matrix.tolist())))
+        return shared_cache.get_or_compute(key, lambda: self._search(checkpoint))
+
+    def _search(self, checkpoint: Optional[Callable[[], None]]) \
+            -> Tuple[Optional[np.ndarray], Optional[tuple], Optional[tuple]]:
+        n_rows, n_cols = len(self.true_table), len(self.true_table[0])
+        k = len(self.matrix)  # Количество строк во входной матрице
+
+        # Перестановки столбцов; перестановки строк перебираются без списка - их бывают сотни миллионов
+        col_perms = list(permutations(range(n_cols - 1)))  # -1 т.к. последний столбец F фиксирован
+
+        # Перебор всех комбинаций перестановок столбцов и строк
+        for col_perm in col_perms:
+            # Создание новой таблицы с переставленными столбцами
+            new_table = self.true_table[:, tuple(list(col_perm) + [len(self.matrix[0]) - 1])]
+
+            for row_perm in permutations(range(n_rows), k):
+                if checkpoint is not None:
+                    checkpoint()
+                pos_ans = new_table[row_perm, :]  # Кандидат на решение
+                if self.check_ans(pos_ans):
+                    return pos_ans, row_perm, col_perm  # Найдено решение
+        return None, None, None  # Решение не найдено
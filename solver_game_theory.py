@@ -4,143 +4,10 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QRadioButton, QComboBox, QTextEdit, QGroupBox,
                                QMessageBox, QScrollArea, QFrame)
 from PySide6.QtCore import Qt
-from typing import List, Tuple, Optional
-from abc import ABC, abstractmethod
-
-
-class GameSolver(ABC):
-    """Абстрактный класс решателя игровых задач"""
-
-    def __init__(self, win_condition: str, win_value: int, moves: List[str]):
-        self.win_condition = win_condition
-        self.win_value = win_value
-        self.moves = moves
-
-    @abstractmethod
-    def solve(self, *args, **kwargs) -> List[int]:
-        pass
-
-    def parse_move(self, move_str: str, heap_name: str = "Heap") -> str:
-        """Парсит строку хода в выражение"""
-        try:
-            if move_str.startswith("+"):
-                value = int(move_str[1:])
-                return f"{heap_name}+{value}"
-            elif move_str.startswith("*"):
-                value = int(move_str[1:])
-                return f"{heap_name}*{value}"
-            elif move_str.startswith("-"):
-                value = int(move_str[1:])
-                return f"{heap_name}-{value}"
-            else:
-                return move_str.replace("x", heap_name).replace("X", heap_name)
-        except:
-            return move_str
-
-
-class OneHeapSolver(GameSolver):
-    """Решатель для задач с одной кучей"""
-
-    def __init__(self, win_condition: str, win_value: int, moves: List[str]):
-        super().__init__(win_condition, win_value, moves)
-        self._memo = {}
-
-    def _can_win(self, heap: int, steps: int) -> bool:
-        """Рекурсивная функция проверки выигрышной позиции"""
-        if (heap, steps) in self._memo:
-            return self._memo[(heap, steps)]
-
-        if eval(f"heap {self.win_condition} {self.win_value}"):
-            result = steps % 2 == 0
-            self._memo[(heap, steps)] = result
-            return result
-
-        if steps == 0:
-            self._memo[(heap, steps)] = False
-            return False
-
-        strategies = []
-        for move in self.moves:
-            new_heap_expr = self.parse_move(move, "heap")
-            try:
-                new_heap = eval(new_heap_expr)
-                strategies.append(self._can_win(new_heap, steps - 1))
-            except Exception:
-                continue
-
-        if not strategies:
-            result = False
-        else:
-            result = any(strategies) if (steps - 1) % 2 == 0 else all(strategies)
-
-        self._memo[(heap, steps)] = result
-        return result
-
-    def solve(self, start: int, end: int, win_steps: int, lose_steps: int) -> List[int]:
-        """Находит все решения в диапазоне"""
-        results = []
-        for s in range(start, end + 1):
-            self._memo = {}
-            if not self._can_win(s, lose_steps) and self._can_win(s, win_steps):
-                results.append(s)
-        return results
-
-
-class TwoHeapsSolver(GameSolver):
-    """Решатель для задач с двумя кучами"""
-
-    def __init__(self, win_condition: str, win_value: int, moves: List[str]):
-        super().__init__(win_condition, win_value, moves)
-        self._memo = {}
-
-    def _can_win(self, heap1: int, heap2: int, steps: int) -> bool:
-        """Рекурсивная функция проверки выигрышной позиции"""
-        if (heap1, heap2, steps) in self._memo:
-            return self._memo[(heap1, heap2, steps)]
-
-        if eval(f"heap1 + heap2 {self.win_condition} {self.win_value}"):
-            result = steps % 2 == 0
-            self._memo[(heap1, heap2, steps)] = result
-            return result
-
-        if steps == 0:
-            self._memo[(heap1, heap2, steps)] = False
-            return False
-
-        strategies = []
-        for move in self.moves:
-            # Ходы для первой кучи
-            new_heap1_expr = self.parse_move(move, "heap1")
-            try:
-                new_heap1 = eval(new_heap1_expr)
-                strategies.append(self._can_win(new_heap1, heap2, steps - 1))
-            except Exception:
-                pass
-
-            # Ходы для второй кучи
-            new_heap2_expr = self.parse_move(move, "heap2")
-            try:
-                new_heap2 = eval(new_heap2_expr)
-                strategies.append(self._can_win(heap1, new_heap2, steps - 1))
-            except Exception:
-                pass
-
-        if not strategies:
-            result = False
-        else:
-            result = any(strategies) if (steps - 1) % 2 == 0 else all(strategies)
-
-        self._memo[(heap1, heap2, steps)] = result
-        return result
-
-    def solve(self, start: int, end: int, heap2_val: int, win_steps: int, lose_steps: int) -> List[int]:
-        """Находит все решения в диапазоне"""
-        results = []
-        for s in range(start, end + 1):
-            self._memo = {}
-            if not self._can_win(s, heap2_val, lose_steps) and self._can_win(s, heap2_val, win_steps):
-                results.append(s)
-        return results
+from PySide6.QtGui import QCloseEvent
+from typing import List, Optional
+from solver_game_theory_core import OneHeapSolver, ProblemInputValidator, TwoHeapsSolver
+from task_pool import SolverTask, check_cancelled, run_in_pool
 
 
 class MoveFieldManager:
@@ -197,35 +64,6 @@ class MoveFieldManager:
         self.move_fields.clear()
 
 
-class ProblemInputValidator:
-    """Валидатор входных данных"""
-
-    @staticmethod
-    def validate_int(value: str, field_name: str) -> Tuple[bool, Optional[int]]:
-        """Проверяет целочисленное значение"""
-        try:
-            return True, int(value)
-        except ValueError:
-            return False, None
-
-    @staticmethod
-    def validate_range(start: str, end: str) -> Tuple[bool, Optional[Tuple[int, int]]]:
-        """Проверяет диапазон значений"""
-        try:
-            start_val = int(start)
-            end_val = int(end)
-            if start_val <= end_val:
-                return True, (start_val, end_val)
-            return False, None
-        except ValueError:
-            return False, None
-
-    @staticmethod
-    def validate_win_condition(condition: str) -> bool:
-        """Проверяет условие победы"""
-        return condition in [">=", "==", ">", "<", "<="]
-
-
 class ResultsDisplay:
     """Управление отображением результатов"""
 
@@ -240,7 +78,6 @@ class ResultsDisplay:
         """Показывает сообщение о загрузке"""
         self.clear()
         self.text_widget.append("Вычисление...")
-        QApplication.processEvents()
 
     def show_results(self, results: List[int]) -> None:
         """Отображает результаты вычислений"""
@@ -268,6 +105,8 @@ class GameTheorySolverApp(QMainWindow):
         self.setGeometry(100, 100, 800, 600)
 
         self.validator = ProblemInputValidator()
+        # Фоновый перебор позиций (None - не выполняется)
+        self.task: Optional[SolverTask] = None
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -421,6 +260,7 @@ class GameTheorySolverApp(QMainWindow):
         layout = QHBoxLayout()
 
         solve_btn = QPushButton("Решить")
+        self.solve_btn = solve_btn
         solve_btn.clicked.connect(self.solve)
         layout.addWidget(solve_btn)
 
@@ -488,17 +328,38 @@ class GameTheorySolverApp(QMainWindow):
 
             if self.one_heap_radio.isChecked():
                 solver = OneHeapSolver(win_cond, win_val, moves)
-                results = solver.solve(start, end, win_steps, lose_steps)
+                args = (start, end, win_steps, lose_steps)
             else:
                 heap2_val = int(self.second_heap_value.text())
                 solver = TwoHeapsSolver(win_cond, win_val, moves)
-                results = solver.solve(start, end, heap2_val, win_steps, lose_steps)
+                args = (start, end, heap2_val, win_steps, lose_steps)
 
-            self.results_display.show_results(results)
+            # Перебор позиций идет в общем пуле потоков - окно не замирает
+            self.solve_btn.setEnabled(False)
+            self.task = run_in_pool(solver.solve, args + (check_cancelled,), self._on_solved, self._on_failed)
 
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при вычислениях: {str(e)}")
-            self.results_display.show_error(str(e))
+            self._on_failed(str(e))
+
+    def _on_solved(self, results: List[int]) -> None:
+        """Вывод результатов фонового вычисления"""
+        self.task = None
+        self.solve_btn.setEnabled(True)
+        self.results_display.show_results(results)
+
+    def _on_failed(self, message: str) -> None:
+        """Ошибка при вычислениях"""
+        self.task = None
+        self.solve_btn.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при вычислениях: {message}")
+        self.results_display.show_error(message)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Отмена фонового перебора при закрытии окна"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task.wait()
+        super().closeEvent(event)
 
     def validate_inputs(self) -> bool:
         """Проверяет корректность входных данных"""
@@ -570,8 +431,12 @@ class GameTheorySolverApp(QMainWindow):
         msg.exec()
 
 
-if __name__ == "__main__":
+def main() -> int:
     app = QApplication(sys.argv)
     window = GameTheorySolverApp()
     window.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
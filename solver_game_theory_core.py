@@ -0,0 +1,198 @@
+"""
+Ядро решателя задач теории игр ЕГЭ (без графического интерфейса)
+Перебор позиций с запоминанием для одной и двух куч камней.
+checkpoint в solve вызывается перед каждой начальной позицией и может прервать перебор исключением
+"""
+from typing import Callable, List, Tuple, Optional
+from abc import ABC, abstractmethod
+
+from result_cache import shared_cache
+
+
+class GameSolver(ABC):
+    """Абстрактный класс решателя игровых задач"""
+
+    def __init__(self, win_condition: str, win_value: int, moves: List[str]):
+        self.win_condition = win_condition
+        self.win_value = win_value
+        self.moves = moves
+
+    @abstractmethod
+    def solve(self, *args, **kwargs) -> List[int]:
+        pass
+
+    def cache_key(self, *args) -> tuple:
+        """
+        Нормализованный вид задачи для общего кэша результатов: порядок и повторы ходов
+        на ответ не влияют
+        """
+        moves = tuple(sorted(set(self.moves)))
+        return (type(self).__name__, self.win_condition.strip(), self.win_value, moves) + args
+
+    def parse_move(self, move_str: str, heap_name: str = "Heap") -> str:
+        """Парсит строку хода в выражение"""
+        try:
+            if move_str.startswith("+"):
+                value = int(move_str[1:])
+                return f"{heap_name}+{value}"
+            elif move_str.startswith("*"):
+                value = int(move_str[1:])
+                return f"{heap_name}*{value}"
+            elif move_str.startswith("-"):
+                value = int(move_str[1:])
+                return f"{heap_name}-{value}"
+            else:
+                return move_str.replace("x", heap_name).replace("X", heap_name)
+        except:
+            return move_str
+
+
+class OneHeapSolver(GameSolver):
+    """Решатель для задач с одной кучей"""
+
+    def __init__(self, win_condition: str, win_value: int, moves: List[str]):
+        super().__init__(win_condition, win_value, moves)
+        self._memo = {}
+
+    def _can_win(self, heap: int, steps: int) -> bool:
+        """Рекурсивная функция проверки выигрышной позиции"""
+        if (heap, steps) in self._memo:
+            return self._memo[(heap, steps)]
+
+        if eval(f"heap {self.win_condition} {self.win_value}"):
+            result = steps % 2 == 0
+            self._memo[(heap, steps)] = result
+            return result
+
+        if steps == 0:
+            self._memo[(heap, steps)] = False
+            return False
+
+        strategies = []
+        for move in self.moves:
+            new_heap_expr = self.parse_move(move, "heap")
+            try:
+                new_heap = eval(new_heap_expr)
+                strategies.append(self._can_win(new_heap, steps - 1))
+            except Exception:
+                continue
+
+        if not strategies:
+            result = False
+        else:
+            result = any(strategies) if (steps - 1) % 2 == 0 else all(strategies)
+
+        self._memo[(heap, steps)] = result
+        return result
+
+    def solve(self, start: int, end: int, win_steps: int, lose_steps: int,
+              checkpoint: Optional[Callable[[], None]] = None) -> List[int]:
+        """Находит все решения в диапазоне"""
+        return shared_cache.get_or_compute(self.cache_key(start, end, win_steps, lose_steps),
+                                           lambda: self._search(start, end, win_steps, lose_steps, checkpoint))
+
+    def _search(self, start: int, end: int, win_steps: int, lose_steps: int,
+                checkpoint: Optional[Callable[[], None]]) -> List[int]:
+        results = []
+        for s in range(start, end + 1):
+            if checkpoint is not None:
+                checkpoint()
+            self._memo = {}
+            if not self._can_win(s, lose_steps) and self._can_win(s, win_steps):
+                results.append(s)
+        return results
+
+
+class TwoHeapsSolver(GameSolver):
+    """Решатель для задач с двумя кучами"""
+
+    def __init__(self, win_condition: str, win_value: int, moves: List[str]):
+        super().__init__(win_condition, win_value, moves)
+        self._memo = {}
+
+    def _can_win(self, heap1: int, heap2: int, steps: int) -> bool:
+        """Рекурсивная функция проверки выигрышной позиции"""
+        if (heap1, heap2, steps) in self._memo:
+            return self._memo[(heap1, heap2, steps)]
+
+        if eval(f"heap1 + heap2 {self.win_condition} {self.win_value}"):
+            result = steps % 2 == 0
+            self._memo[(heap1, heap2, steps)] = result
+            return result
+
+        if steps == 0:
+            self._memo[(heap1, heap2, steps)] = False
+            return False
+
+        strategies = []
+        for move in self.moves:
+            # Ходы для первой кучи
+            new_heap1_expr = self.parse_move(move, "heap1")
+            try:
+                new_heap1 = eval(new_heap1_expr)
+                strategies.append(self._can_win(new_heap1, heap2, steps - 1))
+            except Exception:
+                pass
+
+            # Ходы для второй кучи
+            new_heap2_expr = self.parse_move(move, "heap2")
+            try:
+                new_heap2 = eval(new_heap2_expr)
+                strategies.append(self._can_win(heap1, new_heap2, steps - 1))
+            except Exception:
+                pass
+
+        if not strategies:
+            result = False
+        else:
+            result = any(strategies) if (steps - 1) % 2 == 0 else all(strategies)
+
+        self._memo[(heap1, heap2, steps)] = result
+        return result
+
+    def solve(self, start: int, end: int, heap2_val: int, win_steps: int, lose_steps: int,
+              checkpoint: Optional[Callable[[], None]] = None) -> List[int]:
+        """Находит все решения в диапазоне"""
+        return shared_cache.get_or_compute(
+            self.cache_key(start, end, heap2_val, win_steps, lose_steps),
+            lambda: self._search(start, end, heap2_val, win_steps, lose_steps, checkpoint))
+
+    def _search(self, start: int, end: int, heap2_val: int, win_steps: int, lose_steps: int,
+                checkpoint: Optional[Callable[[], None]]) -> List[int]:
+        results = []
+        for s in range(start, end + 1):
+            if checkpoint is not None:
+                checkpoint()
+            self._memo = {}
+            if not self._can_win(s, heap2_val, lose_steps) and self._can_win(s, heap2_val, win_steps):
+                results.append(s)
+        return results
+
+
+class ProblemInputValidator:
+    """Валидатор входных данных"""
+
+    @staticmethod
+    def validate_int(value: str, field_name: str) -> Tuple[bool, Optional[int]]:
+        """Проверяет целочисленное значение"""
+        try:
+            return True, int(value)
+        except ValueError:
+            return False, None
+
+    @staticmethod
+    def validate_range(start: str, end: str) -> Tuple[bool, Optional[Tuple[int, int]]]:
+        """Проверяет диапазон значений"""
+        try:
+            start_val = int(start)
+            end_val = int(end)
+            if start_val <= end_val:
+                return True, (start_val, end_val)
+            return False, None
+        except ValueError:
+            return False, None
+
+    @staticmethod
+    def validate_win_condition(condition: str) -> bool:
+        """Проверяет условие победы"""
+        return condition in [">=", "==", ">", "<", "<="]
@@ -0,0 +1,855 @@
+"""
+Ядро решателя задания 15 ЕГЭ (отрезки на числовой прямой) без графического интерфейса
+Числовая прямая разбивается концами заданных отрезков на элементарные участки:
+внутри каждого участка принадлежность x всем отрезкам одинакова, поэтому формула
+вычисляется один раз на участок, а не в каждой точке
+"""
+import argparse
+import json
+import math
+import re
+import sys
+from functools import lru_cache, reduce
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+
+from result_cache import shared_cache
+
+# Отрезок [начало, конец]
+Interval = Tuple[int, int]
+# Формула: по принадлежности x каждому отрезку (имя -> bool) возвращает значение F(x)
+Formula = Callable[[Dict[str, bool]], bool]
+
+# Имя искомого отрезка
+SOUGHT = "A"
+
+# Кнопки вставки в выражение (надпись, вставляемый текст) - общие для окон на Tk и Qt
+SYMBOLS = [
+    ("x∈P", "x in P"),
+    ("x∈Q", "x in Q"),
+    ("x∈A", "x in A"),
+    ("¬", " not "),
+    ("∧", " and "),
+    ("∨", " or "),
+    ("→", " -> "),
+    ("≡", " == "),
+    ("ДЕЛ", "ДЕЛ(x, A)"),
+    ("x&A", "x & A ≠ 0"),
+]
+
+
+class FormulaError(ValueError):
+    """Ошибка разбора логического выражения"""
+
+
+# Лексемы выражения: принадлежность x отрезку, операции (в записи Python и логическими знаками), скобки
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<member>x\s*(?:\bin\b|∈)\s*(?P<member_name>[^\W\d]\w*))
+      | (?P<bit>(?:x\s*&\s*(?P<bit_arg>\w+)|\(\s*x\s*&\s*(?P<bit_arg_paren>\w+)\s*\))\s*(?P<bit_op>≠|!=|==|=)\s*0\b)
+      | (?P<div>ДЕЛ\s*\(\s*x\s*,\s*(?P<div_arg>\w+)\s*\))
+      | (?P<not>¬|\bnot\b|!(?!=))
+      | (?P<and>∧|\band\b|&&)
+      | (?P<or>∨|\bor\b|\|\|)
+      | (?P<implies>→|->|=>|<=)
+      | (?P<equiv>≡|↔|<->|==)
+      | (?P<xor>⊕|≠|!=|\bxor\b)
+      | (?P<const>[01]|\bTrue\b|\bFalse\b)
+      | (?P<name>[^\W\d]\w*)
+      | (?P<lparen>\()
+      | (?P<rparen>\))
+    )""", re.VERBOSE)
+
+_TOKEN_KINDS = ("member", "bit", "div", "not", "and", "or", "implies", "equiv", "xor", "const", "name", "lparen", "rparen")
+
+# Двуместные операции по возрастанию приоритета: ≡ и ⊕, →, ∨, ∧ (¬ - выше всех)
+_BINARY_LEVELS = (("equiv", "xor"), ("implies",), ("or",), ("and",))
+_OPERATIONS = {
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+    "implies": lambda a, b: (not a) or b,
+    "equiv": lambda a, b: a == b,
+    "xor": lambda a, b: a != b,
+}
+
+
+def divisibility_name(argument: str) -> str:
+    """Имя переменной для условия ДЕЛ(x, N): "x делится на N" """
+    return f"ДЕЛ(x,{argument})"
+
+
+def divisibility_argument(name: str) -> Optional[str]:
+    """Делитель из имени переменной ДЕЛ(x, N) или None для отрезков"""
+    if name.startswith("ДЕЛ(x,") and name.endswith(")"):
+        return name[len("ДЕЛ(x,"):-1]
+    return None
+
+
+def bitwise_name(argument: str) -> str:
+    """Имя переменной для условия x & N ≠ 0"""
+    return f"x&{argument}"
+
+
+def bitwise_argument(name: str) -> Optional[str]:
+    """Второй операнд из имени переменной x & N ≠ 0 или None для других условий"""
+    return name[len("x&"):] if name.startswith("x&") else None
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    """Разбиение выражения на лексемы (вид, значение)"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise FormulaError(f"непонятный фрагмент выражения: {text[position:].strip()[:20]!r}")
+        kind = next(name for name in _TOKEN_KINDS if match.group(name) is not None)
+        if kind == "member":
+            value = match.group("member_name")
+        elif kind == "bit":
+            # "x & N = 0" - отрицание условия "x & N ≠ 0"
+            if match.group("bit_op") in ("=", "=="):
+                tokens.append(("not", "¬"))
+            value = bitwise_name(match.group("bit_arg") or match.group("bit_arg_paren"))
+        elif kind == "div":
+            value = divisibility_name(match.group("div_arg"))
+        else:
+            value = match.group(kind)
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Разбор выражения рекурсивным спуском в дерево из кортежей"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise FormulaError("выражение обрывается")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        tree = self.binary(0)
+        if self.position < len(self.tokens):
+            raise FormulaError(f"лишний фрагмент выражения: {self.tokens[self.position][1]!r}")
+        return tree
+
+    def binary(self, level: int) -> tuple:
+        if level == len(_BINARY_LEVELS):
+            return self.unary()
+        left = self.binary(level + 1)
+        while self.peek() in _BINARY_LEVELS[level]:
+            operation = self.take()[0]
+            # Импликация правоассоциативна: a → b → c = a → (b → c)
+            right = self.binary(level if operation == "implies" else level + 1)
+            left = (operation, left, right)
+        return left
+
+    def unary(self) -> tuple:
+        kind, value = self.take()
+        if kind == "not":
+            return ("not", self.unary())
+        if kind == "lparen":
+            tree = self.binary(0)
+            if self.take()[0] != "rparen":
+                raise FormulaError("не закрыта скобка")
+            return tree
+        if kind == "const":
+            return ("const", value in ("1", "True"))
+        if kind in ("member", "bit", "div", "name"):
+            return ("var", value)
+        raise FormulaError(f"ожидалось условие или скобка, получено {value!r}")
+
+
+def _variables(tree: tuple) -> List[str]:
+    """Имена отрезков, встречающихся в выражении"""
+    if tree[0] == "var":
+        return [tree[1]]
+    return [name for child in tree[1:] if isinstance(child, tuple) for name in _variables(child)]
+
+
+def _evaluate(tree: tuple, values: Dict[str, bool]) -> bool:
+    kind = tree[0]
+    if kind == "var":
+        return values[tree[1]]
+    if kind == "const":
+        return tree[1]
+    if kind == "not":
+        return not _evaluate(tree[1], values)
+    return _OPERATIONS[kind](_evaluate(tree[1], values), _evaluate(tree[2], values))
+
+
+class CompiledFormula:
+    """
+    Выражение, разобранное один раз и сведенное к таблице истинности
+    по всем переменным (для P, Q, A - 8 строк); вычисление - обращение к таблице
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tree = _Parser(_tokenize(text)).parse()
+        self.variables: Tuple[str, ...] = tuple(sorted(set(_variables(self.tree))))
+        # Бит i индекса строки - значение переменной variables[i]
+        self.table: List[bool] = []
+        for index in range(1 << len(self.variables)):
+            values = {name: bool(index >> i & 1) for i, name in enumerate(self.variables)}
+            self.table.append(_evaluate(self.tree, values))
+
+    def index(self, values: Dict[str, bool]) -> int:
+        """Номер строки таблицы истинности для набора значений"""
+        result = 0
+        for i, name in enumerate(self.variables):
+            if values[name]:
+                result |= 1 << i
+        return result
+
+    def __call__(self, values: Dict[str, bool]) -> bool:
+        return self.table[self.index(values)]
+
+
+@lru_cache(maxsize=256)
+def compile_formula(text: str, names: Optional[Tuple[str, ...]] = None) -> CompiledFormula:
+    """
+    Разбор выражения (результат кэшируется по тексту); при синтаксической ошибке - FormulaError
+    names - допустимые имена отрезков, остальные имена в выражении считаются ошибкой
+    """
+    formula = CompiledFormula(text)
+    unknown = [name for name in formula.variables
+               if names is not None and name not in names
+               and divisibility_argument(name) is None and bitwise_argument(name) is None]
+    if unknown:
+        raise FormulaError(f"неизвестные отрезки в выражении: {', '.join(unknown)}")
+    for name in formula.variables:
+        argument = divisibility_argument(name)
+        if argument is not None and argument != SOUGHT and not _is_natural(argument):
+            raise FormulaError(f"в {name} делитель должен быть натуральным числом или {SOUGHT}")
+        argument = bitwise_argument(name)
+        if argument is not None and argument != SOUGHT and not (argument.isascii() and argument.isdigit()):
+            raise FormulaError(f"в {name} ≠ 0 второй операнд должен быть целым числом или {SOUGHT}")
+    return formula
+
+
+def _is_natural(text: str) -> bool:
+    """Запись натурального числа (только цифры 0-9, без нуля)"""
+    return text.isascii() and text.isdigit() and int(text) > 0
+
+
+class Segment:
+    """Элементарный участок прямой: точка [lo, lo] или интервал (lo, hi) без концов"""
+
+    __slots__ = ("lo", "hi", "is_point")
+
+    def __init__(self, lo: float, hi: float, is_point: bool):
+        self.lo = lo
+        self.hi = hi
+        self.is_point = is_point
+
+    def __reduce__(self):
+        # Без этого pickle (общий кэш результатов) разбирает __slots__ медленным общим путем
+        return Segment, (self.lo, self.hi, self.is_point)
+
+    def sample(self) -> float:
+        """Точка внутри участка, по которой определяется принадлежность отрезкам"""
+        if self.is_point:
+            return self.lo
+        if math.isinf(self.lo) and math.isinf(self.hi):
+            return 0
+        if math.isinf(self.lo):
+            return self.hi - 1
+        if math.isinf(self.hi):
+            return self.lo + 1
+        return (self.lo + self.hi) / 2
+
+    def __repr__(self) -> str:
+        if self.is_point:
+            return f"{{{format_bound(self.lo)}}}"
+        return f"({format_bound(self.lo)}, {format_bound(self.hi)})"
+
+
+def format_bound(value: float) -> str:
+    """Граница участка в виде строки: целые числа без ".0", бесконечности - знаком ∞"""
+    if math.isinf(value):
+        return "+∞" if value > 0 else "-∞"
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def elementary_segments(points: List[float]) -> List[Segment]:
+    """Разбиение прямой точками на участки: (-∞, p1), {p1}, (p1, p2), {p2}, ..., (pk, +∞)"""
+    points = sorted(set(points))
+    if not points:
+        return [Segment(-math.inf, math.inf, False)]
+    segments = [Segment(-math.inf, points[0], False)]
+    for i, point in enumerate(points):
+        segments.append(Segment(point, point, True))
+        segments.append(Segment(point, points[i + 1] if i + 1 < len(points) else math.inf, False))
+    return segments
+
+
+class SegmentAnswer:
+    """
+    Результат решения: искомая длина A и пример отрезка A = [left, right]
+    length = None - подходящего отрезка нет, math.inf - длина не ограничена;
+    attained = False - длина является точной гранью, но не достигается
+    (например, A должен покрыть интервал (5, 9), но не может содержать его концы)
+    """
+
+    def __init__(self, mode: str, segments: List[Segment], must: List[bool], forbidden: List[bool]):
+        self.mode = mode
+        self.segments = segments
+        # Участки, которые обязаны входить в A (формула ложна при x ∉ A)
+        self.must = must
+        # Участки, которые не могут входить в A (формула ложна при x ∈ A)
+        self.forbidden = forbidden
+        self.length: Optional[float] = None
+        self.left: Optional[float] = None
+        self.right: Optional[float] = None
+        self.attained = True
+        # Причина отсутствия ответа
+        self.reason = ""
+
+    @property
+    def must_segments(self) -> List[Segment]:
+        return [segment for segment, flag in zip(self.segments, self.must) if flag]
+
+    @property
+    def forbidden_segments(self) -> List[Segment]:
+        return [segment for segment, flag in zip(self.segments, self.forbidden) if flag]
+
+    def answer_text(self) -> str:
+        """Ответ в виде строки"""
+        if self.length is None:
+            return "нет решения"
+        if math.isinf(self.length):
+            return "не ограничена"
+        return format_bound(self.length)
+
+    def report_lines(self) -> List[str]:
+        """Пошаговое объяснение решения"""
+        lines = ["ШАГ 1: Анализ выражения по участкам прямой",
+                 f"Участки: {' '.join(map(repr, self.segments))}"]
+        if self.must_segments:
+            lines.append(f"Участки, которые обязаны быть в A: {' '.join(map(repr, self.must_segments))}")
+        else:
+            lines.append("Нет точек, которые обязательно должны быть в A")
+        if self.forbidden_segments:
+            lines.append(f"Участки, которые не могут быть в A: {' '.join(map(repr, self.forbidden_segments))}")
+        lines.append("")
+
+        title = "наибольшая" if self.mode == "max" else "наименьшая"
+        lines.append(f"ШАГ 2: {title.capitalize()} длина A")
+        if self.length is None:
+            lines.append(f"Подходящего отрезка A нет: {self.reason}")
+        elif math.isinf(self.length):
+            lines.append(f"Отрезок A: [{format_bound(self.left)}, {format_bound(self.right)}] - длина не ограничена")
+        else:
+            if self.left is not None:
+                lines.append(f"Отрезок A: [{format_bound(self.left)}, {format_bound(self.right)}]")
+            else:
+                lines.append("Подходит пустой отрезок или точка")
+            if not self.attained:
+                lines.append("Концы отрезка запрещены - длина является точной гранью и не достигается")
+            lines.append(f"{title.capitalize()} длина: {self.answer_text()}")
+        return lines
+
+    def _set(self, first: int, last: int) -> None:
+        """Отрезок A от начала участка first до конца участка last"""
+        self.left = self.segments[first].lo
+        self.right = self.segments[last].hi
+        self.length = self.right - self.left
+        # Открытый крайний участок - конец A совпадает с соседней точкой, которая запрещена
+        self.attained = (self.segments[first].is_point or math.isinf(self.left)) and \
+                        (self.segments[last].is_point or math.isinf(self.right))
+
+
+def solve_segments(intervals: Dict[str, Interval], formula: Formula, mode: str) -> SegmentAnswer:
+    """
+    Точное решение: наименьшая (mode="min") или наибольшая (mode="max") длина отрезка A,
+    при которой формула истинна для всех x. Сложность - O(число отрезков) вычислений формулы
+    """
+    points = [bound for interval in intervals.values() for bound in interval]
+    segments = elementary_segments(points)
+
+    must, forbidden = [], []
+    for segment in segments:
+        x = segment.sample()
+        values = {name: lo <= x <= hi for name, (lo, hi) in intervals.items()}
+        values[SOUGHT] = False
+        must.append(not formula(values))
+        values[SOUGHT] = True
+        forbidden.append(not formula(values))
+
+    answer = SegmentAnswer(mode, segments, must, forbidden)
+    if any(m and f for m, f in zip(must, forbidden)):
+        answer.reason = "формула ложна на некоторых участках при любом A"
+        return answer
+
+    required = [i for i, flag in enumerate(must) if flag]
+    if required:
+        first, last = required[0], required[-1]
+        if any(forbidden[first:last + 1]):
+            answer.reason = "отрезок A, покрывающий обязательные участки, задевает запрещенные"
+            return answer
+        if math.isinf(segments[first].lo) or math.isinf(segments[last].hi):
+            answer.reason = "A обязан покрывать неограниченный участок"
+            return answer
+        if mode == "min":
+            answer._set(first, last)
+            # Конец открытого участка должен войти в A - он не может быть запрещен
+            answer.attained = not (not segments[first].is_point and forbidden[first - 1] or
+                                   not segments[last].is_point and forbidden[last + 1])
+            return answer
+        # Наибольший отрезок: расширяем покрытие обязательных участков, пока не встретим запрещенный
+        while first > 0 and not forbidden[first - 1]:
+            first -= 1
+        while last < len(segments) - 1 and not forbidden[last + 1]:
+            last += 1
+        answer._set(first, last)
+        return answer
+
+    if all(forbidden):
+        answer.reason = "ни одна точка не может входить в A"
+        return answer
+
+    if mode == "min":
+        # Обязательных участков нет - подходит отрезок нулевой длины в любом незапрещенном участке
+        answer.length = 0
+        return answer
+
+    # Наибольший из непрерывных участков без запрещенных точек
+    best: Optional[Tuple[float, bool, int, int]] = None
+    start = None
+    for i in range(len(segments) + 1):
+        if i < len(segments) and not forbidden[i]:
+            if start is None:
+                start = i
+            continue
+        if start is not None:
+            answer._set(start, i - 1)
+            candidate = (answer.length, answer.attained, start, i - 1)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+            start = None
+    answer._set(best[2], best[3])
+    return answer
+
+
+def parse_interval(text: str) -> Optional[Interval]:
+    """Отрезок из строки с двумя числами ("5 30", "[5; 30]"); None, если чисел не два"""
+    numbers = list(map(int, re.findall(r"-?\d+", text)))
+    if len(numbers) != 2:
+        return None
+    return min(numbers), max(numbers)
+
+
+def parse_segments(text: str) -> Dict[str, Interval]:
+    """
+    Именованные отрезки из строки вида "P = [5, 30]; Q = [14, 23]; R = [1, 7]"
+    (разделители - ";" или перевод строки); при ошибке - ValueError
+    """
+    segments: Dict[str, Interval] = {}
+    for part in re.split(r"[;\n]", text):
+        if not part.strip():
+            continue
+        match = re.match(r"\s*([^\W\d]\w*)\s*[=:]?\s*(.*)$", part)
+        interval = parse_interval(match.group(2)) if match else None
+        if interval is None:
+            raise ValueError(f"не удалось разобрать отрезок {part.strip()!r}")
+        name = match.group(1)
+        if name == SOUGHT:
+            raise ValueError(f"имя {SOUGHT} зарезервировано для искомой величины")
+        segments[name] = interval
+    return segments
+
+
+def _lcm(a: int, b: int) -> int:
+    return a * b // math.gcd(a, b)
+
+
+def _divisors(n: int, checkpoint: Optional[Callable[[], None]] = None) -> List[int]:
+    """Все делители n по возрастанию"""
+    small, large = [], []
+    d = 1
+    while d * d <= n:
+        if checkpoint is not None and d & 0xFFFF == 0:
+            checkpoint()
+        if n % d == 0:
+            small.append(d)
+            if d * d != n:
+                large.append(n // d)
+        d += 1
+    return small + large[::-1]
+
+
+class DivisibilityAnswer:
+    """
+    Результат решения задачи с делимостью: наименьшее или наибольшее натуральное A,
+    при котором формула с условиями ДЕЛ(x, N) и ДЕЛ(x, A) истинна для всех натуральных x
+    value = None - подходящего A нет, math.inf - A не ограничено сверху
+    """
+
+    def __init__(self, mode: str, constants: List[int]):
+        self.mode = mode
+        self.constants = constants
+        # НОК всех постоянных делителей: от остатка A по его простым множителям зависит ответ
+        self.period = reduce(_lcm, constants, 1)
+        self.value: Optional[Union[int, float]] = None
+        # Сколько значений A проверено
+        self.checked = 0
+
+    def answer_text(self) -> str:
+        if self.value is None:
+            return "нет решения"
+        if math.isinf(self.value):
+            return "не ограничено"
+        return str(self.value)
+
+    def report_lines(self) -> List[str]:
+        lines = ["ШАГ 1: Анализ делимости",
+                 f"Постоянные делители: {', '.join(map(str, self.constants)) or 'нет'}; их НОК = {self.period}",
+                 "Истинность формулы для A зависит только от НОД(A, НОК) и от того, делит ли A этот НОК,",
+                 "а для каждого x - только от набора делителей, на которые x делится",
+                 f"Проверено значений A: {self.checked}",
+                 ""]
+        title = "наибольшее" if self.mode == "max" else "наименьшее"
+        lines.append(f"ШАГ 2: {title.capitalize()} A")
+        if self.value is None:
+            lines.append("Подходящего натурального A нет")
+        elif math.isinf(self.value):
+            lines.append("Подходят сколь угодно большие A - наибольшего нет")
+        else:
+            lines.append(f"{title.capitalize()} A: {self.value}")
+        return lines
+
+
+def divisibility_holds(formula: CompiledFormula, a: int) -> bool:
+    """
+    Истинна ли формула для всех натуральных x при данном A
+    Перебираются не x, а наборы делителей S, на которые x делится: набор достижим,
+    если НОК(S) не делится ни на один делитель вне S (тогда подходит x = НОК(S))
+    """
+    divisors = []
+    for name in formula.variables:
+        argument = divisibility_argument(name)
+        divisors.append(a if argument == SOUGHT else int(argument))
+    distinct = sorted(set(divisors))
+    positions = [distinct.index(d) for d in divisors]
+
+    lcms = [1] * (1 << len(distinct))
+    for subset in range(1, len(lcms)):
+        low = (subset & -subset).bit_length() - 1
+        lcms[subset] = _lcm(lcms[subset & (subset - 1)], distinct[low])
+    for subset, value in enumerate(lcms):
+        if any(not subset >> i & 1 and value % d == 0 for i, d in enumerate(distinct)):
+            continue
+        index = 0
+        for bit, position in enumerate(positions):
+            if subset >> position & 1:
+                index |= 1 << bit
+        if not formula.table[index]:
+            return False
+    return True
+
+
+def _smallest_prime_not_dividing(n: int) -> int:
+    """Наименьшее простое число, на которое n не делится"""
+    return next(p for p in range(2, n + 3) if n % p and all(p % q for q in range(2, math.isqrt(p) + 1)))
+
+
+def solve_divisibility(formula: CompiledFormula, mode: str,
+                       checkpoint: Optional[Callable[[], None]] = None) -> DivisibilityAnswer:
+    """
+    Наименьшее или наибольшее натуральное A для формулы с ДЕЛ(x, A)
+    Ответ зависит только от g = НОД(A, НОК постоянных делителей) и от того, делит ли A этот НОК,
+    поэтому достаточно проверить делители НОК и по одному числу g*p (p - простое, не делящее НОК).
+    Наименьшее A, не делящее НОК, с НОД(A, НОК) = g - это g*q, q - наименьшее простое, не делящее НОК/g
+    """
+    arguments = [divisibility_argument(name) for name in formula.variables]
+    if None in arguments:
+        raise FormulaError("в задаче с делимостью все условия должны иметь вид ДЕЛ(x, N)")
+    constants = sorted({int(argument) for argument in arguments if argument != SOUGHT})
+    answer = DivisibilityAnswer(mode, constants)
+    period = answer.period
+    prime = _smallest_prime_not_dividing(period)
+
+    def holds(a: int) -> bool:
+        if checkpoint is not None:
+            checkpoint()
+        answer.checked += 1
+        return divisibility_holds(formula, a)
+
+    divisors = _divisors(period, checkpoint)
+    # Классы A, не делящих НОК: представитель g * prime
+    outer = [g for g in divisors if holds(g * prime)]
+    if mode == "max":
+        if outer:
+            answer.value = math.inf
+            return answer
+        inner = [g for g in reversed(divisors) if holds(g)]
+        answer.value = inner[0] if inner else None
+        return answer
+
+    # Наименьшее A - наименьшее из наименьших чисел подходящих классов
+    inner = [g for g in divisors if holds(g)]
+    answer.value = min(inner + [g * _smallest_prime_not_dividing(period // g) for g in outer], default=None)
+    return answer
+
+
+class BitwiseAnswer:
+    """
+    Результат решения задачи с поразрядной конъюнкцией: наименьшее или наибольшее
+    неотрицательное A, при котором формула с условиями x & N ≠ 0 истинна для всех x ≥ 0
+    value = None - подходящего A нет, math.inf - A не ограничено сверху
+    """
+
+    def __init__(self, mode: str, width: int):
+        self.mode = mode
+        # Число проверяемых разрядов: старший из них представляет все разряды выше постоянных
+        self.width = width
+        # Разряды, которые A содержать не может
+        self.forbidden_bits = 0
+        # Значения x, с которыми A обязано иметь общий единичный разряд
+        self.required: List[int] = []
+        self.value: Optional[Union[int, float]] = None
+
+    def answer_text(self) -> str:
+        if self.value is None:
+            return "нет решения"
+        if math.isinf(self.value):
+            return "не ограничено"
+        return str(self.value)
+
+    def report_lines(self) -> List[str]:
+        forbidden = [str(1 << bit) for bit in range(self.width) if self.forbidden_bits >> bit & 1]
+        lines = ["ШАГ 1: Анализ разрядов",
+                 f"Проверены все x от 0 до {(1 << self.width) - 1} (старшие разряды ведут себя одинаково)",
+                 f"Разряды, запрещенные для A: {', '.join(forbidden) or 'нет'}",
+                 f"Значений x, требующих x & A ≠ 0: {len(self.required)}"]
+        if self.required:
+            shown = ", ".join(f"{x:b}" for x in self.required[:8])
+            lines.append(f"Например (в двоичной записи): {shown}{' ...' if len(self.required) > 8 else ''}")
+        lines.append("")
+        title = "наибольшее" if self.mode == "max" else "наименьшее"
+        lines.append(f"ШАГ 2: {title.capitalize()} A")
+        if self.value is None:
+            lines.append("Подходящего A нет: разрешенных разрядов не хватает для обязательных x")
+        elif math.isinf(self.value):
+            lines.append("Разряды выше постоянных разрешены - наибольшего A нет")
+        else:
+            lines.append(f"{title.capitalize()} A: {self.value} (в двоичной записи {self.value:b})")
+        return lines
+
+
+def solve_bitwise(formula: CompiledFormula, mode: str) -> BitwiseAnswer:
+    """
+    Наименьшее или наибольшее A для формулы с условиями x & N ≠ 0 и x & A ≠ 0
+    Формула вычисляется сразу для всех x векторно (NumPy); по результатам выводятся
+    запрещенные для A разряды и значения x, с которыми A обязано пересекаться,
+    затем A строится по разрядам от старшего к младшему без перебора A
+    """
+    arguments = [bitwise_argument(name) for name in formula.variables]
+    if None in arguments:
+        raise FormulaError("в задаче с поразрядной конъюнкцией все условия должны иметь вид x & N ≠ 0")
+    constants = [int(argument) for argument in arguments if argument != SOUGHT]
+    width = max([constant.bit_length() for constant in constants] + [1]) + 1
+    answer = BitwiseAnswer(mode, width)
+
+    xs = np.arange(1 << width, dtype=np.int64)
+    index = np.zeros(len(xs), dtype=np.int64)
+    sought_bit = 0
+    for bit, argument in enumerate(arguments):
+        if argument == SOUGHT:
+            sought_bit = 1 << bit
+        else:
+            index |= ((xs & int(argument)) != 0).astype(np.int64) << bit
+    table = np.array(formula.table, dtype=bool)
+    # Формула ложна при x & A = 0 - A обязано пересекаться с x
+    required = xs[~table[index]]
+    # Формула ложна при x & A ≠ 0 - A не может содержать ни одного разряда x
+    answer.forbidden_bits = int(np.bitwise_or.reduce(xs[~table[index | sought_bit]], initial=0))
+    answer.required = required.tolist()
+
+    def feasible(a: int) -> bool:
+        return bool(np.all(required & a))
+
+    allowed = ((1 << width) - 1) & ~answer.forbidden_bits
+    if not feasible(allowed):
+        return answer
+    if mode == "max":
+        top = 1 << (width - 1)
+        answer.value = math.inf if allowed & top else allowed
+        return answer
+    value = allowed
+    for bit in reversed(range(width)):
+        candidate = value & ~(1 << bit)
+        if candidate != value and feasible(candidate):
+            value = candidate
+    answer.value = value
+    return answer
+
+
+def solve_task(segments: Dict[str, Interval], formula_text: str, mode: str,
+               checkpoint: Optional[Callable[[], None]] = None) \
+        -> Union[SegmentAnswer, DivisibilityAnswer, BitwiseAnswer]:
+    """
+    Решение задачи по тексту формулы: задачи с ДЕЛ(x, A) решаются перебором делителей,
+    с x & A - поразрядно, остальные - по участкам прямой между концами отрезков (любое их число).
+    Ответы хранятся в общем кэше результатов по таблице истинности формулы, поэтому
+    разные записи одного выражения решаются один раз.
+    checkpoint вызывается во время перебора делителей и может прервать его исключением
+    """
+    formula = compile_formula(formula_text, tuple(segments) + (SOUGHT,))
+    arithmetic = divisibility_name(SOUGHT) in formula.variables or bitwise_name(SOUGHT) in formula.variables
+    # Отрезки на ответ задач с ДЕЛ и x & A не влияют и в ключ не входят
+    intervals = () if arithmetic else tuple(sorted((name, tuple(interval)) for name, interval in segments.items()))
+    key = ("sover_15.task", formula.variables, tuple(formula.table), intervals, mode)
+    return shared_cache.get_or_compute(key, lambda: _solve_compiled(segments, formula, mode, checkpoint))
+
+
+def _solve_compiled(segments: Dict[str, Interval], formula: CompiledFormula, mode: str,
+                    checkpoint: Optional[Callable[[], None]] = None) \
+        -> Union[SegmentAnswer, DivisibilityAnswer, BitwiseAnswer]:
+    if divisibility_name(SOUGHT) in formula.variables:
+        return solve_divisibility(formula, mode, checkpoint)
+    if bitwise_name(SOUGHT) in formula.variables:
+        return solve_bitwise(formula, mode)
+    if any(bitwise_argument(name) is not None for name in formula.variables):
+        raise FormulaError("условия x & N поддерживаются только в задачах на поиск A в x & A")
+    if any(divisibility_argument(name) is not None for name in formula.variables):
+        raise FormulaError("условия ДЕЛ(x, N) поддерживаются только в задачах на поиск делителя A")
+    return solve_segments(segments, formula, mode)
+
+
+def task_report(segments: Dict[str, Interval], formula_text: str, mode: str,
+                answer: Union[SegmentAnswer, DivisibilityAnswer, BitwiseAnswer]) -> List[str]:
+    """Полный отчет о решении: условие, шаги и ответ"""
+    if isinstance(answer, SegmentAnswer):
+        target = f"{'наибольшую' if mode == 'max' else 'наименьшую'} длину A"
+    elif isinstance(answer, DivisibilityAnswer):
+        target = f"{'наибольшее' if mode == 'max' else 'наименьшее'} натуральное A"
+    else:
+        target = f"{'наибольшее' if mode == 'max' else 'наименьшее'} неотрицательное целое A"
+    lines = ["УСЛОВИЕ:"]
+    if segments:
+        lines.append(", ".join(f"{name} = [{lo}, {hi}]" for name, (lo, hi) in segments.items()))
+    lines += [f"Выражение: {formula_text} ≡ 1",
+              f"Найти: {target}",
+              "-" * 60,
+              ""]
+    lines += answer.report_lines()
+    lines += ["", "-" * 60, f"ОТВЕТ: {answer.answer_text()}", "-" * 60]
+    return lines
+
+
+def _problem_segments(problem: dict) -> Dict[str, Interval]:
+    """Отрезки задачи из JSON: строка "P = [5, 30]; ...", словарь {"P": [5, 30]} или ключи P и Q"""
+    segments = problem.get("segments")
+    if isinstance(segments, str):
+        return parse_segments(segments)
+    if segments is None:
+        segments = {name: value for name, value in problem.items() if re.fullmatch(r"[^\W\d_]", name)}
+    result = {}
+    for name, value in segments.items():
+        interval = parse_interval(value) if isinstance(value, str) else \
+            (min(value), max(value)) if len(value) == 2 else None
+        if interval is None:
+            raise ValueError(f"не удалось разобрать отрезок {name}: {value!r}")
+        result[name] = interval
+    if SOUGHT in result:
+        raise ValueError(f"имя {SOUGHT} зарезервировано для искомой величины")
+    return result
+
+
+def solve_problem(problem: dict, explain: bool = False) -> dict:
+    """
+    Решение одной задачи пакета: {"P": ..., "Q": ..., "formula": ..., "mode": "max" | "min"}
+    Возвращает {"answer": текст ответа, "value": число или None, "unbounded": bool}
+    или {"error": описание}; с explain добавляется пошаговый отчет
+    """
+    result = {"id": problem["id"]} if "id" in problem else {}
+    try:
+        mode = problem.get("mode", "max")
+        if mode not in ("max", "min"):
+            raise ValueError(f"неизвестный режим {mode!r}")
+        segments = _problem_segments(problem)
+        answer = solve_task(segments, problem["formula"], mode)
+    except KeyError as e:
+        result["error"] = f"нет поля {e}"
+        return result
+    except (ValueError, TypeError) as e:
+        result["error"] = str(e)
+        return result
+
+    value = answer.length if isinstance(answer, SegmentAnswer) else answer.value
+    unbounded = value is not None and math.isinf(value)
+    result["answer"] = answer.answer_text()
+    result["value"] = None if value is None or unbounded else (int(value) if value == int(value) else value)
+    result["unbounded"] = unbounded
+    if explain:
+        result["report"] = task_report(segments, problem["formula"], mode, answer)
+    return result
+
+
+def solve_batch(lines, output, explain: bool = False) -> Tuple[int, int]:
+    """
+    Потоковое решение пакета: каждая строка lines - задача в JSON, каждый ответ сразу
+    пишется строкой JSON в output. Возвращает (число задач, число ошибок)
+    """
+    total = errors = 0
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        total += 1
+        try:
+            problem = json.loads(line)
+            if not isinstance(problem, dict):
+                raise ValueError("задача должна быть объектом JSON")
+        except ValueError as e:
+            result = {"line": line_number, "error": f"некорректная строка: {e}"}
+        else:
+            result = solve_problem(problem, explain)
+            result.setdefault("line", line_number)
+        errors += "error" in result
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    output.flush()
+    return total, errors
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Консольный пакетный режим: задачи в JSON Lines на входе, ответы в JSON Lines на выходе"""
+    parser = argparse.ArgumentParser(description="Пакетное решение задач 15 ЕГЭ без графического интерфейса")
+    parser.add_argument("input", nargs="?", default="-", help="файл задач JSON Lines (по умолчанию stdin)")
+    parser.add_argument("-o", "--output", default="-", help="файл ответов (по умолчанию stdout)")
+    parser.add_argument("--explain", action="store_true", help="добавить к ответам пошаговый отчет")
+    parser.add_argument("--cache-file", help="файл sqlite для ответов, не поместившихся в память (общий кэш)")
+    args = parser.parse_args(argv)
+    if args.cache_file:
+        shared_cache.configure(path=args.cache_file)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        total, errors = solve_batch(source, target, args.explain)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    shared_cache.flush()
+    stats = shared_cache.stats()
+    print(f"Решено задач: {total - errors} из {total} "
+          f"(из кэша: {stats['hits'] + stats['disk_hits']})", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Фоновые вычисления решателей в общем пуле потоков Qt
+Результат и ошибки возвращаются в поток интерфейса через сигналы. Общим пулом
+пользуются и отдельные приложения, и общее окно (launcher.py).
+Отмена кооперативная: задача периодически вызывает check_cancelled, который
+прерывает ее исключением TaskCancelled после SolverTask.cancel
+"""
+import threading
+from typing import Callable, List
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class TaskCancelled(Exception):
+    """Вычисление прервано по запросу отмены"""
+
+class TaskSignals(QObject):
+    """Сигналы фоновой задачи; объект живет в потоке интерфейса, поэтому слоты вызываются в нем"""
+
+    finished = Signal(object)  # Результат вычисления
+    failed = Signal(str)  # Сообщение об ошибке
+
+
+class SolverTask(QRunnable):
+    """Вычисление в общем пуле потоков с передачей результата в интерфейс через сигналы"""
+
+    def __init__(self, function: Callable, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = TaskSignals()
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+
+    def run(self):
+        _current.task = self
+        try:
+            if self.cancelled.is_set():
+                raise TaskCancelled("вычисление отменено")
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        finally:
+            _current.task = None
+            self.done.set()
+        self.signals.finished.emit(result)
+
+    def cancel(self) -> None:
+        """
+        Запрос отмены (из потока интерфейса): задача прерывается в ближайшем вызове
+        check_cancelled, ее результат и ошибка в интерфейс больше не передаются
+        """
+        self.cancelled.set()
+
+    def wait(self) -> None:
+        """
+        Ожидание завершения (например, при закрытии окна после отмены вычисления)
+        Задача, которая еще стоит в очереди пула, снимается и не выполняется
+        """
+        if QThreadPool.globalInstance().tryTake(self):
+            if self in _running_tasks:
+                _running_tasks.remove(self)
+            self.done.set()
+        self.done.wait()
+
+
+# Задачи, которые еще выполняются: без ссылки на них сигналы могут быть удалены сборщиком мусора
+_running_tasks: List[SolverTask] = []
+# Задача, которая выполняется в текущем потоке пула
+_current = threading.local()
+
+
+def check_cancelled() -> None:
+    """Точка проверки для долгих вычислений: TaskCancelled, если текущая задача пула отменена"""
+    task = getattr(_current, "task", None)
+    if task is not None and task.cancelled.is_set():
+        raise TaskCancelled("вычисление отменено")
+
+
+def run_in_pool(function: Callable, args: tuple, on_finished: Callable, on_failed: Callable) -> SolverTask:
+    """Запуск function(*args) в общем пуле потоков приложения"""
+    task = SolverTask(function, *args)
+    task.setAutoDelete(False)
+    _running_tasks.append(task)
+
+    def finish(handler, value):
+        _running_tasks.remove(task)
+        if not task.cancelled.is_set():
+            handler(value)
+
+    task.signals.finished.connect(lambda result: finish(on_finished, result))
+    task.signals.failed.connect(lambda message: finish(on_failed, message))
+    QThreadPool.globalInstance().start(task)
+    return task